@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from core.ports.ILogger import ILogger
+from logger.batch_flusher import BatchFlusher
+
+INSERT_SQL = "INSERT INTO event_log (ts, event, payload) VALUES (to_timestamp(%s), %s, %s::jsonb)"
+
+Row = Tuple[float, str, str]
+
+
+class PostgresLogger(ILogger):
+    """
+    Buffers events and writes them with one `executemany` per batch, from a
+    background thread: `log` never waits on the database.
+
+    `connect` is any DB-API connection factory (e.g. `lambda: psycopg2.connect(dsn)`);
+    the target table is `event_log` (`db.models.EventLog`, created by the
+    API's migrations).
+    A batch that cannot be written (connect, insert or commit fails) is
+    dropped and counted in `failed`; the connection is reopened for the next.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        *,
+        batch_size: int = 500,
+        max_buffer: int = 50_000,
+        flush_interval_s: float = 1.0,
+    ) -> None:
+        self._connect = connect
+        self._conn: Any = None
+        self._conn_lock = threading.Lock()
+        self._flusher: BatchFlusher[Row] = BatchFlusher(
+            self._write,
+            batch_size=batch_size,
+            max_buffer=max_buffer,
+            flush_interval_s=flush_interval_s,
+            name="agenticlabs-postgres-logger",
+        )
+
+    @property
+    def dropped(self) -> int:
+        return self._flusher.dropped
+
+    @property
+    def failed(self) -> int:
+        return self._flusher.failed
+
+    def log(self, event_type: str, payload: Dict[str, Any]) -> None:
+        self._flusher.put((time.time(), event_type, json.dumps(payload, default=str)))
+
+    def _write(self, rows: List[Row]) -> None:
+        with self._conn_lock:
+            try:
+                if self._conn is None:
+                    self._conn = self._connect()
+                with self._conn.cursor() as cur:
+                    cur.executemany(INSERT_SQL, rows)
+                self._conn.commit()
+            except Exception:
+                self._discard_connection()
+                raise
+
+    def _discard_connection(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        for cleanup in (conn.rollback, conn.close):
+            try:
+                cleanup()
+            except Exception:
+                pass
+
+    def flush(self) -> None:
+        self._flusher.flush()
+
+    def close(self) -> None:
+        self._flusher.close()
+        with self._conn_lock:
+            if self._conn is not None:
+                try:
+                    self._conn.close()
+                except Exception:
+                    pass
+                self._conn = None
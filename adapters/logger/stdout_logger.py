@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from core.ports.ILogger import ILogger
+from logger.event_logger import EventLogger
+
+
+class StdoutLogger(EventLogger, ILogger):
+    """
+    The API's JSON-lines event logger behind the `ILogger` port. Each event
+    is serialized when it is logged (later changes to the payload do not
+    leak into the record) and written in batches from a background thread,
+    so the stdout lock is taken once per batch and never on the caller's
+    thread.
+    """
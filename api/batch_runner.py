@@ -0,0 +1,401 @@
+"""
+Offline batch runner: stream a JSONL file of RunRequests through the
+routing and provider pipeline in-process.
+
+    cd api && python -m batch_runner prompts.jsonl -o results.jsonl --concurrency 16
+
+Each input line is a RunRequest object; an optional "id" field is copied
+to the output line. Output lines are written in completion order and
+carry the input line index:
+
+    {"index": 0, "id": "q1", "status": "ok", "result": {...RunResponse}}
+    {"index": 1, "status": "error", "status_code": 400, "detail": "..."}
+
+Progress is checkpointed next to the output (`<output>.ckpt`). Re-running
+the same command after a crash truncates the output to the last checkpoint
+and resumes from there, so every input line appears exactly once. Items
+interrupted by SIGINT/SIGTERM while waiting to retry get no output line and
+run again on resume.
+
+Runs are logged to router_runs and billed to the tenant like /v1/run unless
+`--no-log` is given. Tenant rate limits apply; this process has its own
+limiter, so size `AGENTICLABS_RATE_LIMIT_BURST`/`_PER_S` for the job.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+RETRYABLE_STATUS = {429, 502, 503, 504}
+
+
+@dataclass
+class RunnerStats:
+    ok: int = 0
+    failed: int = 0
+    retried: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+    elapsed_s: float = 0.0
+
+    def summary(self, session_elapsed_s: float, session_items: int, latencies_ms: List[float]) -> Dict[str, Any]:
+        """Totals cover all runs of this output; throughput and latency cover this session."""
+        ordered = sorted(latencies_ms)
+
+        def pct(p: float) -> float:
+            if not ordered:
+                return 0.0
+            return round(ordered[min(len(ordered) - 1, int(p / 100.0 * len(ordered)))], 2)
+
+        total = self.ok + self.failed
+        return {
+            "items": total,
+            "ok": self.ok,
+            "failed": self.failed,
+            "retried": self.retried,
+            "items_per_s": round(session_items / session_elapsed_s, 2) if session_elapsed_s > 0 else 0.0,
+            "elapsed_s": round(self.elapsed_s, 2),
+            "latency_p50_ms": pct(50),
+            "latency_p95_ms": pct(95),
+            "latency_p99_ms": pct(99),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+            "cost_per_1k_items_usd": round(self.cost_usd / self.ok * 1000, 4) if self.ok else 0.0,
+        }
+
+
+@dataclass
+class Checkpoint:
+    """
+    Every input line before `next_index` (which starts at byte
+    `next_offset`) is done; `done_ahead` lists finished lines after it.
+    `output_bytes` is the output length that matches this state.
+    `pending_runs` holds the runs this state counts as done that were being
+    written to router_runs when it was saved; on resume, any of them that
+    did not reach the table are written then.
+    """
+
+    input_path: str
+    input_size: int
+    next_index: int = 0
+    next_offset: int = 0
+    done_ahead: List[int] = field(default_factory=list)
+    output_bytes: int = 0
+    stats: Dict[str, Any] = field(default_factory=dict)
+    pending_runs: List[Dict[str, Any]] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["Checkpoint"]:
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                return cls(**json.load(fh))
+        except FileNotFoundError:
+            return None
+
+    def save(self, path: str) -> None:
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(asdict(self), fh)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+
+
+class _Progress:
+    """Tracks the contiguous low-water mark over out-of-order completions."""
+
+    def __init__(self, checkpoint: Checkpoint) -> None:
+        self.checkpoint = checkpoint
+        self._ahead = set(checkpoint.done_ahead)
+        self._ends: Dict[int, int] = {}
+
+    def is_done(self, index: int) -> bool:
+        return index < self.checkpoint.next_index or index in self._ahead
+
+    def mark(self, index: int, end_offset: int) -> None:
+        self._ends[index] = end_offset
+        self._ahead.add(index)
+        ckpt = self.checkpoint
+        while ckpt.next_index in self._ahead:
+            self._ahead.discard(ckpt.next_index)
+            end = self._ends.pop(ckpt.next_index, None)
+            if end is not None:
+                ckpt.next_offset = end
+            ckpt.next_index += 1
+
+    def sync(self) -> None:
+        self.checkpoint.done_ahead = sorted(self._ahead)
+
+
+def iter_input(path: str, start_index: int, start_offset: int) -> Iterator[Tuple[int, int, bytes]]:
+    """Yield (index, end_offset, raw_line) from the given position."""
+    with open(path, "rb") as fh:
+        fh.seek(start_offset)
+        index = start_index
+        offset = start_offset
+        for raw in fh:
+            offset += len(raw)
+            yield index, offset, raw
+            index += 1
+
+
+class BatchRunner:
+    def __init__(
+        self,
+        *,
+        tenant_id: str,
+        router_mode: str | None = None,
+        concurrency: int = 8,
+        retries: int = 3,
+        max_wait_s: float = 60.0,
+        log_runs: bool = True,
+        db_batch_size: int = 200,
+        checkpoint_every_s: float = 5.0,
+    ) -> None:
+        self.tenant_id = tenant_id
+        self.router_mode = router_mode
+        self.concurrency = max(1, concurrency)
+        self.retries = max(0, retries)
+        self.max_wait_s = max_wait_s
+        self.log_runs = log_runs
+        self.db_batch_size = max(1, db_batch_size)
+        self.checkpoint_every_s = checkpoint_every_s
+        self._stop = threading.Event()
+        self._tenant = None
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _load_tenant(self):
+        from db.session import SessionLocal
+        from deps import _load_tenant
+
+        with SessionLocal() as db:
+            tenant = _load_tenant(db, self.tenant_id)
+            if tenant is None:
+                raise SystemExit(f"Tenant not found: {self.tenant_id}")
+            db.expunge(tenant)
+        return tenant
+
+    def _run_item(self, raw: bytes) -> Tuple[Optional[Dict[str, Any]], Any]:
+        """
+        Run one input line; returns (output line, FinalizedRun or None). The
+        line is None when a stop interrupted the item before it finished.
+        """
+        from config.router import RouterMode, get_router_mode
+        from run_pipeline import execute_run, finalize_run, prepare_run
+        from shared.models import RunRequest
+
+        try:
+            data = json.loads(raw)
+            item_id = data.pop("id", None) if isinstance(data, dict) else None
+            payload = RunRequest(**data)
+        except (ValueError, TypeError) as exc:
+            return {"status": "error", "status_code": 422, "detail": str(exc)[:500]}, None
+
+        mode = RouterMode(self.router_mode) if self.router_mode else get_router_mode()
+        line: Dict[str, Any] = {"id": item_id} if item_id is not None else {}
+        attempt = 0
+        while True:
+            try:
+                prepared = prepare_run(payload, self._tenant, mode)
+                finalized = finalize_run(execute_run(prepared, self._tenant, background=True), self._tenant)
+            except HTTPException as exc:
+                retry_after = float((exc.headers or {}).get("Retry-After", 2.0 ** attempt))
+                if exc.status_code in RETRYABLE_STATUS and attempt < self.retries and retry_after <= self.max_wait_s:
+                    if self._stop.wait(retry_after):
+                        # Not an answer: leave the item for the resumed run.
+                        return None, None
+                    attempt += 1
+                    continue
+                line.update({"status": "error", "status_code": exc.status_code, "detail": exc.detail})
+                return line, None
+            line.update({"status": "ok", "result": finalized.response.model_dump()})
+            if attempt:
+                line["retries"] = attempt
+            return line, finalized
+
+    def _persist(self, finalized: List[Any]) -> None:
+        from db.session import SessionLocal
+        from models.tenant import Tenant
+        from run_pipeline import persist_runs
+
+        if not finalized or not self.log_runs:
+            return
+        with SessionLocal() as db:
+            persist_runs(db, db.get(Tenant, self._tenant.id), finalized)
+
+    def _recover(self, checkpoint: Checkpoint, ckpt_path: str) -> None:
+        """Write the runs a crash left between saving `checkpoint` and their commit."""
+        from sqlalchemy import select
+
+        from db.models import RouterRun
+        from db.session import SessionLocal
+        from run_pipeline import FinalizedRun
+
+        if not checkpoint.pending_runs:
+            return
+        run_ids = [run["run_row"]["run_id"] for run in checkpoint.pending_runs]
+        with SessionLocal() as db:
+            committed = set(db.scalars(select(RouterRun.run_id).where(RouterRun.run_id.in_(run_ids))))
+        self._persist([
+            FinalizedRun(response=None, run_row=run["run_row"], billed_usd=run["billed_usd"])
+            for run in checkpoint.pending_runs
+            if run["run_row"]["run_id"] not in committed
+        ])
+        checkpoint.pending_runs = []
+        checkpoint.save(ckpt_path)
+
+    def run(self, input_path: str, output_path: str, *, progress=sys.stderr) -> Dict[str, Any]:
+        from ratelimit import usage_reconciler
+
+        ckpt_path = f"{output_path}.ckpt"
+        input_size = os.path.getsize(input_path)
+        checkpoint = Checkpoint.load(ckpt_path)
+        if checkpoint is None or checkpoint.input_path != os.path.abspath(input_path):
+            checkpoint = Checkpoint(os.path.abspath(input_path), input_size)
+            if os.path.exists(output_path):
+                os.remove(output_path)
+        elif checkpoint.input_size != input_size:
+            raise SystemExit(f"{input_path} changed since the checkpoint was written; delete {ckpt_path} to restart")
+
+        stats = RunnerStats(**checkpoint.stats)
+        tracker = _Progress(checkpoint)
+        self._tenant = self._load_tenant()
+        self._recover(checkpoint, ckpt_path)
+        usage_reconciler.start()
+
+        with open(output_path, "ab") as out:
+            # Lines written after the last checkpoint will be produced again.
+            out.truncate(checkpoint.output_bytes)
+            out.seek(checkpoint.output_bytes)
+            pending: Dict[Future, Tuple[int, int]] = {}
+            unpersisted: List[Any] = []
+            latencies_ms: List[float] = []
+            t_session = time.perf_counter()
+            last_save = t_session
+            session_items = 0
+
+            def save() -> None:
+                out.flush()
+                os.fsync(out.fileno())
+                tracker.sync()
+                checkpoint.output_bytes = out.tell()
+                checkpoint.stats = asdict(stats)
+                # Saved before the commit, so a crash in between cannot
+                # re-run (and re-bill) items whose runs were already written.
+                if self.log_runs:
+                    checkpoint.pending_runs = [
+                        {"run_row": item.run_row, "billed_usd": item.billed_usd} for item in unpersisted
+                    ]
+                checkpoint.save(ckpt_path)
+                if checkpoint.pending_runs:
+                    self._persist(unpersisted)
+                    checkpoint.pending_runs = []
+                    checkpoint.save(ckpt_path)
+                unpersisted.clear()
+
+            def drain(block: bool) -> None:
+                nonlocal session_items
+                if not pending:
+                    return
+                done, _ = wait(list(pending), timeout=None if block else 0, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, end_offset = pending.pop(future)
+                    line, finalized = future.result()
+                    if line is None:
+                        continue
+                    out.write(json.dumps({"index": index, **line}, default=str).encode() + b"\n")
+                    tracker.mark(index, end_offset)
+                    session_items += 1
+                    stats.retried += line.get("retries", 0)
+                    if finalized is None:
+                        stats.failed += 1
+                        continue
+                    stats.ok += 1
+                    latencies_ms.append(float(finalized.run_row["latency_ms"]))
+                    stats.prompt_tokens += int(finalized.run_row["prompt_tokens"])
+                    stats.completion_tokens += int(finalized.run_row["completion_tokens"])
+                    stats.cost_usd += finalized.billed_usd
+                    unpersisted.append(finalized)
+
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="batch-runner") as pool:
+                for index, end_offset, raw in iter_input(input_path, checkpoint.next_index, checkpoint.next_offset):
+                    if self._stop.is_set():
+                        break
+                    if tracker.is_done(index):
+                        continue
+                    if not raw.strip():
+                        tracker.mark(index, end_offset)
+                        continue
+                    while len(pending) >= self.concurrency * 2:
+                        drain(block=True)
+                    pending[pool.submit(self._run_item, raw)] = (index, end_offset)
+                    drain(block=False)
+
+                    now = time.perf_counter()
+                    if len(unpersisted) >= self.db_batch_size or now - last_save >= self.checkpoint_every_s:
+                        stats.elapsed_s += now - last_save
+                        last_save = now
+                        save()
+                        print(json.dumps({"progress": stats.summary(now - t_session, session_items, latencies_ms)}), file=progress)
+                while pending:
+                    drain(block=True)
+
+            now = time.perf_counter()
+            stats.elapsed_s += now - last_save
+            save()
+
+        usage_reconciler.stop()
+        summary = stats.summary(now - t_session, session_items, latencies_ms)
+        summary["complete"] = checkpoint.next_offset >= input_size and not checkpoint.done_ahead
+        return summary
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="batch_runner", description=__doc__.split("\n\n")[0])
+    parser.add_argument("input", help="JSONL file of RunRequest objects")
+    parser.add_argument("-o", "--output", required=True, help="JSONL results file (resumed if a checkpoint exists)")
+    parser.add_argument("--tenant", default=os.getenv("AGENTICLABS_DEFAULT_TENANT_ID", "00000000-0000-0000-0000-000000000001"))
+    parser.add_argument("--router-mode", choices=["baseline", "enhanced"], default=None)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--retries", type=int, default=3, help="retries for 429/5xx per item")
+    parser.add_argument("--max-wait-s", type=float, default=60.0, help="longest Retry-After to wait out")
+    parser.add_argument("--db-batch", type=int, default=200, help="runs per router_runs insert")
+    parser.add_argument("--checkpoint-every-s", type=float, default=5.0)
+    parser.add_argument("--no-log", action="store_true", help="do not write router_runs or bill the tenant")
+    args = parser.parse_args(argv)
+
+    runner = BatchRunner(
+        tenant_id=args.tenant,
+        router_mode=args.router_mode,
+        concurrency=args.concurrency,
+        retries=args.retries,
+        max_wait_s=args.max_wait_s,
+        log_runs=not args.no_log,
+        db_batch_size=args.db_batch,
+        checkpoint_every_s=args.checkpoint_every_s,
+    )
+    # Stop submitting, let in-flight items finish, then checkpoint.
+    signal.signal(signal.SIGINT, lambda *_: runner.stop())
+    signal.signal(signal.SIGTERM, lambda *_: runner.stop())
+    summary = runner.run(args.input, args.output)
+    print(json.dumps({"summary": summary}), file=sys.stderr)
+    return 0 if summary["complete"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
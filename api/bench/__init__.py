@@ -0,0 +1,21 @@
+"""
+Microbenchmarks for the router's own overhead: complexity scoring, banding,
+classification, model selection and ranking, cost and ALRI, and the whole
+pre-provider segment of /v1/run (`run_pipeline.prepare_run`), over a prompt
+corpus from 10 B to 200 KB.
+
+    cd api
+    python -m bench run -o bench-base.json          # on main
+    python -m bench run -o bench-head.json          # on the branch
+    python -m bench compare bench-base.json bench-head.json --threshold 10
+
+`compare` exits 1 when any median regresses by more than the threshold.
+Compare files from the same machine and Python; the env block in each
+file records both.
+"""
+
+from .compare import compare, format_table
+from .corpus import SIZES, build_corpus
+from .suite import CASES, measure, run_suite
+
+__all__ = ["CASES", "SIZES", "build_corpus", "compare", "format_table", "measure", "run_suite"]
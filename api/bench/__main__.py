@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from .compare import compare, format_ns, format_table
+from .corpus import SIZES
+from .suite import run_suite
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "git_commit": _git_commit(),
+    }
+
+
+def _run(args: argparse.Namespace) -> int:
+    from logger import event_logger
+
+    def progress(row: Dict[str, Any]) -> None:
+        print(f"{row['case']:34} {row['size']:>6} {format_ns(row['ns_per_op']['median']):>11}", file=sys.stderr)
+
+    # prepare_run emits event logs; they are still queued (that cost is
+    # real) but written to /dev/null instead of flooding the terminal.
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        results = run_suite(
+            only=args.only,
+            sizes=args.sizes,
+            sample_s=args.sample_s,
+            repeats=args.repeats,
+            progress=progress,
+        )
+        event_logger.flush()
+
+    document = {
+        "version": 1,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "env": _environment(),
+        "config": {"sample_s": args.sample_s, "repeats": args.repeats},
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as fh:
+        json.dump(document, fh, indent=2)
+    print(f"wrote {len(results)} results to {args.output}", file=sys.stderr)
+    return 0
+
+
+def _compare(args: argparse.Namespace) -> int:
+    with open(args.base, encoding="utf-8") as fh:
+        base = json.load(fh)
+    with open(args.head, encoding="utf-8") as fh:
+        head = json.load(fh)
+    if base.get("env", {}).get("python") != head.get("env", {}).get("python"):
+        print("warning: results come from different Python versions", file=sys.stderr)
+    rows = compare(base, head, threshold_pct=args.threshold)
+    print(format_table(rows))
+    regressions = [row for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:g}%", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="bench", description="Router hot-path microbenchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the suite and write a JSON result file")
+    run.add_argument("-o", "--output", default="bench-results.json")
+    run.add_argument("--only", nargs="*", help="case name substrings to run")
+    run.add_argument("--sizes", nargs="*", choices=[label for label, _ in SIZES])
+    run.add_argument("--sample-s", type=float, default=0.05, help="target duration of one timing sample")
+    run.add_argument("--repeats", type=int, default=7)
+    run.set_defaults(func=_run)
+
+    cmp = commands.add_parser("compare", help="compare two result files; exit 1 on regressions")
+    cmp.add_argument("base")
+    cmp.add_argument("head")
+    cmp.add_argument("--threshold", type=float, default=10.0, help="allowed median slowdown in percent")
+    cmp.set_defaults(func=_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
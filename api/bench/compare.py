@@ -0,0 +1,64 @@
+"""
+Compare two benchmark result files on median ns/op.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Tuple
+
+Key = Tuple[str, str]
+
+
+def _index(results: Dict[str, Any]) -> Dict[Key, Dict[str, Any]]:
+    return {(row["case"], row["size"]): row for row in results.get("results", [])}
+
+
+def compare(base: Dict[str, Any], head: Dict[str, Any], *, threshold_pct: float = 10.0) -> List[Dict[str, Any]]:
+    """
+    One row per case/size present in both files. `status` is "regression"
+    or "improvement" when the median moved by more than `threshold_pct`,
+    else "same".
+    """
+    base_rows, head_rows = _index(base), _index(head)
+    rows: List[Dict[str, Any]] = []
+    for key in base_rows.keys() & head_rows.keys():
+        before = base_rows[key]["ns_per_op"]["median"]
+        after = head_rows[key]["ns_per_op"]["median"]
+        change_pct = (after / before - 1.0) * 100.0 if before else 0.0
+        if change_pct > threshold_pct:
+            status = "regression"
+        elif change_pct < -threshold_pct:
+            status = "improvement"
+        else:
+            status = "same"
+        rows.append({
+            "case": key[0],
+            "size": key[1],
+            "base_ns": before,
+            "head_ns": after,
+            "change_pct": round(change_pct, 1),
+            "status": status,
+        })
+    order = {(row["case"], row["size"]): index for index, row in enumerate(base.get("results", []))}
+    rows.sort(key=lambda row: order[(row["case"], row["size"])])
+    return rows
+
+
+def format_ns(ns: float) -> str:
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:.2f} {unit}"
+    return f"{ns:.0f} ns"
+
+
+def format_table(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'case':34} {'size':>6} {'base':>11} {'head':>11} {'change':>8}  status"]
+    for row in rows:
+        lines.append(
+            f"{row['case']:34} {row['size']:>6} {format_ns(row['base_ns']):>11} "
+            f"{format_ns(row['head_ns']):>11} {row['change_pct']:>+7.1f}%  {row['status']}"
+        )
+    return "\n".join(lines)
+
+
+__all__ = ["compare", "format_ns", "format_table"]
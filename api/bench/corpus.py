@@ -0,0 +1,51 @@
+"""
+Deterministic prompt corpus for the router benchmarks.
+
+Each size gets a prompt built from a mix of realistic fragments (code,
+JSON, prose with numbers, compliance wording) repeated up to the target
+byte length, so regex-heavy scorers see the same shapes they see in
+production at every size.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+
+SIZES: Tuple[Tuple[str, int], ...] = (
+    ("10B", 10),
+    ("100B", 100),
+    ("1KB", 1_000),
+    ("10KB", 10_000),
+    ("100KB", 100_000),
+    ("200KB", 200_000),
+)
+
+_FRAGMENTS: List[str] = [
+    "Summarize the quarterly revenue report and highlight the 3 biggest risks. ",
+    "def merge(a, b):\n    return {**a, **b}  # write a python function for this\n",
+    '{"customer_id": 48213, "amount": 129.50, "currency": "EUR", "status": "pending"} ',
+    "Check whether this data retention policy meets GDPR compliance and security regulation. ",
+    "```sql\nSELECT region, SUM(total) FROM orders GROUP BY region;\n``` ",
+    "Draft a friendly product announcement for the new dashboard! Is it ready? ",
+    "The migration moved 1,250,000 rows in 42 minutes; estimate the cost for 8x the volume. ",
+]
+
+
+def make_prompt(size_bytes: int) -> str:
+    parts: List[str] = []
+    length = 0
+    index = 0
+    while length < size_bytes:
+        fragment = _FRAGMENTS[index % len(_FRAGMENTS)]
+        parts.append(fragment)
+        length += len(fragment)
+        index += 1
+    return "".join(parts)[:size_bytes]
+
+
+def build_corpus(sizes: Tuple[Tuple[str, int], ...] = SIZES) -> Dict[str, str]:
+    """{size label: prompt} for every size."""
+    return {label: make_prompt(size) for label, size in sizes}
+
+
+__all__ = ["SIZES", "build_corpus", "make_prompt"]
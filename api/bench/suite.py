@@ -0,0 +1,239 @@
+"""
+Benchmark cases for the routing hot path and the timing loop that runs them.
+
+Each case turns a corpus prompt into a zero-argument callable; cases that do
+not depend on the prompt run once under the size label "-". Timing follows
+timeit: the loop count is calibrated until one sample takes `sample_s`, GC
+is disabled while sampling, and the per-op median of `repeats` samples is
+what comparisons use.
+"""
+
+from __future__ import annotations
+
+import gc
+import statistics
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from .corpus import SIZES, build_corpus
+
+Op = Callable[[], Any]
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    setup: Callable[[str], Op]
+    sized: bool = True
+
+
+def _score_complexity(prompt: str) -> Op:
+    from router.complexity import score_complexity
+
+    return lambda: score_complexity(prompt)
+
+
+def _choose_band(prompt: str) -> Op:
+    from router.complexity import choose_band, score_complexity
+
+    score = score_complexity(prompt)
+    return lambda: choose_band(score, prompt)
+
+
+def _classify_query(prompt: str) -> Op:
+    from routing.categories import classify_query
+
+    return lambda: classify_query(prompt)
+
+
+def _select_model(prompt: str) -> Op:
+    from router.rule_based import select_model
+
+    return lambda: select_model(band="medium", task_type="general")
+
+
+def _choose_enhanced_model(prompt: str) -> Op:
+    from config.model_registry import MODEL_REGISTRY
+    from routing.categories import QueryCategory
+    from routing.scoring import choose_enhanced_model
+
+    keys = list(MODEL_REGISTRY)
+    return lambda: choose_enhanced_model(
+        category=QueryCategory.CODING,
+        allowed_model_keys=keys,
+        resolved_band="medium",
+    )
+
+
+def _calculate_cost(prompt: str) -> Op:
+    from cost.calculator import calculate_cost
+
+    return lambda: calculate_cost(
+        model_key="openai:gpt-4o-mini",
+        provider="openai",
+        model="gpt-4o-mini",
+        input_tokens=1200,
+        output_tokens=400,
+    )
+
+
+def _compute_alri_v2(prompt: str) -> Op:
+    from governance.alri import compute_alri_v2
+
+    return lambda: compute_alri_v2(
+        band="medium",
+        provider="openai",
+        model="gpt-4o-mini",
+        prompt_tokens=max(1, len(prompt) // 4),
+        completion_tokens=400,
+        cost_usd=0.0004,
+        baseline_cost_usd=0.002,
+        prompt_text=prompt,
+    )
+
+
+def bench_tenant():
+    """A transient, unlimited tenant allowed on every provider."""
+    from models.tenant import (
+        AutonomyLevel,
+        CostMode,
+        DataSensitivity,
+        GovernanceMode,
+        Tenant,
+        TenantBand,
+        TenantRegion,
+        TenantStatus,
+    )
+
+    return Tenant(
+        id=uuid.UUID(int=0xBE4C),
+        name="bench",
+        slug="bench",
+        region=TenantRegion.US,
+        governance_mode=GovernanceMode.STANDARD,
+        cost_mode=CostMode.BALANCED,
+        allowed_providers=["openai", "gemini", "anthropic", "ollama"],
+        max_band=TenantBand.PREMIUM,
+        default_data_sensitivity=DataSensitivity.INTERNAL,
+        default_autonomy_level=AutonomyLevel.ANSWER_ONLY,
+        credit_limit_usd=10**9,
+        usage_usd=0,
+        max_daily_requests=10**12,
+        max_tokens_per_request=10**9,
+        hedge_requests=False,
+        status=TenantStatus.ACTIVE,
+    )
+
+
+def _prepare_run(prompt: str) -> Op:
+    """Everything /v1/run does before calling a provider."""
+    from config.router import RouterMode
+    from shared.models import RunRequest
+    import run_pipeline
+
+    tenant = bench_tenant()
+    payload = RunRequest(prompt=prompt, agent_id="bench")
+    return lambda: run_pipeline.prepare_run(payload, tenant, RouterMode.ENHANCED)
+
+
+CASES: List[Case] = [
+    Case("router.score_complexity", _score_complexity),
+    Case("router.choose_band", _choose_band),
+    Case("routing.classify_query", _classify_query),
+    Case("router.select_model", _select_model, sized=False),
+    Case("routing.choose_enhanced_model", _choose_enhanced_model, sized=False),
+    Case("cost.calculate_cost", _calculate_cost, sized=False),
+    Case("governance.compute_alri_v2", _compute_alri_v2),
+    Case("pipeline.prepare_run", _prepare_run),
+]
+
+
+@contextmanager
+def unlimited_rate_limiter() -> Iterator[None]:
+    """Tenant buckets would throttle the loop; swap in an effectively unlimited limiter."""
+    import run_pipeline
+    from ratelimit import InMemoryRateLimiter, RateLimitConfig
+
+    original = run_pipeline.rate_limiter
+    run_pipeline.rate_limiter = InMemoryRateLimiter(RateLimitConfig(burst=10**12, refill_per_s=1e12))
+    try:
+        yield
+    finally:
+        run_pipeline.rate_limiter = original
+
+
+def _time(op: Op, loops: int) -> float:
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            op()
+        return float(time.perf_counter_ns() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def calibrate(op: Op, sample_s: float) -> int:
+    """Smallest loop count (1, 2, 5, 10, 20, ...) whose run takes at least `sample_s`."""
+    loops = 1
+    while True:
+        for factor in (1, 2, 5):
+            count = loops * factor
+            if _time(op, count) >= sample_s * 1e9:
+                return count
+        loops *= 10
+
+
+def measure(op: Op, *, sample_s: float = 0.05, repeats: int = 7) -> Dict[str, Any]:
+    op()  # warm caches (routing rules, compiled regexes) outside the samples
+    loops = calibrate(op, sample_s)
+    samples = [_time(op, loops) / loops for _ in range(max(1, repeats))]
+    return {
+        "loops": loops,
+        "repeats": len(samples),
+        "ns_per_op": {
+            "min": round(min(samples), 1),
+            "median": round(statistics.median(samples), 1),
+            "max": round(max(samples), 1),
+            "stdev": round(statistics.pstdev(samples), 1),
+        },
+    }
+
+
+def run_suite(
+    *,
+    only: Optional[Sequence[str]] = None,
+    sizes: Sequence[str] | None = None,
+    sample_s: float = 0.05,
+    repeats: int = 7,
+    progress: Callable[[Dict[str, Any]], None] | None = None,
+) -> List[Dict[str, Any]]:
+    """Run every case (or those whose name contains one of `only`) on every corpus size."""
+    corpus = build_corpus()
+    size_bytes = dict(SIZES)
+    labels = [label for label, _ in SIZES if not sizes or label in sizes]
+    results: List[Dict[str, Any]] = []
+    with unlimited_rate_limiter():
+        for case in CASES:
+            if only and not any(part in case.name for part in only):
+                continue
+            runs = [(label, corpus[label]) for label in labels] if case.sized else [("-", "")]
+            for label, prompt in runs:
+                row = {
+                    "case": case.name,
+                    "size": label,
+                    "bytes": size_bytes.get(label, 0),
+                    **measure(case.setup(prompt), sample_s=sample_s, repeats=repeats),
+                }
+                results.append(row)
+                if progress is not None:
+                    progress(row)
+    return results
+
+
+__all__ = ["CASES", "Case", "bench_tenant", "calibrate", "measure", "run_suite", "unlimited_rate_limiter"]
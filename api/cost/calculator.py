@@ -5,6 +5,10 @@ from typing import Tuple
 from config.model_registry import MODEL_REGISTRY, ModelConfig
 from costs import get_unit_prices
 
+# Prompt-cache pricing relative to the model's input price (Anthropic).
+CACHE_READ_MULTIPLIER = 0.1
+CACHE_WRITE_MULTIPLIER = 1.25
+
 
 def resolve_model_key(provider: str | None, model: str | None) -> str | None:
     if not provider or not model:
@@ -51,13 +55,25 @@ def calculate_cost(
     model: str | None = None,
     input_tokens: int = 0,
     output_tokens: int = 0,
+    cache_read_tokens: int = 0,
+    cache_write_tokens: int = 0,
 ) -> float:
     """
     Compute spend for a model given token counts.
     Falls back to pricing profile if registry lacks explicit pricing.
+    `input_tokens` includes prompt-cache reads and writes, which are billed
+    at their own multiple of the input price.
     """
     input_tokens = int(input_tokens or 0)
     output_tokens = int(output_tokens or 0)
+    cache_read_tokens = int(cache_read_tokens or 0)
+    cache_write_tokens = int(cache_write_tokens or 0)
+    uncached = max(0, input_tokens - cache_read_tokens - cache_write_tokens)
     per_in, per_out = _per_token_prices(model_key, provider, model)
-    cost = input_tokens * per_in + output_tokens * per_out
+    cost = (
+        uncached * per_in
+        + cache_read_tokens * per_in * CACHE_READ_MULTIPLIER
+        + cache_write_tokens * per_in * CACHE_WRITE_MULTIPLIER
+        + output_tokens * per_out
+    )
     return round(cost, 10)
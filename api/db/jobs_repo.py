@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from .models import RunJob
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def enqueue_job(
+    db: Session,
+    *,
+    tenant_id: str,
+    payload: Dict[str, Any],
+    router_mode: str | None = None,
+    callback_url: str | None = None,
+) -> RunJob:
+    now = _utcnow()
+    job = RunJob(
+        tenant_id=uuid.UUID(str(tenant_id)),
+        status=JOB_QUEUED,
+        payload=payload,
+        router_mode=router_mode,
+        callback_url=callback_url,
+        created_at=now,
+        available_at=now,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def count_queued(db: Session, tenant_id: str) -> int:
+    return int(
+        db.execute(
+            select(func.count(RunJob.id)).where(
+                RunJob.tenant_id == uuid.UUID(str(tenant_id)),
+                RunJob.status.in_([JOB_QUEUED, JOB_RUNNING]),
+            )
+        ).scalar()
+        or 0
+    )
+
+
+def get_job(db: Session, job_id: str, tenant_id: str | None = None) -> RunJob | None:
+    try:
+        ident = uuid.UUID(str(job_id))
+    except ValueError:
+        return None
+    job = db.get(RunJob, ident)
+    if job is None or (tenant_id is not None and job.tenant_id != uuid.UUID(str(tenant_id))):
+        return None
+    return job
+
+
+def list_jobs(
+    db: Session, tenant_id: str, *, status: str | None = None, limit: int = 50
+) -> List[RunJob]:
+    stmt = select(RunJob).where(RunJob.tenant_id == uuid.UUID(str(tenant_id)))
+    if status:
+        stmt = stmt.where(RunJob.status == status)
+    stmt = stmt.order_by(RunJob.created_at.desc()).limit(limit)
+    return list(db.execute(stmt).scalars())
+
+
+def claim_jobs(db: Session, worker_id: str, limit: int = 1) -> List[RunJob]:
+    """
+    Move up to `limit` due jobs to running. `FOR UPDATE SKIP LOCKED` lets
+    any number of workers poll the table without handing out a job twice.
+    """
+    now = _utcnow()
+    stmt = (
+        select(RunJob)
+        .where(RunJob.status == JOB_QUEUED, RunJob.available_at <= now)
+        .order_by(RunJob.available_at, RunJob.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    jobs = list(db.execute(stmt).scalars())
+    for job in jobs:
+        job.status = JOB_RUNNING
+        job.locked_by = worker_id
+        job.started_at = now
+    db.commit()
+    return jobs
+
+
+def complete_job(
+    db: Session,
+    job: RunJob,
+    *,
+    worker_id: str,
+    run_id: str,
+    result: Dict[str, Any],
+    commit: bool = True,
+) -> bool:
+    """
+    Mark a job succeeded, but only while `worker_id` still holds it: a job
+    whose lease expired may already be running elsewhere, and its result
+    must be recorded once. Returns False if the lease was lost.
+    """
+    updated = db.execute(
+        update(RunJob)
+        .where(RunJob.id == job.id, RunJob.status == JOB_RUNNING, RunJob.locked_by == worker_id)
+        .values(
+            status=JOB_SUCCEEDED,
+            run_id=run_id,
+            result=result,
+            error=None,
+            locked_by=None,
+            finished_at=_utcnow(),
+        )
+    )
+    if commit:
+        db.commit()
+    return bool(updated.rowcount)
+
+
+def fail_job(
+    db: Session,
+    job: RunJob,
+    *,
+    error: Dict[str, Any],
+    retry_in_s: float | None = None,
+    count_attempt: bool = True,
+    max_attempts: int = 5,
+) -> bool:
+    """
+    Record a failed run. With `retry_in_s` the job goes back to the queue
+    until it has used `max_attempts`; `count_attempt=False` defers it
+    without using an attempt (rate limits, full queues).
+    Returns True if the job was requeued.
+    """
+    if count_attempt:
+        job.attempts = (job.attempts or 0) + 1
+    job.error = error
+    job.locked_by = None
+    requeue = retry_in_s is not None and job.attempts < max_attempts
+    if requeue:
+        job.status = JOB_QUEUED
+        job.available_at = _utcnow() + timedelta(seconds=retry_in_s)
+    else:
+        job.status = JOB_FAILED
+        job.finished_at = _utcnow()
+    db.commit()
+    return requeue
+
+
+def cancel_job(db: Session, job: RunJob) -> bool:
+    if job.status != JOB_QUEUED:
+        return False
+    job.status = JOB_CANCELLED
+    job.finished_at = _utcnow()
+    db.commit()
+    return True
+
+
+def set_webhook_status(db: Session, job: RunJob, webhook_status: str) -> None:
+    job.webhook_status = webhook_status[:32]
+    db.commit()
+
+
+def requeue_stale(db: Session, lease_s: float, *, max_attempts: int = 5) -> Tuple[int, int]:
+    """
+    Return jobs left running by a crashed worker to the queue. An expired
+    lease uses an attempt, so a job that keeps killing its worker fails
+    after `max_attempts` instead of being retried forever.
+    Returns (requeued, failed).
+    """
+    now = _utcnow()
+    stale = (RunJob.status == JOB_RUNNING, RunJob.started_at < now - timedelta(seconds=lease_s))
+    failed = db.execute(
+        update(RunJob)
+        .where(*stale, RunJob.attempts + 1 >= max_attempts)
+        .values(
+            status=JOB_FAILED,
+            attempts=RunJob.attempts + 1,
+            error={"status_code": 500, "detail": "Worker lease expired"},
+            locked_by=None,
+            finished_at=now,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    requeued = db.execute(
+        update(RunJob)
+        .where(*stale)
+        .values(status=JOB_QUEUED, attempts=RunJob.attempts + 1, locked_by=None, available_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return int(requeued.rowcount or 0), int(failed.rowcount or 0)
@@ -0,0 +1,32 @@
+"""Add hedged-request opt-in to tenants and hedge columns to router runs."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "202502292104"
+down_revision = "202502292103"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "tenants",
+        sa.Column(
+            "hedge_requests",
+            sa.Boolean(),
+            nullable=False,
+            server_default=sa.false(),
+        ),
+    )
+    op.add_column("router_runs", sa.Column("hedged", sa.Boolean(), nullable=True))
+    op.add_column("router_runs", sa.Column("hedge_cost_usd", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("router_runs", "hedge_cost_usd")
+    op.drop_column("router_runs", "hedged")
+    op.drop_column("tenants", "hedge_requests")
@@ -0,0 +1,20 @@
+"""Record provider attempt counts on router runs."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "202502292105"
+down_revision = "202502292104"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("router_runs", sa.Column("attempt_count", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("router_runs", "attempt_count")
@@ -0,0 +1,44 @@
+"""Add the run_jobs queue table."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "202502292107"
+down_revision = "202502292106"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "run_jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False, server_default="queued"),
+        sa.Column("payload", postgresql.JSONB(), nullable=False),
+        sa.Column("router_mode", sa.String(length=20), nullable=True),
+        sa.Column("callback_url", sa.String(length=2048), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("run_id", sa.String(length=40), nullable=True),
+        sa.Column("result", postgresql.JSONB(), nullable=True),
+        sa.Column("error", postgresql.JSONB(), nullable=True),
+        sa.Column("webhook_status", sa.String(length=32), nullable=True),
+        sa.Column("locked_by", sa.String(length=64), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("available_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_run_jobs_tenant_id", "run_jobs", ["tenant_id"])
+    op.create_index("ix_run_jobs_status_available_at", "run_jobs", ["status", "available_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_run_jobs_status_available_at", table_name="run_jobs")
+    op.drop_index("ix_run_jobs_tenant_id", table_name="run_jobs")
+    op.drop_table("run_jobs")
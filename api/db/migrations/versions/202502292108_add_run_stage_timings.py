@@ -0,0 +1,21 @@
+"""Store per-stage timings on router runs."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "202502292108"
+down_revision = "202502292107"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("router_runs", sa.Column("stage_timings", postgresql.JSONB(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("router_runs", "stage_timings")
@@ -0,0 +1,22 @@
+"""Store the API run id on router runs."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "202502292109"
+down_revision = "202502292108"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("router_runs", sa.Column("run_id", sa.String(length=40), nullable=True))
+    op.create_index("ix_router_runs_run_id", "router_runs", ["run_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_router_runs_run_id", table_name="router_runs")
+    op.drop_column("router_runs", "run_id")
@@ -0,0 +1,32 @@
+"""Add the event_log table for the Postgres event sink."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "202502292110"
+down_revision = "202502292109"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "event_log",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("ts", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("event", sa.String(length=64), nullable=False),
+        sa.Column("payload", postgresql.JSONB(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_event_log_ts", "event_log", ["ts"])
+    op.create_index("ix_event_log_event", "event_log", ["event"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_event_log_event", table_name="event_log")
+    op.drop_index("ix_event_log_ts", table_name="event_log")
+    op.drop_table("event_log")
@@ -1,5 +1,7 @@
-from sqlalchemy import Column, DateTime, Float, Integer, String, Boolean
-from sqlalchemy.dialects.postgresql import UUID
+import uuid
+
+from sqlalchemy import Column, Date, DateTime, Float, Index, Integer, String, Boolean
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.sql import func
 
@@ -17,6 +19,8 @@ class RouterRun(Base):
         index=True,
     )
     tenant_id = Column(UUID(as_uuid=True), nullable=True, index=True)
+    # The API's run id ("r_..."), as returned in RunResponse.run_id.
+    run_id = Column(String(40), nullable=True, index=True)
 
     band = Column(String(20), nullable=False)
     provider = Column(String(50), nullable=False)
@@ -38,3 +42,57 @@ class RouterRun(Base):
     query_category_conf = Column(Float, nullable=True)
     routing_efficient = Column(Boolean, nullable=True)
     counterfactual_cost_usd = Column(Float, nullable=True)
+    hedged = Column(Boolean, nullable=True)
+    hedge_cost_usd = Column(Float, nullable=True)
+    attempt_count = Column(Integer, nullable=True)
+    # Milliseconds per pipeline stage, e.g. {"scoring": 0.4, "execute": 812.3}.
+    stage_timings = Column(JSONB, nullable=True)
+
+
+class TenantDailyUsage(Base):
+    __tablename__ = "tenant_daily_usage"
+
+    tenant_id = Column(UUID(as_uuid=True), primary_key=True)
+    day = Column(Date, primary_key=True)
+    request_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+
+class RunJob(Base):
+    """A deferred /v1/run request, drained by the job workers."""
+
+    __tablename__ = "run_jobs"
+    __table_args__ = (Index("ix_run_jobs_status_available_at", "status", "available_at"),)
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    status = Column(String(16), nullable=False, default="queued")
+    payload = Column(JSONB, nullable=False)
+    router_mode = Column(String(20), nullable=True)
+    callback_url = Column(String(2048), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    run_id = Column(String(40), nullable=True)
+    result = Column(JSONB, nullable=True)
+    error = Column(JSONB, nullable=True)
+    webhook_status = Column(String(32), nullable=True)
+    locked_by = Column(String(64), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    available_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class EventLog(Base):
+    """Structured events written by `adapters/logger/postgres_logger.PostgresLogger`."""
+
+    __tablename__ = "event_log"
+
+    id = Column(Integer, primary_key=True)
+    ts = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    event = Column(String(64), nullable=False, index=True)
+    payload = Column(JSONB, nullable=False)
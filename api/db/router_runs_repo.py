@@ -1,6 +1,7 @@
 from typing import Any, Dict, List
 
-from sqlalchemy import desc, func
+from sqlalchemy import desc, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from cost.calculator import calculate_cost, resolve_model_key
@@ -30,10 +31,16 @@ def log_run(
     query_category_conf: float | None = None,
     routing_efficient: bool | None = None,
     counterfactual_cost_usd: float | None = None,
+    hedged: bool | None = None,
+    hedge_cost_usd: float | None = None,
+    attempt_count: int | None = None,
+    stage_timings: Dict[str, float] | None = None,
+    run_id: str | None = None,
 ) -> RouterRun:
     savings_usd = baseline_cost_usd - cost_usd
     run = RouterRun(
         tenant_id=tenant_id,
+        run_id=run_id,
         band=band,
         provider=provider,
         model=model,
@@ -53,6 +60,10 @@ def log_run(
         query_category_conf=query_category_conf,
         routing_efficient=routing_efficient,
         counterfactual_cost_usd=counterfactual_cost_usd,
+        hedged=hedged,
+        hedge_cost_usd=hedge_cost_usd,
+        attempt_count=attempt_count,
+        stage_timings=stage_timings,
     )
     db.add(run)
     db.commit()
@@ -60,6 +71,27 @@ def log_run(
     return run
 
 
+def log_runs_bulk(db: Session, rows: List[Dict[str, Any]], *, commit: bool = True) -> int:
+    """
+    Insert many runs with one executemany INSERT. Each row takes the same
+    keyword fields as `log_run`; savings are derived the same way.
+    """
+    if not rows:
+        return 0
+    values = _bulk_values(rows)
+    db.execute(insert(RouterRun), values)
+    if commit:
+        db.commit()
+    return len(values)
+
+
+def _bulk_values(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {**row, "savings_usd": row["baseline_cost_usd"] - row["cost_usd"]}
+        for row in rows
+    ]
+
+
 def get_summary(db: Session) -> Dict[str, Any]:
     base = db.query(RouterRun)
     total_runs = base.count()
@@ -188,32 +220,54 @@ def list_runs(db: Session, *, offset: int, limit: int) -> Dict[str, Any]:
     rows: List[RouterRun] = (
         base.order_by(desc(RouterRun.created_at)).offset(offset).limit(limit).all()
     )
+    items = [_run_item(row) for row in rows]
+    return {"total": total, "offset": offset, "limit": limit, "items": items}
 
-    items = [
-        {
-            "id": row.id,
-            "timestamp": row.created_at.timestamp(),
-            "band": row.band,
-            "provider": row.provider,
-            "model": row.model,
-            "latency_ms": row.latency_ms,
-            "router_latency_ms": row.router_latency_ms,
-            "provider_latency_ms": row.provider_latency_ms,
-            "processing_latency_ms": row.processing_latency_ms,
-            "prompt_tokens": row.prompt_tokens,
-            "completion_tokens": row.completion_tokens,
-            "cost_usd": row.cost_usd,
-            "baseline_cost_usd": row.baseline_cost_usd,
-            "savings_usd": row.savings_usd,
-            "alri_score": row.alri_score,
-            "alri_tier": row.alri_tier,
-            "status": row.status,
-            "routing_efficient": row.routing_efficient,
-            "query_category": row.query_category,
-            "query_category_conf": row.query_category_conf,
-            "counterfactual_cost_usd": row.counterfactual_cost_usd,
-        }
-        for row in rows
-    ]
 
-    return {"total": total, "offset": offset, "limit": limit, "items": items}
+async def list_runs_async(db: AsyncSession, *, offset: int, limit: int) -> Dict[str, Any]:
+    """`list_runs` on an async session."""
+    total = await db.scalar(select(func.count()).select_from(RouterRun))
+    rows = await db.scalars(
+        select(RouterRun).order_by(desc(RouterRun.created_at)).offset(offset).limit(limit)
+    )
+    items = [_run_item(row) for row in rows]
+    return {"total": total or 0, "offset": offset, "limit": limit, "items": items}
+
+
+async def get_summary_async(db: AsyncSession) -> Dict[str, Any]:
+    """
+    `get_summary` on an async session. The aggregation is a dozen ORM
+    queries; run_sync executes them over the async connection without
+    blocking the event loop, so the two versions cannot drift apart.
+    """
+    return await db.run_sync(get_summary)
+
+
+def _run_item(row: RouterRun) -> Dict[str, Any]:
+    return {
+        "id": row.id,
+        "timestamp": row.created_at.timestamp(),
+        "band": row.band,
+        "provider": row.provider,
+        "model": row.model,
+        "latency_ms": row.latency_ms,
+        "router_latency_ms": row.router_latency_ms,
+        "provider_latency_ms": row.provider_latency_ms,
+        "processing_latency_ms": row.processing_latency_ms,
+        "prompt_tokens": row.prompt_tokens,
+        "completion_tokens": row.completion_tokens,
+        "cost_usd": row.cost_usd,
+        "baseline_cost_usd": row.baseline_cost_usd,
+        "savings_usd": row.savings_usd,
+        "alri_score": row.alri_score,
+        "alri_tier": row.alri_tier,
+        "status": row.status,
+        "routing_efficient": row.routing_efficient,
+        "query_category": row.query_category,
+        "query_category_conf": row.query_category_conf,
+        "counterfactual_cost_usd": row.counterfactual_cost_usd,
+        "hedged": row.hedged,
+        "hedge_cost_usd": row.hedge_cost_usd,
+        "attempt_count": row.attempt_count,
+        "stage_timings": row.stage_timings,
+    }
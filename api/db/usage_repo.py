@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import uuid
+from datetime import date
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from .models import TenantDailyUsage
+
+
+def _insert(db: Session):
+    dialect = db.get_bind().dialect.name
+    return sqlite_insert if dialect == "sqlite" else pg_insert
+
+
+def add_daily_requests(db: Session, deltas: Dict[Tuple[str, str], int]) -> None:
+    """Atomically add request counts per (tenant_id, YYYY-MM-DD)."""
+    if not deltas:
+        return
+    insert = _insert(db)
+    for (tenant_id, day), count in deltas.items():
+        stmt = insert(TenantDailyUsage).values(
+            tenant_id=uuid.UUID(str(tenant_id)),
+            day=date.fromisoformat(day),
+            request_count=count,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TenantDailyUsage.tenant_id, TenantDailyUsage.day],
+            set_={
+                "request_count": TenantDailyUsage.request_count + stmt.excluded.request_count,
+                "updated_at": func.now(),
+            },
+        )
+        db.execute(stmt)
+    db.commit()
+
+
+def daily_totals(db: Session, day: str, tenant_ids: Iterable[str]) -> Dict[str, int]:
+    ids = [uuid.UUID(str(tenant_id)) for tenant_id in tenant_ids]
+    if not ids:
+        return {}
+    rows = db.execute(
+        select(TenantDailyUsage.tenant_id, TenantDailyUsage.request_count).where(
+            TenantDailyUsage.day == date.fromisoformat(day),
+            TenantDailyUsage.tenant_id.in_(ids),
+        )
+    ).all()
+    return {str(tenant_id): int(count or 0) for tenant_id, count in rows}
@@ -1,24 +1,86 @@
+import hmac
 import os
 import uuid
+from typing import Iterator, Optional
 
 from fastapi import Depends, Header, HTTPException, status
 from sqlalchemy.orm import Session
 
 from config.router import get_router_mode, RouterMode
 from db.session import get_db
+from logger import log_event
+from ratelimit import run_limiter
+from ratelimit.adaptive import Permit
 from models.tenant import Tenant, TenantStatus
+from tracing import span, stage
 
 
 DEFAULT_TENANT_ID = os.getenv(
     "AGENTICLABS_DEFAULT_TENANT_ID",
     "00000000-0000-0000-0000-000000000001",
 )
+ADMIN_TOKEN = os.getenv("AGENTICLABS_ADMIN_TOKEN")
+ADAPTIVE_LIMIT_ENABLED = os.getenv("AGENTICLABS_ADAPTIVE_LIMIT_ENABLED", "1").lower() not in {"0", "false", "no"}
 
 
 def get_router_mode_dep() -> RouterMode:
     return get_router_mode()
 
 
+def _acquire_run_permit() -> Permit:
+    permit = run_limiter.try_acquire()
+    if permit is None:
+        log_event("run_shed", {"limit": run_limiter.limit})
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is at capacity, retry shortly",
+            headers={"Retry-After": str(run_limiter.retry_after_s())},
+        )
+    return permit
+
+
+def run_admission_dep() -> Iterator[None]:
+    """
+    Adaptive concurrency gate for /v1/run. Declare it before any dependency
+    that touches the database so rejected requests never take a connection.
+    """
+    if not ADAPTIVE_LIMIT_ENABLED:
+        yield
+        return
+    permit = _acquire_run_permit()
+    try:
+        yield
+    except HTTPException as exc:
+        # Client errors return fast and say nothing about capacity.
+        permit.release(dropped=exc.status_code >= 500, sample=exc.status_code >= 500)
+        raise
+    except Exception:
+        permit.release(dropped=True)
+        raise
+    permit.release()
+
+
+def batch_admission_dep() -> Iterator[Optional[Permit]]:
+    """
+    Adaptive concurrency gate for /v1/run/batch. The handler returns before
+    the batch runs, so on success the permit is handed to the response
+    stream, which releases it when streaming ends. A batch's duration says
+    nothing about per-request latency; it is never taken as a sample.
+    """
+    if not ADAPTIVE_LIMIT_ENABLED:
+        yield None
+        return
+    permit = _acquire_run_permit()
+    try:
+        yield permit
+    except HTTPException as exc:
+        permit.release(dropped=exc.status_code >= 500, sample=False)
+        raise
+    except Exception:
+        permit.release(dropped=True, sample=False)
+        raise
+
+
 def _load_tenant(db: Session, identifier: str) -> Tenant | None:
     ident = identifier.strip().lower()
     tenant = None
@@ -45,7 +107,8 @@ def get_tenant_dep(
             detail="Tenant header missing",
         )
 
-    tenant = _load_tenant(db, tenant_identifier)
+    with span("tenant.load"), stage("tenant"):
+        tenant = _load_tenant(db, tenant_identifier)
     if not tenant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -57,3 +120,16 @@ def get_tenant_dep(
             detail="Tenant is suspended",
         )
     return tenant
+
+
+def require_admin(admin_token: str | None = Header(None, alias="X-Admin-Token")) -> None:
+    if not ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin API is disabled (AGENTICLABS_ADMIN_TOKEN not set)",
+        )
+    if not admin_token or not hmac.compare_digest(admin_token, ADMIN_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid admin token",
+        )
@@ -0,0 +1,139 @@
+"""
+Import-time budget check for the API entrypoint.
+
+    cd api && python -m import_budget                  # report only
+    cd api && python -m import_budget --budget-ms 1200 # exit 1 when over
+
+Imports the target module (default `main`) in a fresh interpreter under
+`python -X importtime`, reports the slowest modules by self time, and fails
+when the cumulative import time exceeds the budget or when a module that
+must stay lazy (vendor SDKs; see providers.registry) was imported. Timing
+is the best of `--repeat` runs since a cold disk cache dominates the first.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+API_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Vendor SDKs only the lazily-loaded provider adapters may import.
+LAZY_MODULES = ("anthropic", "google.generativeai", "google.ai.generativelanguage")
+
+DEFAULT_BUDGET_MS = float(os.getenv("AGENTICLABS_IMPORT_BUDGET_MS", "1500"))
+
+
+@dataclass
+class ImportRow:
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+@dataclass
+class ImportProfile:
+    target: str
+    rows: List[ImportRow] = field(default_factory=list)
+
+    @classmethod
+    def parse(cls, target: str, stderr: str) -> "ImportProfile":
+        rows = []
+        for line in stderr.splitlines():
+            if not line.startswith("import time:"):
+                continue
+            parts = line[len("import time:"):].split("|")
+            if len(parts) != 3 or not parts[0].strip().isdigit():
+                continue  # the header row
+            rows.append(ImportRow(parts[2].strip(), int(parts[0]), int(parts[1])))
+        return cls(target=target, rows=rows)
+
+    @property
+    def total_ms(self) -> float:
+        for row in self.rows:
+            if row.module == self.target:
+                return row.cumulative_us / 1000.0
+        return sum(row.self_us for row in self.rows) / 1000.0
+
+    def imported(self, prefix: str) -> bool:
+        return any(row.module == prefix or row.module.startswith(prefix + ".") for row in self.rows)
+
+    def slowest(self, n: int = 15) -> List[ImportRow]:
+        return sorted(self.rows, key=lambda row: row.self_us, reverse=True)[:n]
+
+
+def measure(target: str = "main", *, python: str = sys.executable, cwd: str = API_ROOT) -> ImportProfile:
+    """Import `target` in a fresh interpreter and parse its -X importtime report."""
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {target}"],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        tail = proc.stderr.strip().splitlines()[-1:] or ["(no output)"]
+        raise RuntimeError(f"importing {target!r} failed: {tail[0]}")
+    return ImportProfile.parse(target, proc.stderr)
+
+
+def check(
+    profile: ImportProfile,
+    *,
+    budget_ms: Optional[float] = None,
+    forbidden: Sequence[str] = LAZY_MODULES,
+) -> List[str]:
+    """Budget and laziness violations, as messages. Empty means the check passed."""
+    problems = [f"{name} imported eagerly" for name in forbidden if profile.imported(name)]
+    if budget_ms is not None and profile.total_ms > budget_ms:
+        problems.append(f"import {profile.target} took {profile.total_ms:.0f}ms (budget {budget_ms:.0f}ms)")
+    return problems
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="import_budget", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--module", default="main", help="module to import (default: main)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--forbid", action="append", default=None, help="module that must not be imported (repeatable)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs; the fastest is reported")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    profiles = [measure(args.module) for _ in range(max(1, args.repeat))]
+    profile = min(profiles, key=lambda p: p.total_ms)
+    forbidden = tuple(args.forbid) if args.forbid else LAZY_MODULES
+    problems = check(profile, budget_ms=args.budget_ms, forbidden=forbidden)
+
+    slowest = [
+        {"module": row.module, "self_ms": round(row.self_us / 1000, 1), "cumulative_ms": round(row.cumulative_us / 1000, 1)}
+        for row in profile.slowest(args.top)
+    ]
+    report: Dict[str, object] = {
+        "module": args.module,
+        "total_ms": round(profile.total_ms, 1),
+        "budget_ms": args.budget_ms,
+        "runs_ms": [round(p.total_ms, 1) for p in profiles],
+        "slowest": slowest,
+        "problems": problems,
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"import {args.module}: {report['total_ms']}ms (budget {args.budget_ms:.0f}ms, runs {report['runs_ms']})")
+        print(f"{'self ms':>9} {'cum ms':>9}  module")
+        for row in slowest:
+            print(f"{row['self_ms']:>9} {row['cumulative_ms']:>9}  {row['module']}")
+        for problem in problems:
+            print(f"FAIL: {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
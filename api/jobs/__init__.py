@@ -0,0 +1,14 @@
+"""
+Deferred runs: `/v1/jobs` enqueues into the `run_jobs` table and
+`job_workers` drains it in the background. `AGENTICLABS_JOB_WORKERS=0`
+disables the workers in this process (e.g. API-only replicas).
+"""
+
+from __future__ import annotations
+
+from .webhook import deliver_webhook
+from .worker import JobWorkerPool
+
+job_workers = JobWorkerPool.from_env()
+
+__all__ = ["JobWorkerPool", "deliver_webhook", "job_workers"]
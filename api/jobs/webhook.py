@@ -0,0 +1,121 @@
+"""
+Job completion callbacks.
+
+The body is the job as returned by `GET /v1/jobs/{id}`. With
+`AGENTICLABS_WEBHOOK_SECRET` set, requests carry
+`X-AgenticLabs-Signature: sha256=<hex HMAC of the body>`.
+
+Callback URLs are tenant input, so they are checked when the job is
+submitted and again right before delivery (`check_callback_url`): https
+only, and every address the host resolves to must be public, so a callback
+cannot reach loopback, private, link-local (cloud metadata) or other
+internal addresses. Redirects are not followed. Set
+AGENTICLABS_WEBHOOK_ALLOWED_HOSTS=hooks.example.com,.partner.io to accept
+only those hosts (a leading dot admits subdomains), and
+AGENTICLABS_WEBHOOK_ALLOW_INSECURE=1 to allow http and internal addresses in
+local development.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import ipaddress
+import json
+import os
+import socket
+import time
+from typing import Any, Callable, Dict, Sequence
+from urllib.parse import urlsplit
+
+import requests
+
+WEBHOOK_SECRET = os.getenv("AGENTICLABS_WEBHOOK_SECRET")
+WEBHOOK_TIMEOUT_S = float(os.getenv("AGENTICLABS_WEBHOOK_TIMEOUT_S", "5"))
+WEBHOOK_ALLOWED_HOSTS = tuple(
+    host.strip().lower() for host in os.getenv("AGENTICLABS_WEBHOOK_ALLOWED_HOSTS", "").split(",") if host.strip()
+)
+WEBHOOK_ALLOW_INSECURE = os.getenv("AGENTICLABS_WEBHOOK_ALLOW_INSECURE", "0").lower() in {"1", "true", "yes"}
+
+
+class UnsafeCallbackURL(ValueError):
+    """A callback URL that webhooks must not be sent to."""
+
+
+def _host_allowed(host: str, allowed: Sequence[str]) -> bool:
+    return any(host == entry or (entry.startswith(".") and host.endswith(entry)) for entry in allowed)
+
+
+def check_callback_url(
+    url: str,
+    *,
+    allowed_hosts: Sequence[str] = WEBHOOK_ALLOWED_HOSTS,
+    allow_insecure: bool = WEBHOOK_ALLOW_INSECURE,
+    resolve: Callable[..., Any] = socket.getaddrinfo,
+) -> None:
+    """Raise UnsafeCallbackURL unless `url` is https and resolves only to public addresses."""
+    parts = urlsplit(url)
+    if parts.scheme != "https" and not (allow_insecure and parts.scheme == "http"):
+        raise UnsafeCallbackURL("callback_url must use https")
+    host = (parts.hostname or "").lower()
+    if not host:
+        raise UnsafeCallbackURL("callback_url has no host")
+    if allowed_hosts and not _host_allowed(host, allowed_hosts):
+        raise UnsafeCallbackURL("callback_url host is not on the allow-list")
+    if allow_insecure:
+        return
+    try:
+        port = parts.port or 443
+        infos = resolve(host, port, proto=socket.IPPROTO_TCP)
+    except (OSError, ValueError) as exc:
+        raise UnsafeCallbackURL(f"callback_url host does not resolve: {exc}") from exc
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%", 1)[0])
+        if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped is not None:
+            address = address.ipv4_mapped
+        if not address.is_global or address.is_multicast:
+            raise UnsafeCallbackURL("callback_url resolves to a non-public address")
+
+
+def sign(body: bytes, secret: str) -> str:
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def deliver_webhook(
+    url: str,
+    body: Dict[str, Any],
+    *,
+    secret: str | None = WEBHOOK_SECRET,
+    attempts: int = 3,
+    timeout_s: float = WEBHOOK_TIMEOUT_S,
+    sleep: Callable[[float], None] = time.sleep,
+) -> str:
+    """POST the body, retrying network errors, 408/429 and 5xx. Returns a status label."""
+    try:
+        # Again at delivery: DNS may have changed since the job was accepted.
+        check_callback_url(url)
+    except UnsafeCallbackURL:
+        return "blocked"
+    data = json.dumps(body, default=str).encode()
+    headers = {"Content-Type": "application/json"}
+    if secret:
+        headers["X-AgenticLabs-Signature"] = sign(data, secret)
+    outcome = "not_sent"
+    for attempt in range(max(1, attempts)):
+        if attempt:
+            sleep(min(2.0 ** attempt, 10.0))
+        try:
+            resp = requests.post(url, data=data, headers=headers, timeout=timeout_s, allow_redirects=False)
+        except requests.RequestException:
+            outcome = "error"
+            continue
+        if resp.status_code < 300:
+            return "delivered"
+        # 3xx is reported, not followed: the target could be anywhere.
+        outcome = f"http_{resp.status_code}"
+        if resp.status_code < 500 and resp.status_code not in (408, 429):
+            break
+    return outcome
+
+
+__all__ = ["UnsafeCallbackURL", "check_callback_url", "deliver_webhook", "sign"]
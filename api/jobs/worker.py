@@ -0,0 +1,300 @@
+"""
+Workers that drain the `run_jobs` queue.
+
+Each worker claims one due job at a time (`FOR UPDATE SKIP LOCKED`, so any
+number of API processes can run workers) and runs it through the same
+pipeline as /v1/run: tenant rate limits, fair scheduling as a low-weight
+background flow, provider bulkheads and failover. Workers only claim while
+the fair scheduler is below `max_utilization`, so jobs fill spare capacity
+instead of competing with interactive traffic.
+
+Rate-limited jobs are deferred until their Retry-After without using an
+attempt; provider unavailability is retried with backoff up to
+`max_attempts`; any other error fails the job. A job whose worker died is
+requeued when its lease expires, which also uses an attempt. A result is
+recorded only by the worker still holding the job, in the same commit as
+its run row. Finished jobs with a callback URL get a webhook, delivered from a small pool of its own so a
+slow endpoint never holds up a worker.
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+from fastapi import HTTPException
+
+from config.router import RouterMode, get_router_mode
+from logger import log_event
+from ratelimit import fair_scheduler
+from tracing import span
+
+from .webhook import deliver_webhook
+
+RETRYABLE_STATUS = {429, 502, 503, 504}
+
+
+class JobWorkerPool:
+    def __init__(
+        self,
+        *,
+        workers: int = 2,
+        poll_interval_s: float = 1.0,
+        max_attempts: int = 5,
+        lease_s: float = 600.0,
+        max_utilization: float = 0.75,
+        retry_base_s: float = 5.0,
+        webhook_workers: int = 2,
+        session_factory: Callable[[], Any] | None = None,
+    ) -> None:
+        self.workers = max(0, workers)
+        self.poll_interval_s = max(0.05, poll_interval_s)
+        self.max_attempts = max(1, max_attempts)
+        self.lease_s = lease_s
+        self.max_utilization = max_utilization
+        self.retry_base_s = retry_base_s
+        self._session_factory = session_factory
+        self.webhook_workers = max(1, webhook_workers)
+        self._webhooks: ThreadPoolExecutor | None = None
+        self._webhooks_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._sweep_lock = threading.Lock()
+        self._last_sweep = 0.0
+        self._worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+    @classmethod
+    def from_env(cls) -> "JobWorkerPool":
+        return cls(
+            workers=int(os.getenv("AGENTICLABS_JOB_WORKERS", "2")),
+            poll_interval_s=float(os.getenv("AGENTICLABS_JOB_POLL_INTERVAL_S", "1")),
+            max_attempts=int(os.getenv("AGENTICLABS_JOB_MAX_ATTEMPTS", "5")),
+            lease_s=float(os.getenv("AGENTICLABS_JOB_LEASE_S", "600")),
+            max_utilization=float(os.getenv("AGENTICLABS_JOB_MAX_UTILIZATION", "0.75")),
+            webhook_workers=int(os.getenv("AGENTICLABS_WEBHOOK_WORKERS", "2")),
+        )
+
+    def _session(self):
+        if self._session_factory is None:
+            from db.session import SessionLocal
+
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def retry_in_s(self, exc: HTTPException, attempts: int) -> float | None:
+        if exc.status_code not in RETRYABLE_STATUS:
+            return None
+        retry_after = (exc.headers or {}).get("Retry-After")
+        if retry_after:
+            return float(retry_after)
+        return min(self.retry_base_s * 2 ** attempts, 300.0)
+
+    def run_once(self, worker_id: str = "inline") -> bool:
+        """Claim and run one due job. Returns False when there was nothing to do."""
+        from db.jobs_repo import claim_jobs
+
+        if fair_scheduler.utilization >= self.max_utilization:
+            return False
+        db = self._session()
+        try:
+            jobs = claim_jobs(db, worker_id, limit=1)
+            if not jobs:
+                return False
+            self._process(db, jobs[0], worker_id)
+            return True
+        finally:
+            db.close()
+
+    def _process(self, db, job, worker_id: str) -> None:
+        from db.jobs_repo import JOB_FAILED, JOB_SUCCEEDED, fail_job
+        from models.tenant import Tenant, TenantStatus
+        from run_pipeline import execute_run, finalize_run, prepare_run
+        from shared.jobs import JobRead
+        from shared.models import RunRequest
+
+        job_id = str(job.id)
+        t0 = time.perf_counter()
+        # Whether this worker left the job finished. A requeued job, or one
+        # another worker took over after our lease expired, gets no webhook.
+        settled = True
+        with span("job.run", job_id=job_id):
+            tenant = db.get(Tenant, job.tenant_id)
+            try:
+                if tenant is None or tenant.status != TenantStatus.ACTIVE:
+                    raise HTTPException(status_code=403, detail="Tenant is not active")
+                try:
+                    router_mode = RouterMode(job.router_mode)
+                except ValueError:
+                    router_mode = get_router_mode()
+                prepared = prepare_run(RunRequest(**job.payload), tenant, router_mode)
+                finalized = finalize_run(execute_run(prepared, tenant, background=True), tenant)
+            except HTTPException as exc:
+                db.rollback()
+                requeued = fail_job(
+                    db,
+                    job,
+                    error={"status_code": exc.status_code, "detail": exc.detail},
+                    retry_in_s=self.retry_in_s(exc, job.attempts or 0),
+                    count_attempt=exc.status_code != 429,
+                    max_attempts=self.max_attempts,
+                )
+                settled = not requeued
+                log_event("job_failed", {
+                    "job_id": job_id,
+                    "status_code": exc.status_code,
+                    "requeued": requeued,
+                    "attempts": job.attempts,
+                })
+            except Exception as exc:
+                db.rollback()
+                fail_job(
+                    db,
+                    job,
+                    error={"status_code": 500, "detail": str(exc)[:500]},
+                    max_attempts=self.max_attempts,
+                )
+                log_event("job_failed", {"job_id": job_id, "status_code": 500, "error": str(exc)[:300]})
+            else:
+                outcome = self._record(db, job, worker_id, tenant, prepared.rid, finalized)
+                settled = outcome in (JOB_SUCCEEDED, JOB_FAILED)
+                if outcome == JOB_SUCCEEDED:
+                    log_event("job_succeeded", {
+                        "job_id": job_id,
+                        "run_id": prepared.rid,
+                        "latency_ms": round((time.perf_counter() - t0) * 1000.0, 2),
+                    })
+
+        if job.callback_url and settled:
+            body = JobRead.model_validate(job).model_dump(mode="json")
+            self._webhook_pool().submit(self._send_webhook, job.id, job.callback_url, body)
+
+    def _webhook_pool(self) -> ThreadPoolExecutor:
+        with self._webhooks_lock:
+            if self._webhooks is None:
+                self._webhooks = ThreadPoolExecutor(
+                    max_workers=self.webhook_workers, thread_name_prefix="agenticlabs-webhook"
+                )
+            return self._webhooks
+
+    def _send_webhook(self, job_id: Any, url: str, body: Dict[str, Any]) -> None:
+        from db.jobs_repo import set_webhook_status
+        from db.models import RunJob
+
+        outcome = deliver_webhook(url, body)
+        db = self._session()
+        try:
+            job = db.get(RunJob, job_id)
+            if job is not None:
+                set_webhook_status(db, job, outcome)
+        except Exception as exc:
+            db.rollback()
+            log_event("job_webhook_status_failed", {"job_id": str(job_id), "error": str(exc)[:300]})
+        finally:
+            db.close()
+        log_event("job_webhook", {"job_id": str(job_id), "outcome": outcome})
+
+    def _record(self, db, job, worker_id: str, tenant, run_id: str, finalized) -> str | None:
+        """
+        Write the run, the tenant's usage and the job's result in one commit,
+        so a failure leaves none of them behind and a retry records the job
+        once. Returns the job's new status, or None if the lease was lost.
+        """
+        from db.jobs_repo import JOB_FAILED, JOB_QUEUED, JOB_SUCCEEDED, complete_job, fail_job
+        from run_pipeline import persist_runs
+
+        job_id = str(job.id)
+        try:
+            owned = complete_job(
+                db,
+                job,
+                worker_id=worker_id,
+                run_id=run_id,
+                result=finalized.response.model_dump(),
+                commit=False,
+            )
+            if not owned:
+                db.rollback()
+                log_event("job_lease_lost", {"job_id": job_id, "run_id": run_id, "worker": worker_id})
+                return None
+            persist_runs(db, tenant, [finalized])
+            return JOB_SUCCEEDED
+        except Exception as exc:
+            db.rollback()
+            log_event("job_record_failed", {"job_id": job_id, "run_id": run_id, "error": str(exc)[:300]})
+        # The provider call already happened; retrying costs another one, so
+        # this uses an attempt like any other failure.
+        requeued = fail_job(
+            db,
+            job,
+            error={"status_code": 500, "detail": "Could not record the result"},
+            retry_in_s=min(self.retry_base_s * 2 ** (job.attempts or 0), 300.0),
+            max_attempts=self.max_attempts,
+        )
+        log_event("job_failed", {"job_id": job_id, "status_code": 500, "requeued": requeued, "attempts": job.attempts})
+        return JOB_QUEUED if requeued else JOB_FAILED
+
+    def _sweep(self) -> None:
+        from db.jobs_repo import requeue_stale
+
+        now = time.monotonic()
+        with self._sweep_lock:
+            if now - self._last_sweep < self.lease_s / 2:
+                return
+            self._last_sweep = now
+        db = self._session()
+        try:
+            requeued, failed = requeue_stale(db, self.lease_s, max_attempts=self.max_attempts)
+        except Exception as exc:
+            db.rollback()
+            log_event("job_sweep_failed", {"error": str(exc)[:300]})
+            return
+        finally:
+            db.close()
+        if requeued or failed:
+            log_event("job_requeued_stale", {"count": requeued, "failed": failed})
+
+    def _run(self, worker_id: str) -> None:
+        while not self._stop.is_set():
+            self._sweep()
+            try:
+                busy = self.run_once(worker_id)
+            except Exception as exc:
+                log_event("job_worker_error", {"worker": worker_id, "error": str(exc)[:300]})
+                busy = False
+            if not busy:
+                self._stop.wait(self.poll_interval_s)
+
+    def start(self) -> None:
+        if self._threads or not self.workers:
+            return
+        self._stop.clear()
+        self._last_sweep = 0.0
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._run,
+                args=(f"{self._worker_prefix}:{index}",),
+                name=f"agenticlabs-job-worker-{index}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout_s: float = 30.0) -> None:
+        """Stop claiming jobs and wait for in-progress ones to finish."""
+        self._stop.set()
+        deadline = time.monotonic() + timeout_s
+        for thread in self._threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        self._threads = []
+        with self._webhooks_lock:
+            webhooks, self._webhooks = self._webhooks, None
+        if webhooks is not None:
+            # Deliveries already queued still go out; nothing new is accepted.
+            webhooks.shutdown(wait=True)
+
+
+__all__ = ["JobWorkerPool", "RETRYABLE_STATUS"]
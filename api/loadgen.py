@@ -0,0 +1,497 @@
+"""
+Async HTTP load generator for the router API.
+
+Closed loop (N workers, each sending back to back, optionally ramped up):
+
+    python -m loadgen --url http://localhost:8000 --concurrency 64 --ramp-s 60 --duration-s 120
+
+Open loop (arrivals at a target rate whether or not earlier requests have
+finished; latency counts from the scheduled send time, so a stalled server
+shows up as latency instead of silently lowering the offered load):
+
+    python -m loadgen --rps 200 --ramp-s 30 --duration-s 90 --arrivals poisson
+
+Traffic mixes tenants (`--tenant ID[=WEIGHT]`, repeatable) and prompt
+categories (`--categories coding=3,finance=1,...`, or `--prompts file.jsonl`
+with {"prompt", "category"} lines). `--endpoint batch --batch-size K`
+sends /v1/run/batch requests and reads the NDJSON stream as it arrives;
+time to first byte and total latency are recorded either way.
+
+The report has HDR-style latency histograms (bounded relative error, not
+sampled), status and error counts, billed cost, and one row per
+`--interval-s` window, which shows where throughput stops growing while a
+ramp raises load. `--json` writes the report, `--csv` one row per request.
+
+To measure capacity per worker without provider latency or spend, run one
+API worker against the stub provider or `mock_llm_server` (see
+providers.synthetic for latency profiles) and ramp until p99 bends.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import json
+import math
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+PROMPTS: Dict[str, List[str]] = {
+    "general": [
+        "Explain quantum entanglement using 5 different analogies and compare how accurate each analogy is.",
+        "Explain the concept of causal inference vs correlation using 3 business examples: marketing, fraud, and HR analytics.",
+        "Explain vector databases to a non-technical CFO using 3 analogies and a concrete ROI example.",
+    ],
+    "coding": [
+        "Write a python function that merges two sorted lists without using sort().",
+        "Act as a staff engineer. Propose a high-level architecture for an AI-powered customer support router, including data stores and observability.",
+        "Compare transformers, RNNs, and gradient boosted trees for credit risk modeling. When would you choose each and why?",
+    ],
+    "finance": [
+        "Explain how Monte Carlo simulation can be used for portfolio risk and what its main limitations are.",
+        "Given a SaaS startup with churn of 4%/month and CAC of $500, outline 3 retention experiments and how you'd measure them.",
+    ],
+    "compliance": [
+        "Design a 3-step decision tree for a bank's fraud detection workflow and explain the trade-offs at each node.",
+        "For a KYC process in online gambling, outline a risk-based scoring model and how AI could make it adaptive over time.",
+    ],
+    "creative": [
+        "Write a four-line poem about a router that always picks the cheapest model.",
+        "Draft a friendly product announcement for a new analytics dashboard.",
+    ],
+}
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram in the style of HdrHistogram: values below
+    2**(precision_bits+1) are exact, larger ones keep their top
+    precision_bits+1 bits, so every bucket is within 1/2**precision_bits of
+    its values. Percentiles report the bucket's highest equivalent value.
+    """
+
+    def __init__(self, precision_bits: int = 7) -> None:
+        self.precision_bits = precision_bits
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def _shift(self, value: int) -> int:
+        return max(0, value.bit_length() - self.precision_bits - 1)
+
+    def record(self, value: float) -> None:
+        v = max(0, int(value))
+        shift = self._shift(v)
+        bucket = (v >> shift) << shift
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += v
+        self.min = v if self.min is None else min(self.min, v)
+        self.max = v if self.max is None else max(self.max, v)
+
+    def percentile(self, p: float) -> int:
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(p / 100.0 * self.count))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(bucket + (1 << self._shift(bucket)) - 1, self.max or bucket)
+        return self.max or 0
+
+    def summary(self, percentiles: Sequence[float] = (50, 90, 95, 99, 99.9)) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "min": self.min or 0,
+            "mean": round(self.total / self.count, 1) if self.count else 0.0,
+            "max": self.max or 0,
+            **{f"p{p:g}": self.percentile(p) for p in percentiles},
+        }
+
+
+@dataclass
+class Sample:
+    start_s: float
+    tenant: str
+    category: str
+    status: int
+    latency_us: int
+    ttfb_us: int
+    items: int = 1
+    failed_items: int = 0
+    cost_usd: float = 0.0
+    provider: str = ""
+    model: str = ""
+    error: str = ""
+
+
+@dataclass
+class Recorder:
+    interval_s: float
+    samples: List[Sample] = field(default_factory=list)
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    ttfb: LatencyHistogram = field(default_factory=LatencyHistogram)
+    windows: Dict[int, Tuple[LatencyHistogram, Dict[str, int]]] = field(default_factory=dict)
+    in_flight: int = 0
+    dropped: int = 0
+
+    def add(self, sample: Sample) -> None:
+        self.samples.append(sample)
+        self.latency.record(sample.latency_us)
+        self.ttfb.record(sample.ttfb_us)
+        window = int((sample.start_s + sample.latency_us / 1e6) // self.interval_s)
+        hist, counters = self.windows.setdefault(window, (LatencyHistogram(), {"ok": 0, "errors": 0, "peak_in_flight": 0}))
+        hist.record(sample.latency_us)
+        counters["ok" if 200 <= sample.status < 300 and not sample.failed_items else "errors"] += 1
+        counters["peak_in_flight"] = max(counters["peak_in_flight"], self.in_flight + 1)
+
+
+@dataclass
+class Workload:
+    tenants: List[Tuple[str, float]]
+    categories: List[Tuple[str, float]]
+    prompts: Dict[str, List[str]]
+    endpoint: str = "run"
+    batch_size: int = 1
+    agent_id: str = "loadgen"
+
+    def pick(self, rng: random.Random) -> Tuple[str, str, List[str]]:
+        tenant = rng.choices([t for t, _ in self.tenants], [w for _, w in self.tenants])[0]
+        category = rng.choices([c for c, _ in self.categories], [w for _, w in self.categories])[0]
+        pool = self.prompts[category]
+        return tenant, category, [rng.choice(pool) for _ in range(self.batch_size)]
+
+    def request(self, prompts: List[str]) -> Tuple[str, Dict[str, Any]]:
+        items = [{"prompt": p, "agent_id": self.agent_id} for p in prompts]
+        if self.endpoint == "batch":
+            return "/v1/run/batch", {"items": items}
+        return "/v1/run", items[0]
+
+
+async def send(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    recorder: Recorder,
+    rng: random.Random,
+    t0: float,
+    scheduled: float | None = None,
+) -> None:
+    """One request. Open-loop callers pass the scheduled start so queueing delay counts."""
+    tenant, category, prompts = workload.pick(rng)
+    path, body = workload.request(prompts)
+    start = scheduled if scheduled is not None else time.perf_counter()
+    sample = Sample(start_s=start - t0, tenant=tenant, category=category, status=0, latency_us=0, ttfb_us=0, items=len(prompts))
+    recorder.in_flight += 1
+    try:
+        async with client.stream("POST", path, json=body, headers={"X-Agentic-Tenant-Id": tenant}) as resp:
+            sample.status = resp.status_code
+            first = None
+            lines: List[Dict[str, Any]] = []
+            async for line in resp.aiter_lines():
+                if first is None:
+                    first = time.perf_counter()
+                if line.strip():
+                    try:
+                        lines.append(json.loads(line))
+                    except ValueError:
+                        pass
+            end = time.perf_counter()
+            sample.ttfb_us = int(((first or end) - start) * 1e6)
+            sample.latency_us = int((end - start) * 1e6)
+            _read_result(sample, lines)
+    except httpx.HTTPError as exc:
+        end = time.perf_counter()
+        sample.latency_us = sample.ttfb_us = int((end - start) * 1e6)
+        sample.error = type(exc).__name__
+    finally:
+        recorder.in_flight -= 1
+    recorder.add(sample)
+
+
+def _read_result(sample: Sample, lines: List[Dict[str, Any]]) -> None:
+    if not lines:
+        return
+    if sample.status >= 400:
+        sample.error = str(lines[0].get("detail", ""))[:200]
+        return
+    if lines[-1].get("status") == "summary":
+        # /v1/run/batch: one line per item, then the summary.
+        results = [line.get("result") for line in lines if line.get("status") == "ok"]
+        sample.failed_items = sum(1 for line in lines if line.get("status") == "error")
+    else:
+        results = lines[:1]
+    results = [r for r in results if isinstance(r, dict)]
+    sample.cost_usd = sum(float((r.get("metrics") or {}).get("cost_usd") or 0.0) for r in results)
+    if results:
+        provenance = results[-1].get("provenance") or {}
+        sample.provider = str(provenance.get("provider", ""))
+        sample.model = str(provenance.get("model", ""))
+
+
+async def closed_loop(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    recorder: Recorder,
+    *,
+    concurrency: int,
+    ramp_s: float,
+    duration_s: float,
+    max_requests: int | None,
+    seed: int | None,
+) -> None:
+    t0 = time.perf_counter()
+    deadline = t0 + duration_s
+    sent = 0
+
+    async def worker(index: int) -> None:
+        nonlocal sent
+        rng = random.Random(None if seed is None else seed + index)
+        # Worker i joins at i/concurrency of the ramp.
+        if ramp_s > 0:
+            await asyncio.sleep(ramp_s * index / concurrency)
+        while time.perf_counter() < deadline and (max_requests is None or sent < max_requests):
+            sent += 1
+            await send(client, workload, recorder, rng, t0)
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+
+
+async def open_loop(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    recorder: Recorder,
+    *,
+    rps: float,
+    ramp_s: float,
+    duration_s: float,
+    max_requests: int | None,
+    max_in_flight: int,
+    arrivals: str,
+    seed: int | None,
+) -> None:
+    rng = random.Random(seed)
+    t0 = time.perf_counter()
+    tasks: set[asyncio.Task] = set()
+    next_at = t0
+    sent = 0
+    while max_requests is None or sent < max_requests:
+        elapsed = next_at - t0
+        if elapsed >= duration_s:
+            break
+        rate = rps * min(1.0, elapsed / ramp_s) if ramp_s > 0 else rps
+        rate = max(rate, rps * 0.01)
+        gap = rng.expovariate(rate) if arrivals == "poisson" else 1.0 / rate
+        next_at += gap
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if recorder.in_flight >= max_in_flight:
+            # The client, not the server, would be the bottleneck.
+            recorder.dropped += 1
+            continue
+        sent += 1
+        task = asyncio.create_task(send(client, workload, recorder, rng, t0, scheduled=next_at))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks)
+
+
+def build_report(recorder: Recorder, elapsed_s: float, interval_s: float) -> Dict[str, Any]:
+    samples = recorder.samples
+    statuses: Dict[str, int] = {}
+    errors: Dict[str, int] = {}
+    for s in samples:
+        key = str(s.status) if s.status else "transport_error"
+        statuses[key] = statuses.get(key, 0) + 1
+        if s.error:
+            errors[s.error] = errors.get(s.error, 0) + 1
+    ok = [s for s in samples if 200 <= s.status < 300]
+    items = sum(s.items for s in ok) - sum(s.failed_items for s in ok)
+    cost = sum(s.cost_usd for s in samples)
+
+    by_key: Dict[str, Dict[str, Any]] = {}
+    for label, attr in (("tenant", "tenant"), ("category", "category")):
+        groups: Dict[str, List[Sample]] = {}
+        for s in samples:
+            groups.setdefault(getattr(s, attr), []).append(s)
+        by_key[label] = {}
+        for name, group in groups.items():
+            hist = LatencyHistogram()
+            for s in group:
+                hist.record(s.latency_us)
+            failures = sum(1 for s in group if not 200 <= s.status < 300)
+            by_key[label][name] = {
+                "requests": len(group),
+                "error_rate": round(failures / len(group), 4),
+                "p50_ms": hist.percentile(50) / 1000.0,
+                "p99_ms": hist.percentile(99) / 1000.0,
+                "cost_usd": round(sum(s.cost_usd for s in group), 6),
+            }
+
+    windows = []
+    for index in sorted(recorder.windows):
+        hist, counters = recorder.windows[index]
+        windows.append({
+            "t_s": round(index * interval_s, 1),
+            "rps": round(hist.count / interval_s, 1),
+            "errors": counters["errors"],
+            "peak_in_flight": counters["peak_in_flight"],
+            "p50_ms": hist.percentile(50) / 1000.0,
+            "p99_ms": hist.percentile(99) / 1000.0,
+        })
+
+    def ms(summary: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: (v if k == "count" else round(v / 1000.0, 3)) for k, v in summary.items()}
+
+    return {
+        "requests": len(samples),
+        "succeeded": len(ok),
+        "error_rate": round(1 - len(ok) / len(samples), 4) if samples else 0.0,
+        "dropped_client_side": recorder.dropped,
+        "elapsed_s": round(elapsed_s, 2),
+        "throughput_rps": round(len(samples) / elapsed_s, 2) if elapsed_s else 0.0,
+        "runs_per_s": round(items / elapsed_s, 2) if elapsed_s else 0.0,
+        "statuses": statuses,
+        "errors": errors,
+        "cost_usd": {
+            "total": round(cost, 6),
+            "per_run": round(cost / items, 8) if items else 0.0,
+        },
+        "latency_ms": ms(recorder.latency.summary()),
+        "ttfb_ms": ms(recorder.ttfb.summary()),
+        "by_tenant": by_key["tenant"],
+        "by_category": by_key["category"],
+        "windows": windows,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lat, ttfb = report["latency_ms"], report["ttfb_ms"]
+    lines = [
+        f"requests {report['requests']}  ok {report['succeeded']}  error rate {report['error_rate']:.2%}"
+        f"  dropped {report['dropped_client_side']}  elapsed {report['elapsed_s']}s",
+        f"throughput {report['throughput_rps']} req/s  ({report['runs_per_s']} runs/s)",
+        f"cost ${report['cost_usd']['total']:.6f} total, ${report['cost_usd']['per_run']:.8f} per run",
+        f"statuses {report['statuses']}" + (f"  errors {report['errors']}" if report["errors"] else ""),
+        "",
+        f"{'':10}{'p50':>10}{'p90':>10}{'p95':>10}{'p99':>10}{'p99.9':>10}{'max':>10}",
+    ]
+    for name, s in (("latency", lat), ("ttfb", ttfb)):
+        lines.append(
+            f"{name + ' ms':10}{s['p50']:>10.1f}{s['p90']:>10.1f}{s['p95']:>10.1f}{s['p99']:>10.1f}{s['p99.9']:>10.1f}{s['max']:>10.1f}"
+        )
+    lines += ["", f"{'t_s':>7}{'rps':>9}{'in_flight':>11}{'errors':>8}{'p50_ms':>10}{'p99_ms':>10}"]
+    for w in report["windows"]:
+        lines.append(f"{w['t_s']:>7}{w['rps']:>9}{w['peak_in_flight']:>11}{w['errors']:>8}{w['p50_ms']:>10.1f}{w['p99_ms']:>10.1f}")
+    return "\n".join(lines)
+
+
+def write_csv(path: str, samples: List[Sample]) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=list(asdict(samples[0]).keys()) if samples else ["start_s"])
+        writer.writeheader()
+        for sample in samples:
+            writer.writerow(asdict(sample))
+
+
+def _weighted(raw: Sequence[str]) -> List[Tuple[str, float]]:
+    """["a=2", "b"] or ["a=2,b"] -> [("a", 2.0), ("b", 1.0)]."""
+    pairs: List[Tuple[str, float]] = []
+    for item in ",".join(raw).split(","):
+        name, _, weight = item.strip().partition("=")
+        if name:
+            pairs.append((name, float(weight) if weight else 1.0))
+    return pairs
+
+
+def _load_prompts(path: str) -> Dict[str, List[str]]:
+    prompts: Dict[str, List[str]] = {}
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                row = json.loads(line)
+                prompts.setdefault(row.get("category") or "general", []).append(row["prompt"])
+    return prompts
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    prompts = _load_prompts(args.prompts) if args.prompts else PROMPTS
+    categories = _weighted(args.categories) if args.categories else [(c, 1.0) for c in prompts]
+    unknown = [c for c, _ in categories if c not in prompts]
+    if unknown:
+        raise SystemExit(f"unknown categories {unknown}; available: {sorted(prompts)}")
+    workload = Workload(
+        tenants=_weighted(args.tenant or ["00000000-0000-0000-0000-000000000001"]),
+        categories=categories,
+        prompts=prompts,
+        endpoint=args.endpoint,
+        batch_size=args.batch_size if args.endpoint == "batch" else 1,
+    )
+    recorder = Recorder(interval_s=args.interval_s)
+    pool = args.concurrency if not args.rps else args.max_in_flight
+    limits = httpx.Limits(max_connections=pool, max_keepalive_connections=pool)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout_s) as client:
+        t0 = time.perf_counter()
+        if args.rps:
+            await open_loop(
+                client, workload, recorder,
+                rps=args.rps, ramp_s=args.ramp_s, duration_s=args.duration_s, max_requests=args.requests,
+                max_in_flight=args.max_in_flight, arrivals=args.arrivals, seed=args.seed,
+            )
+        else:
+            await closed_loop(
+                client, workload, recorder,
+                concurrency=args.concurrency, ramp_s=args.ramp_s, duration_s=args.duration_s,
+                max_requests=args.requests, seed=args.seed,
+            )
+        elapsed = time.perf_counter() - t0
+    if args.csv:
+        write_csv(args.csv, recorder.samples)
+    return build_report(recorder, elapsed, args.interval_s)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="loadgen", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    mode = parser.add_argument_group("load shape")
+    mode.add_argument("--concurrency", type=int, default=8, help="closed loop: number of workers")
+    mode.add_argument("--rps", type=float, default=None, help="open loop: target arrivals per second")
+    mode.add_argument("--arrivals", choices=["poisson", "uniform"], default="poisson")
+    mode.add_argument("--max-in-flight", type=int, default=1024, help="open loop: client-side cap")
+    mode.add_argument("--ramp-s", type=float, default=0.0, help="ramp workers (or rate) up linearly over this long")
+    mode.add_argument("--duration-s", type=float, default=30.0)
+    mode.add_argument("--requests", type=int, default=None, help="stop after this many requests")
+    mix = parser.add_argument_group("traffic mix")
+    mix.add_argument("--tenant", action="append", help="tenant id or slug, optionally =WEIGHT; repeatable")
+    mix.add_argument("--categories", nargs="*", help="category[=weight] list, e.g. coding=3 finance=1")
+    mix.add_argument("--prompts", help='JSONL of {"prompt", "category"} to use instead of the built-in set')
+    mix.add_argument("--endpoint", choices=["run", "batch"], default="run")
+    mix.add_argument("--batch-size", type=int, default=8, help="items per /v1/run/batch request")
+    out = parser.add_argument_group("output")
+    out.add_argument("--interval-s", type=float, default=5.0, help="report window length")
+    out.add_argument("--timeout-s", type=float, default=120.0)
+    out.add_argument("--json", help="write the report here")
+    out.add_argument("--csv", help="write one row per request here")
+    out.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+    return 0 if report["requests"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,15 @@
-import time
+import atexit
 from typing import Any, Dict
 
+from .event_logger import EventLogger
+
+event_logger = EventLogger.from_env()
+atexit.register(event_logger.close)
+
+
 def log_event(event_type: str, payload: Dict[str, Any]) -> None:
-    """Tiny structured logger (stdout). Swap to OTEL later."""
-    print({
-        "ts": time.time(),
-        "event": event_type,
-        **payload,
-    })
+    """Structured JSON-lines event (stdout), written off the request thread."""
+    event_logger.log(event_type, payload)
+
+
+__all__ = ["EventLogger", "event_logger", "log_event"]
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Generic, List, TypeVar
+
+T = TypeVar("T")
+
+DROP_NEWEST = "drop_newest"
+DROP_OLDEST = "drop_oldest"
+
+
+class BatchFlusher(Generic[T]):
+    """
+    Bounded buffer drained by one daemon thread; the batching under the
+    event logger and the `adapters/logger` sinks.
+
+    `put` never does I/O: it appends and wakes the thread once a batch is
+    ready. A full buffer drops the new item (DROP_NEWEST) or the oldest
+    buffered one (DROP_OLDEST), counting each in `dropped`. The thread hands
+    batches of up to `batch_size` items to `write` when one fills, every
+    `flush_interval_s`, or on `flush()`. An exception from `write` is
+    counted in `failed` and the batch is discarded, so a broken sink never
+    reaches the caller of `put`.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[List[T]], None],
+        *,
+        batch_size: int,
+        max_buffer: int,
+        flush_interval_s: float = 0.5,
+        drop_policy: str = DROP_NEWEST,
+        name: str = "agenticlabs-log-flusher",
+    ) -> None:
+        self._write = write
+        self._batch_size = max(1, batch_size)
+        self._max_buffer = max(1, max_buffer)
+        self._flush_interval_s = max(0.01, flush_interval_s)
+        self._drop_policy = drop_policy if drop_policy in {DROP_NEWEST, DROP_OLDEST} else DROP_NEWEST
+        self._name = name
+        self._buffer: Deque[T] = deque()
+        self._cond = threading.Condition()
+        self._worker: threading.Thread | None = None
+        self._inflight = 0
+        self._flush_requested = False
+        self._closed = False
+        self.dropped = 0
+        self.failed = 0
+
+    def put(self, item: T) -> bool:
+        with self._cond:
+            if self._closed:
+                return False
+            if len(self._buffer) >= self._max_buffer:
+                self.dropped += 1
+                if self._drop_policy == DROP_NEWEST:
+                    return False
+                self._buffer.popleft()
+            self._buffer.append(item)
+            if len(self._buffer) >= self._batch_size:
+                self._cond.notify()
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name=self._name, daemon=True)
+                self._worker.start()
+        return True
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._buffer)
+
+    def _write_batch(self, batch: List[T]) -> None:
+        try:
+            self._write(batch)
+        except Exception:
+            with self._cond:
+                self.failed += len(batch)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self._flush_interval_s
+                while len(self._buffer) < self._batch_size and not self._closed and not self._flush_requested:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if not self._buffer:
+                    self._flush_requested = False
+                    if self._closed:
+                        self._cond.notify_all()
+                        return
+                batch = [self._buffer.popleft() for _ in range(min(self._batch_size, len(self._buffer)))]
+                self._inflight = len(batch)
+            if batch:
+                self._write_batch(batch)
+            with self._cond:
+                self._inflight = 0
+                if not self._buffer:
+                    self._cond.notify_all()
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Block until everything buffered so far has been handed to `write`."""
+        if self._worker is None:
+            with self._cond:
+                batch = list(self._buffer)
+                self._buffer.clear()
+            if batch:
+                self._write_batch(batch)
+            return
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._buffer or self._inflight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+    def close(self, timeout: float = 5.0) -> None:
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+
+
+__all__ = ["BatchFlusher", "DROP_NEWEST", "DROP_OLDEST"]
@@ -0,0 +1,125 @@
+"""
+Queue-backed structured event logger.
+
+`log()` samples, serializes the event to a JSON line and hands it to a
+`BatchFlusher`; the write happens on its background thread, one write per
+batch. Serializing up front means a caller that goes on to mutate the
+payload (or anything nested in it) cannot change or break the record.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List, Mapping, TextIO
+
+from .batch_flusher import DROP_NEWEST, DROP_OLDEST, BatchFlusher
+
+
+def parse_sample_rates(raw: str | None) -> Dict[str, float]:
+    """
+    Parse "route_plan=0.1,route_complexity=0.5" into {event: rate}.
+    Invalid entries are ignored; rates are clamped to [0, 1].
+    """
+    rates: Dict[str, float] = {}
+    if not raw:
+        return rates
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        name, _, value = item.partition("=")
+        try:
+            rate = float(value)
+        except ValueError:
+            continue
+        rates[name.strip()] = max(0.0, min(rate, 1.0))
+    return rates
+
+
+class EventLogger:
+    """Non-blocking JSON-lines logger with batching, bounded buffer and sampling."""
+
+    def __init__(
+        self,
+        stream: TextIO | None = None,
+        *,
+        max_buffer: int = 10_000,
+        batch_size: int = 200,
+        flush_interval_s: float = 0.25,
+        drop_policy: str = DROP_NEWEST,
+        sample_rates: Mapping[str, float] | None = None,
+    ) -> None:
+        self._stream = stream
+        self._sample_rates: Dict[str, float] = dict(sample_rates or {})
+        self._flusher: BatchFlusher[str] = BatchFlusher(
+            self._write,
+            batch_size=batch_size,
+            max_buffer=max_buffer,
+            flush_interval_s=flush_interval_s,
+            drop_policy=drop_policy,
+            name="agenticlabs-event-logger",
+        )
+        self.sampled_out = 0
+
+    @property
+    def dropped(self) -> int:
+        return self._flusher.dropped
+
+    @property
+    def failed(self) -> int:
+        return self._flusher.failed
+
+    @classmethod
+    def from_env(cls) -> "EventLogger":
+        return cls(
+            max_buffer=int(os.getenv("AGENTICLABS_LOG_BUFFER_SIZE", "10000")),
+            batch_size=int(os.getenv("AGENTICLABS_LOG_BATCH_SIZE", "200")),
+            flush_interval_s=float(os.getenv("AGENTICLABS_LOG_FLUSH_INTERVAL_S", "0.25")),
+            drop_policy=os.getenv("AGENTICLABS_LOG_DROP_POLICY", DROP_NEWEST).lower(),
+            sample_rates=parse_sample_rates(os.getenv("AGENTICLABS_LOG_SAMPLE_RATES")),
+        )
+
+    def set_sample_rate(self, event_type: str, rate: float) -> None:
+        self._sample_rates[event_type] = max(0.0, min(rate, 1.0))
+
+    def _sampled(self, event_type: str) -> bool:
+        rate = self._sample_rates.get(event_type, 1.0)
+        if rate >= 1.0:
+            return True
+        return rate > 0.0 and random.random() < rate
+
+    def log(self, event_type: str, payload: Dict[str, Any]) -> None:
+        if not self._sampled(event_type):
+            self.sampled_out += 1
+            return
+        try:
+            line = json.dumps({"ts": time.time(), "event": event_type, **payload}, default=str)
+        except (TypeError, ValueError):  # e.g. circular references
+            line = json.dumps({"ts": time.time(), "event": event_type, "unserializable": True})
+        self._flusher.put(line)
+
+    def _write(self, batch: List[str]) -> None:
+        stream = self._stream or sys.stdout
+        stream.write("".join(line + "\n" for line in batch))
+        stream.flush()
+
+    def flush(self, timeout: float = 2.0) -> None:
+        """Block until everything buffered so far has been written."""
+        self._flusher.flush(timeout)
+
+    def close(self) -> None:
+        self._flusher.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "buffered": len(self._flusher),
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "sampled_out": self.sampled_out,
+        }
+
+
+__all__ = ["EventLogger", "DROP_NEWEST", "DROP_OLDEST", "parse_sample_rates"]
@@ -0,0 +1,306 @@
+"""
+Local mock LLM server speaking the OpenAI, Anthropic and Ollama wire
+formats, for load-testing the router without network or spend.
+
+    cd api && python -m mock_llm_server --port 8089 \
+        --profile "distribution=lognormal,ttft_ms=250,tokens_per_s=60,rate_limit_rate=0.02"
+
+    OPENAI_API_BASE=http://127.0.0.1:8089/v1
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8089
+    OLLAMA_URL=http://127.0.0.1:8089
+
+Endpoints: POST /v1/chat/completions, POST /v1/messages, POST /api/generate
+(all honour `stream`), GET /api/tags and GET /health. Latency, pace and
+fault injection come from a providers.synthetic profile; an
+`X-Mock-Profile` request header overrides fields for that request.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from providers.synthetic import SyntheticProfile, estimate_tokens
+
+
+def _prompt_text(body: Dict[str, Any]) -> str:
+    """Flatten prompt/system/messages (string or content-block form) into one string."""
+    parts = []
+    for key in ("system", "prompt"):
+        if isinstance(body.get(key), str):
+            parts.append(body[key])
+    for message in body.get("messages") or []:
+        content = message.get("content") if isinstance(message, dict) else None
+        if isinstance(content, str):
+            parts.append(content)
+        elif isinstance(content, list):
+            parts += [block.get("text", "") for block in content if isinstance(block, dict)]
+    return "\n".join(parts)
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "MockLLMServer"
+
+    # -- plumbing ---------------------------------------------------------
+
+    def log_message(self, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(*args)
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b"{}"
+        try:
+            body = json.loads(raw or b"{}")
+        except ValueError:
+            body = None
+        return body if isinstance(body, dict) else {}
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, content_type: str, chunks: Iterator[bytes]) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for chunk in chunks:
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def _profile(self) -> SyntheticProfile:
+        override = self.headers.get("X-Mock-Profile")
+        return SyntheticProfile.parse(override, self.server.profile) if override else self.server.profile
+
+    def _fault(self, profile: SyntheticProfile, error_body: Any) -> bool:
+        """Send an injected 429/500 if the profile rolls one. Returns True when it did."""
+        status = profile.sample_fault(self.server.rng)
+        if status is None:
+            return False
+        time.sleep(profile.sample_ttft_s(self.server.rng))
+        message = "rate limited (mock)" if status == 429 else "internal error (mock)"
+        headers = {"Retry-After": f"{profile.retry_after_s:g}"} if status == 429 else {}
+        self._send_json(status, error_body(status, message), headers)
+        return True
+
+    def _generate(self, body: Dict[str, Any]) -> Tuple[SyntheticProfile, str, str, int]:
+        profile = self._profile()
+        prompt = _prompt_text(body)
+        text = profile.completion(prompt)
+        if isinstance(body.get("max_tokens"), int) and profile.output_tokens:
+            text = " ".join(text.split()[: body["max_tokens"]])
+        return profile, prompt, text, estimate_tokens(prompt)
+
+    # -- routes -----------------------------------------------------------
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/api/tags":
+            self._send_json(200, {"models": [{"name": "mock", "model": "mock"}]})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        body = self._read_json()
+        route = {
+            "/v1/chat/completions": self._openai,
+            "/chat/completions": self._openai,
+            "/v1/messages": self._anthropic,
+            "/api/generate": self._ollama,
+        }.get(self.path.split("?")[0])
+        if route is None:
+            self._send_json(404, {"error": "not found"})
+            return
+        route(body)
+
+    def _openai(self, body: Dict[str, Any]) -> None:
+        profile, _, text, tokens_in = self._generate(body)
+        error = lambda status, message: {"error": {"message": message, "type": "mock_error", "code": status}}
+        if self._fault(profile, error):
+            return
+        model = body.get("model") or "mock"
+        rid = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        pieces = profile.stream(text, self.server.rng)
+        if not body.get("stream"):
+            output = "".join(pieces)
+            self._send_json(200, {
+                "id": rid,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": output}, "finish_reason": "stop"}],
+                "usage": {
+                    "prompt_tokens": tokens_in,
+                    "completion_tokens": estimate_tokens(output),
+                    "total_tokens": tokens_in + estimate_tokens(output),
+                },
+            })
+            return
+
+        def events() -> Iterator[bytes]:
+            base = {"id": rid, "object": "chat.completion.chunk", "created": created, "model": model}
+            for piece in pieces:
+                choice = {"index": 0, "delta": {"content": piece}, "finish_reason": None}
+                yield b"data: " + json.dumps({**base, "choices": [choice]}).encode() + b"\n\n"
+            done = {"index": 0, "delta": {}, "finish_reason": "stop"}
+            yield b"data: " + json.dumps({**base, "choices": [done]}).encode() + b"\n\n"
+            yield b"data: [DONE]\n\n"
+
+        self._send_stream("text/event-stream", events())
+
+    def _anthropic(self, body: Dict[str, Any]) -> None:
+        profile, _, text, tokens_in = self._generate(body)
+        error = lambda status, message: {
+            "type": "error",
+            "error": {"type": "rate_limit_error" if status == 429 else "api_error", "message": message},
+        }
+        if self._fault(profile, error):
+            return
+        model = body.get("model") or "mock"
+        message = {
+            "id": f"msg_{uuid.uuid4().hex[:24]}",
+            "type": "message",
+            "role": "assistant",
+            "model": model,
+            "content": [],
+            "stop_reason": None,
+            "stop_sequence": None,
+            "usage": {"input_tokens": tokens_in, "output_tokens": 0},
+        }
+        pieces = profile.stream(text, self.server.rng)
+        if not body.get("stream"):
+            output = "".join(pieces)
+            message.update(
+                content=[{"type": "text", "text": output}],
+                stop_reason="end_turn",
+                usage={"input_tokens": tokens_in, "output_tokens": estimate_tokens(output)},
+            )
+            self._send_json(200, message)
+            return
+
+        def event(name: str, data: Dict[str, Any]) -> bytes:
+            return f"event: {name}\ndata: {json.dumps({'type': name, **data})}\n\n".encode()
+
+        def events() -> Iterator[bytes]:
+            yield event("message_start", {"message": message})
+            yield event("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}})
+            output = []
+            for piece in pieces:
+                output.append(piece)
+                yield event("content_block_delta", {"index": 0, "delta": {"type": "text_delta", "text": piece}})
+            yield event("content_block_stop", {"index": 0})
+            yield event("message_delta", {
+                "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                "usage": {"output_tokens": estimate_tokens("".join(output))},
+            })
+            yield event("message_stop", {})
+
+        self._send_stream("text/event-stream", events())
+
+    def _ollama(self, body: Dict[str, Any]) -> None:
+        model = body.get("model") or "mock"
+        if "prompt" not in body:
+            # Ollama treats an empty generate as "load the model".
+            self._send_json(200, {"model": model, "response": "", "done": True, "done_reason": "load"})
+            return
+        profile, prompt, text, tokens_in = self._generate(body)
+        if self._fault(profile, lambda status, message: {"error": message}):
+            return
+        start = time.perf_counter()
+        pieces = profile.stream(text, self.server.rng)
+        context = list(body.get("context") or [])
+
+        def final(output: str) -> Dict[str, Any]:
+            tokens_out = estimate_tokens(output)
+            return {
+                "model": model,
+                "response": "",
+                "done": True,
+                "done_reason": "stop",
+                "context": context + list(range(tokens_in + tokens_out)),
+                "total_duration": int((time.perf_counter() - start) * 1e9),
+                "load_duration": 0,
+                "prompt_eval_count": tokens_in,
+                "eval_count": tokens_out,
+            }
+
+        if body.get("stream") is False:
+            output = "".join(pieces)
+            self._send_json(200, {**final(output), "response": output})
+            return
+
+        def chunks() -> Iterator[bytes]:
+            output = []
+            for piece in pieces:
+                output.append(piece)
+                yield json.dumps({"model": model, "response": piece, "done": False}).encode() + b"\n"
+            yield json.dumps(final("".join(output))).encode() + b"\n"
+
+        self._send_stream("application/x-ndjson", chunks())
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        profile: SyntheticProfile | None = None,
+        *,
+        seed: int | None = None,
+        verbose: bool = False,
+    ) -> None:
+        super().__init__(address, MockLLMHandler)
+        self.profile = profile or SyntheticProfile()
+        self.rng = random.Random(seed)
+        self.verbose = verbose
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="mock_llm_server", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument(
+        "--profile",
+        default=os.getenv("AGENTICLABS_MOCK_PROFILE", ""),
+        help='e.g. "distribution=bimodal,ttft_ms=150,slow_ms=3000,slow_fraction=0.1,error_rate=0.01"',
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("-v", "--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    server = MockLLMServer((args.host, args.port), SyntheticProfile.parse(args.profile), seed=args.seed, verbose=args.verbose)
+    print(json.dumps({"listening": f"http://{args.host}:{server.server_port}", "profile": vars(server.profile)}), file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -111,6 +111,9 @@ class Tenant(Base):
     max_tokens_per_request: Mapped[int] = mapped_column(
         Integer, nullable=False, default=4000
     )
+    hedge_requests: Mapped[bool] = mapped_column(
+        Boolean, nullable=False, default=False, server_default="false"
+    )
     status: Mapped[TenantStatus] = mapped_column(
         SAEnum(TenantStatus), nullable=False, default=TenantStatus.ACTIVE
     )
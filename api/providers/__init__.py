@@ -6,24 +6,32 @@ Each adapter module must expose `plan(...)` and `execute(...)`.
 
 from __future__ import annotations
 
-from . import ollama_adapter
-from . import stub
-from .anthropic_adapter import anthropic_adapter
-from .gemini_adapter import gemini_adapter
+from .bulkhead import BulkheadConfig, bulkheads, config_from_env
+from .registry import ProviderRegistry
 
-try:
-    from . import openai_adapter
-except ImportError:  # pragma: no cover - optional dependency guard
-    openai_adapter = None  # type: ignore
+# Adapters are imported on first lookup (see providers.registry), so a worker
+# only pays for the vendor SDKs it actually routes to.
+PROVIDERS = ProviderRegistry(
+    {
+        "ollama": f"{__name__}.ollama_adapter",
+        "anthropic": f"{__name__}.anthropic_adapter:anthropic_adapter",
+        "gemini": f"{__name__}.gemini_adapter:gemini_adapter",
+        "stub": f"{__name__}.stub",
+        "openai": f"{__name__}.openai_adapter",
+    }
+)
 
-PROVIDERS = {
-    "ollama": ollama_adapter,
-    "anthropic": anthropic_adapter,
-    "gemini": gemini_adapter,
-    "stub": stub,
+# Concurrency bulkheads per PROVIDERS entry. `provider:model` keys add a
+# tighter per-model limit on top. Override with AGENTICLABS_BULKHEAD_<KEY>
+# ("concurrency=4,queue=16,wait_s=5") or at runtime via /v1/admin/bulkheads.
+PROVIDER_LIMITS = {
+    "openai": BulkheadConfig(max_concurrent=32, max_queue=128, max_queue_wait_s=5.0),
+    "anthropic": BulkheadConfig(max_concurrent=16, max_queue=64, max_queue_wait_s=5.0),
+    "gemini": BulkheadConfig(max_concurrent=16, max_queue=64, max_queue_wait_s=5.0),
+    "ollama": BulkheadConfig(max_concurrent=2, max_queue=8, max_queue_wait_s=15.0),
+    "stub": BulkheadConfig(max_concurrent=64, max_queue=256, max_queue_wait_s=1.0),
 }
 
-if openai_adapter is not None:
-    PROVIDERS["openai"] = openai_adapter
+bulkheads.configure_many({key: config_from_env(key, config) for key, config in PROVIDER_LIMITS.items()})
 
-__all__ = ["PROVIDERS"]
+__all__ = ["PROVIDERS", "PROVIDER_LIMITS", "ProviderRegistry"]
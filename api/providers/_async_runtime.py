@@ -0,0 +1,53 @@
+"""
+One background event loop shared by async provider SDK clients.
+
+Provider calls arrive on executor threads. Running their coroutines on a
+single long-lived loop lets the SDK clients created on it (gRPC channels,
+httpx pools) be reused across calls instead of rebuilt per request, and the
+calling thread just waits on the result.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Awaitable, Optional, TypeVar
+
+T = TypeVar("T")
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever, name="agenticlabs-provider-loop", daemon=True
+            )
+            thread.start()
+            _loop = loop
+        return _loop
+
+
+def run(coro: Awaitable[T], timeout_s: float | None = None) -> T:
+    """Run `coro` on the shared loop and block until it finishes."""
+    future = asyncio.run_coroutine_threadsafe(coro, get_loop())  # type: ignore[arg-type]
+    try:
+        return future.result(timeout_s)
+    except BaseException:
+        future.cancel()
+        raise
+
+
+def shutdown() -> None:
+    global _loop
+    with _lock:
+        loop, _loop = _loop, None
+    if loop is not None and loop.is_running():
+        loop.call_soon_threadsafe(loop.stop)
+
+
+__all__ = ["get_loop", "run", "shutdown"]
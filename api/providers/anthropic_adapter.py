@@ -6,10 +6,19 @@ from typing import Any, Dict, List
 
 try:  # pragma: no cover - optional dependency
     import anthropic
-    from anthropic import Anthropic
+    import httpx
+    from anthropic import AsyncAnthropic
 except ImportError:  # pragma: no cover - optional dependency
     anthropic = None  # type: ignore
-    Anthropic = None  # type: ignore
+    httpx = None  # type: ignore
+    AsyncAnthropic = None  # type: ignore
+
+from cost.calculator import CACHE_READ_MULTIPLIER, CACHE_WRITE_MULTIPLIER
+from tracing import inject_trace_headers
+
+from . import _async_runtime
+from .errors import ProviderError, retry_after_from_headers
+from .retry import attempt_timeout_s
 
 DEFAULT_MODEL = "claude-3-sonnet-20240229"
 DEFAULT_MAX_TOKENS = 1024
@@ -17,6 +26,17 @@ DEFAULT_SYS_PROMPT = os.getenv(
     "ANTHROPIC_SYSTEM_PROMPT",
     "You are a concise, high-signal assistant for AgenticLabs routed requests.",
 )
+ANTHROPIC_TIMEOUT_S = float(os.getenv("ANTHROPIC_TIMEOUT_S", "60"))
+# Sized above the anthropic bulkhead so queued calls never wait on the pool.
+ANTHROPIC_MAX_CONNECTIONS = int(os.getenv("ANTHROPIC_MAX_CONNECTIONS", "32"))
+ANTHROPIC_MAX_KEEPALIVE = int(os.getenv("ANTHROPIC_MAX_KEEPALIVE", "16"))
+ANTHROPIC_KEEPALIVE_EXPIRY_S = float(os.getenv("ANTHROPIC_KEEPALIVE_EXPIRY_S", "60"))
+
+# Prompt caching: system prompts and `context.prompt_prefix` long enough to
+# be cacheable get a cache_control breakpoint. Shorter ones are sent as-is.
+PROMPT_CACHE_ENABLED = os.getenv("ANTHROPIC_PROMPT_CACHE", "1").lower() not in {"0", "false", "no"}
+CACHE_MIN_TOKENS = 1024
+CACHE_MIN_TOKENS_HAIKU = 2048
 
 ANTHROPIC_PRICING: Dict[str, Dict[str, float]] = {
     # USD cost per single token
@@ -36,25 +56,69 @@ def _resolve_model_name(model: str | None) -> str:
     return MODEL_ALIASES.get(lower, name)
 
 
-def _estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+def _estimate_cost(
+    model: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+    cache_read_tokens: int = 0,
+    cache_write_tokens: int = 0,
+) -> float:
+    """`prompt_tokens` includes cache reads and writes."""
     pricing = ANTHROPIC_PRICING.get(model) or ANTHROPIC_PRICING[DEFAULT_MODEL]
-    cost_input = prompt_tokens * pricing["input"]
+    uncached = max(0, prompt_tokens - cache_read_tokens - cache_write_tokens)
+    cost_input = (
+        uncached
+        + cache_read_tokens * CACHE_READ_MULTIPLIER
+        + cache_write_tokens * CACHE_WRITE_MULTIPLIER
+    ) * pricing["input"]
     cost_output = completion_tokens * pricing["output"]
     return round(cost_input + cost_output, 8)
 
 
+def _cacheable(model: str, *texts: str | None) -> bool:
+    minimum = CACHE_MIN_TOKENS_HAIKU if "haiku" in model else CACHE_MIN_TOKENS
+    return PROMPT_CACHE_ENABLED and sum(len(text or "") for text in texts) // 4 >= minimum
+
+
 class AnthropicProvider:
+    """
+    Calls run on the shared provider event loop through one AsyncAnthropic
+    client, whose httpx pool keeps connections alive between requests.
+    """
+
     def __init__(self) -> None:
-        self._client: Anthropic | None = None
+        self._client: AsyncAnthropic | None = None
+
+    def _ensure_configured(self) -> str:
+        if AsyncAnthropic is None:
+            raise ProviderError(
+                "anthropic", None, "anthropic package is not installed. Add it to requirements.", retryable=False
+            )
+        api_key = os.getenv("ANTHROPIC_API_KEY")
+        if not api_key:
+            raise ProviderError("anthropic", None, "ANTHROPIC_API_KEY is not configured", retryable=False)
+        return api_key
 
-    def _ensure_client(self) -> Anthropic:
-        if Anthropic is None:
-            raise RuntimeError("anthropic package is not installed. Add it to requirements.")
+    def _ensure_client(self, api_key: str) -> AsyncAnthropic:
+        # Only called on the provider loop, so creation is not raced.
         if self._client is None:
-            api_key = os.getenv("ANTHROPIC_API_KEY")
-            if not api_key:
-                raise RuntimeError("ANTHROPIC_API_KEY is not configured")
-            self._client = Anthropic(api_key=api_key)
+            timeout = httpx.Timeout(ANTHROPIC_TIMEOUT_S, connect=5.0)
+            http_client = httpx.AsyncClient(
+                timeout=timeout,
+                limits=httpx.Limits(
+                    max_connections=ANTHROPIC_MAX_CONNECTIONS,
+                    max_keepalive_connections=ANTHROPIC_MAX_KEEPALIVE,
+                    keepalive_expiry=ANTHROPIC_KEEPALIVE_EXPIRY_S,
+                ),
+            )
+            # Retries are owned by the provider executor so they respect the
+            # request deadline and can fall through to another provider.
+            self._client = AsyncAnthropic(
+                api_key=api_key,
+                timeout=timeout,
+                max_retries=int(os.getenv("ANTHROPIC_MAX_RETRIES", "0")),
+                http_client=http_client,
+            )
         return self._client
 
     @staticmethod
@@ -82,15 +146,21 @@ class AnthropicProvider:
         if not isinstance(max_tokens, int) or max_tokens <= 0:
             max_tokens = DEFAULT_MAX_TOKENS
 
-        system_prompt = params.get("system_prompt") or DEFAULT_SYS_PROMPT
+        context = params.get("context") or {}
+        system_prompt = params.get("system_prompt") or context.get("system_prompt") or DEFAULT_SYS_PROMPT
 
+        planned = {
+            "temperature": float(temperature),
+            "max_tokens": max_tokens,
+            "system_prompt": system_prompt,
+        }
+        # A stable prefix shared by many prompts (instructions, documents).
+        prefix = context.get("prompt_prefix")
+        if isinstance(prefix, str) and prefix.strip():
+            planned["prompt_prefix"] = prefix
         return {
             "target": {"provider": "anthropic", "model": model_name},
-            "params": {
-                "temperature": float(temperature),
-                "max_tokens": max_tokens,
-                "system_prompt": system_prompt,
-            },
+            "params": planned,
         }
 
     def execute(self, plan: Dict[str, Any], prompt: str) -> Dict[str, Any]:
@@ -102,11 +172,14 @@ class AnthropicProvider:
         max_tokens = int(params.get("max_tokens") or DEFAULT_MAX_TOKENS)
         temperature = float(params.get("temperature", 0.2))
         system_prompt = params.get("system_prompt") or DEFAULT_SYS_PROMPT
+        prompt_prefix = params.get("prompt_prefix")
 
         payload_messages = [{"role": "user", "content": prompt}]
         latency_ms = 0.0
         prompt_tokens = 0
         completion_tokens = 0
+        cache_read_tokens = 0
+        cache_write_tokens = 0
         text_output = ""
 
         try:
@@ -116,16 +189,29 @@ class AnthropicProvider:
                 max_tokens=max_tokens,
                 temperature=temperature,
                 system=system_prompt,
+                prompt_prefix=prompt_prefix,
+                timeout_s=attempt_timeout_s(plan, ANTHROPIC_TIMEOUT_S),
             )
             text_output = resp["content"].strip()
             latency_ms = resp["latency_ms"]
             usage = resp.get("usage") or {}
             prompt_tokens = int(usage.get("prompt_tokens", 0))
             completion_tokens = int(usage.get("completion_tokens", 0))
-        except Exception as exc:  # pragma: no cover - safety net
-            text_output = f"[Anthropic error] {exc}"
+            cache_read_tokens = int(usage.get("cache_read_tokens", 0))
+            cache_write_tokens = int(usage.get("cache_write_tokens", 0))
+        except ProviderError:
+            raise
+        except Exception as exc:
+            response = getattr(exc, "response", None)
+            raise ProviderError(
+                "anthropic",
+                model,
+                str(exc),
+                status_code=getattr(exc, "status_code", None),
+                retry_after=retry_after_from_headers(getattr(response, "headers", None)),
+            ) from exc
 
-        cost_usd = _estimate_cost(model, prompt_tokens, completion_tokens)
+        cost_usd = _estimate_cost(model, prompt_tokens, completion_tokens, cache_read_tokens, cache_write_tokens)
 
         return {
             "output": text_output,
@@ -134,6 +220,8 @@ class AnthropicProvider:
             "cost_usd": cost_usd,
             "prompt_tokens": prompt_tokens,
             "completion_tokens": completion_tokens,
+            "cached_prompt_tokens": cache_read_tokens,
+            "cache_write_tokens": cache_write_tokens,
             "provenance": {
                 "provider": "anthropic",
                 "model": model,
@@ -151,20 +239,99 @@ class AnthropicProvider:
         temperature: float = 0.2,
         max_tokens: int = DEFAULT_MAX_TOKENS,
         system: str | None = None,
+        prompt_prefix: str | None = None,
+        timeout_s: float = ANTHROPIC_TIMEOUT_S,
     ) -> Dict[str, Any]:
-        client = self._ensure_client()
-        formatted_messages = self._format_messages(messages)
+        api_key = self._ensure_configured()
+        # Read on the calling thread: the trace context does not carry over
+        # to the provider loop.
+        trace_headers = inject_trace_headers()
+        return _async_runtime.run(
+            self.chat_async(
+                model,
+                messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                system=system,
+                prompt_prefix=prompt_prefix,
+                api_key=api_key,
+                extra_headers=trace_headers,
+                timeout_s=timeout_s,
+            ),
+            timeout_s=timeout_s + 1.0,
+        )
+
+    def build_request(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        *,
+        temperature: float = 0.2,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        system: str | None = None,
+        prompt_prefix: str | None = None,
+    ) -> tuple[Dict[str, Any], bool]:
+        """Return the messages.create kwargs and whether they use prompt caching."""
+        formatted_messages: List[Dict[str, Any]] = self._format_messages(messages)
         kwargs: Dict[str, Any] = {
             "model": model,
             "max_tokens": max_tokens,
             "messages": formatted_messages,
             "temperature": temperature,
         }
+        cached = False
         if system:
-            kwargs["system"] = system
+            if _cacheable(model, system):
+                kwargs["system"] = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+                cached = True
+            else:
+                kwargs["system"] = system
+        if prompt_prefix:
+            prefix_block: Dict[str, Any] = {"type": "text", "text": prompt_prefix}
+            # The cached prefix covers everything before the breakpoint,
+            # including the system prompt.
+            if _cacheable(model, system, prompt_prefix):
+                prefix_block["cache_control"] = {"type": "ephemeral"}
+                cached = True
+            first = formatted_messages[0]
+            blocks = [prefix_block]
+            if first["content"]:
+                blocks.append({"type": "text", "text": first["content"]})
+            formatted_messages[0] = {"role": first["role"], "content": blocks}
+        return kwargs, cached
+
+    async def chat_async(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        *,
+        temperature: float = 0.2,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        system: str | None = None,
+        prompt_prefix: str | None = None,
+        api_key: str | None = None,
+        extra_headers: Dict[str, str] | None = None,
+        timeout_s: float | None = None,
+    ) -> Dict[str, Any]:
+        client = self._ensure_client(api_key or self._ensure_configured())
+        kwargs, cached = self.build_request(
+            model,
+            messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            system=system,
+            prompt_prefix=prompt_prefix,
+        )
+        if extra_headers:
+            kwargs["extra_headers"] = extra_headers
+        if timeout_s is not None:
+            kwargs["timeout"] = httpx.Timeout(timeout_s, connect=min(5.0, timeout_s))
+        # Prompt caching is a beta endpoint in the pinned SDK; it sends the
+        # anthropic-beta header itself.
+        endpoint = client.beta.prompt_caching.messages if cached else client.messages
 
         t0 = time.perf_counter()
-        resp = client.messages.create(**kwargs)
+        resp = await endpoint.create(**kwargs)
         latency_ms = (time.perf_counter() - t0) * 1000.0
 
         content_blocks = resp.content or []
@@ -173,14 +340,19 @@ class AnthropicProvider:
             text = getattr(content_blocks[0], "text", "") or ""
 
         usage = getattr(resp, "usage", None)
-        prompt_tokens = getattr(usage, "input_tokens", 0) if usage else 0
+        input_tokens = getattr(usage, "input_tokens", 0) if usage else 0
         completion_tokens = getattr(usage, "output_tokens", 0) if usage else 0
+        cache_read_tokens = (getattr(usage, "cache_read_input_tokens", 0) or 0) if usage else 0
+        cache_write_tokens = (getattr(usage, "cache_creation_input_tokens", 0) or 0) if usage else 0
 
         return {
             "content": text,
             "usage": {
-                "prompt_tokens": prompt_tokens,
+                # Anthropic reports cached tokens separately from input_tokens.
+                "prompt_tokens": input_tokens + cache_read_tokens + cache_write_tokens,
                 "completion_tokens": completion_tokens,
+                "cache_read_tokens": cache_read_tokens,
+                "cache_write_tokens": cache_write_tokens,
             },
             "latency_ms": latency_ms,
         }
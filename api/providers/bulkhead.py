@@ -0,0 +1,260 @@
+"""
+Per-provider (and optionally per-model) concurrency bulkheads.
+
+Each bulkhead admits up to `max_concurrent` calls; further callers wait in a
+bounded FIFO queue. A caller is shed immediately when the queue is full or
+when the expected wait (queue position x observed service time / slots)
+would not fit in its remaining request budget, so a slow provider cannot
+tie up every worker thread.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Deque, Dict, Iterator, List, Mapping, Optional
+
+from .errors import ProviderError
+
+
+@dataclass(frozen=True)
+class BulkheadConfig:
+    max_concurrent: int = 16
+    max_queue: int = 64
+    max_queue_wait_s: float = 10.0
+
+    @classmethod
+    def parse(cls, raw: str, base: "BulkheadConfig | None" = None) -> "BulkheadConfig":
+        """Parse "concurrency=4,queue=16,wait_s=5" on top of `base`."""
+        config = base or cls()
+        fields = {"concurrency": "max_concurrent", "queue": "max_queue", "wait_s": "max_queue_wait_s"}
+        updates: Dict[str, Any] = {}
+        for item in raw.split(","):
+            name, _, value = item.partition("=")
+            target = fields.get(name.strip())
+            if target is None or not value.strip():
+                continue
+            try:
+                updates[target] = float(value) if target == "max_queue_wait_s" else int(value)
+            except ValueError:
+                continue
+        return replace(config, **updates)
+
+
+class BulkheadRejected(ProviderError):
+    """Raised when a call is shed before reaching the provider."""
+
+    def __init__(self, key: str, reason: str, *, retry_after: float | None = None) -> None:
+        provider, _, model = key.partition(":")
+        super().__init__(
+            provider,
+            model or None,
+            f"bulkhead {key} shed request ({reason})",
+            retry_after=retry_after,
+            retryable=False,
+        )
+        self.key = key
+        self.reason = reason
+
+
+class Bulkhead:
+    def __init__(self, key: str, config: BulkheadConfig, *, alpha: float = 0.2) -> None:
+        self.key = key
+        self._config = config
+        self._alpha = alpha
+        self._cond = threading.Condition()
+        self._waiters: Deque[object] = deque()
+        self._in_flight = 0
+        self._ewma_service_s = 0.0
+        self._ewma_queue_s = 0.0
+        self._max_queue_s = 0.0
+        self._queued_admits = 0
+        self.admitted = 0
+        self.shed = 0
+
+    @property
+    def config(self) -> BulkheadConfig:
+        return self._config
+
+    def reconfigure(self, config: BulkheadConfig) -> None:
+        with self._cond:
+            self._config = config
+            self._cond.notify_all()
+
+    def _expected_wait_s(self, position: int) -> float:
+        slots = max(1, self._config.max_concurrent)
+        return (position / slots) * self._ewma_service_s
+
+    def acquire(self, budget_s: float | None = None) -> float:
+        """Take a slot, waiting in FIFO order. Returns seconds spent queued."""
+        t0 = time.monotonic()
+        with self._cond:
+            config = self._config
+            if self._in_flight < config.max_concurrent and not self._waiters:
+                self._in_flight += 1
+                self.admitted += 1
+                return 0.0
+
+            limit_s = config.max_queue_wait_s
+            if budget_s is not None:
+                limit_s = min(limit_s, max(0.0, budget_s))
+            position = len(self._waiters) + 1
+            expected_s = self._expected_wait_s(position)
+            if len(self._waiters) >= config.max_queue:
+                self.shed += 1
+                raise BulkheadRejected(self.key, "queue_full", retry_after=expected_s or None)
+            if expected_s > limit_s:
+                self.shed += 1
+                raise BulkheadRejected(self.key, "over_budget", retry_after=expected_s)
+
+            ticket = object()
+            self._waiters.append(ticket)
+            deadline = t0 + limit_s
+            try:
+                while not (self._waiters[0] is ticket and self._in_flight < self._config.max_concurrent):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.shed += 1
+                        raise BulkheadRejected(self.key, "queue_timeout")
+                    self._cond.wait(remaining)
+            finally:
+                self._waiters.remove(ticket)
+                # Let the next waiter re-check whether it is now at the head.
+                self._cond.notify_all()
+
+            self._in_flight += 1
+            self.admitted += 1
+            self._queued_admits += 1
+            waited = time.monotonic() - t0
+            self._ewma_queue_s = waited if self._queued_admits == 1 else (
+                self._alpha * waited + (1 - self._alpha) * self._ewma_queue_s
+            )
+            self._max_queue_s = max(self._max_queue_s, waited)
+            return waited
+
+    def release(self, service_s: float | None = None) -> None:
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            if service_s is not None:
+                self._ewma_service_s = service_s if self._ewma_service_s == 0 else (
+                    self._alpha * service_s + (1 - self._alpha) * self._ewma_service_s
+                )
+            self._cond.notify_all()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                **asdict(self._config),
+                "in_flight": self._in_flight,
+                "queued": len(self._waiters),
+                "admitted": self.admitted,
+                "shed": self.shed,
+                "ewma_queue_ms": round(self._ewma_queue_s * 1000, 2),
+                "max_queue_ms": round(self._max_queue_s * 1000, 2),
+                "ewma_service_ms": round(self._ewma_service_s * 1000, 2),
+            }
+
+
+class Lease:
+    """Slots held for one provider call; release exactly once."""
+
+    def __init__(self, held: List[Bulkhead], queued_s: float) -> None:
+        self._held = held
+        self.queued_s = queued_s
+        self._started = time.monotonic()
+
+    def release(self) -> None:
+        held, self._held = self._held, []
+        service_s = time.monotonic() - self._started
+        for bulkhead in reversed(held):
+            bulkhead.release(service_s)
+
+
+class BulkheadRegistry:
+    """
+    Bulkheads keyed by provider name, plus optional `provider:model` entries.
+    Providers without a configured entry use `default_config`.
+    """
+
+    def __init__(self, default_config: BulkheadConfig | None = None) -> None:
+        self.default_config = default_config or BulkheadConfig()
+        self._lock = threading.Lock()
+        self._bulkheads: Dict[str, Bulkhead] = {}
+
+    def configure(self, key: str, config: BulkheadConfig) -> Bulkhead:
+        with self._lock:
+            bulkhead = self._bulkheads.get(key)
+            if bulkhead is None:
+                bulkhead = Bulkhead(key, config)
+                self._bulkheads[key] = bulkhead
+            else:
+                bulkhead.reconfigure(config)
+            return bulkhead
+
+    def configure_many(self, configs: Mapping[str, BulkheadConfig]) -> None:
+        for key, config in configs.items():
+            self.configure(key, config)
+
+    def get(self, key: str) -> Optional[Bulkhead]:
+        return self._bulkheads.get(key)
+
+    def _chain(self, provider: str, model: str) -> List[Bulkhead]:
+        chain = [self.get(provider) or self.configure(provider, self.default_config)]
+        model_bulkhead = self.get(f"{provider}:{model}")
+        if model_bulkhead is not None:
+            chain.append(model_bulkhead)
+        return chain
+
+    def acquire(self, provider: str, model: str, *, budget_s: float | None = None) -> "Lease":
+        """Take the provider (and model, if configured) slots within `budget_s`."""
+        t0 = time.monotonic()
+        held: List[Bulkhead] = []
+        try:
+            for bulkhead in self._chain(provider, model):
+                remaining = None if budget_s is None else budget_s - (time.monotonic() - t0)
+                bulkhead.acquire(remaining)
+                held.append(bulkhead)
+        except BulkheadRejected:
+            for bulkhead in reversed(held):
+                bulkhead.release()
+            raise
+        return Lease(held, time.monotonic() - t0)
+
+    @contextmanager
+    def slot(self, provider: str, model: str, *, budget_s: float | None = None) -> Iterator[float]:
+        """Context-manager form of `acquire`; yields seconds spent queued."""
+        lease = self.acquire(provider, model, budget_s=budget_s)
+        try:
+            yield lease.queued_s
+        finally:
+            lease.release()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            items = list(self._bulkheads.items())
+        return {key: bulkhead.snapshot() for key, bulkhead in items}
+
+
+def config_from_env(key: str, base: BulkheadConfig) -> BulkheadConfig:
+    """Apply AGENTICLABS_BULKHEAD_<KEY> overrides, e.g. AGENTICLABS_BULKHEAD_OLLAMA."""
+    env_name = "AGENTICLABS_BULKHEAD_" + "".join(c if c.isalnum() else "_" for c in key).upper()
+    raw = os.getenv(env_name)
+    return BulkheadConfig.parse(raw, base) if raw else base
+
+
+bulkheads = BulkheadRegistry(config_from_env("default", BulkheadConfig()))
+
+
+__all__ = [
+    "Bulkhead",
+    "BulkheadConfig",
+    "BulkheadRegistry",
+    "BulkheadRejected",
+    "Lease",
+    "bulkheads",
+    "config_from_env",
+]
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Mapping
+
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429})
+
+
+def parse_retry_after(value: Any) -> float | None:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds."""
+    if value is None or value == "":
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        when = parsedate_to_datetime(str(value))
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def retry_after_from_headers(headers: Mapping[str, Any] | None) -> float | None:
+    if not headers:
+        return None
+    for name in ("retry-after-ms", "Retry-After-Ms"):
+        raw = headers.get(name)
+        if raw is not None:
+            try:
+                return max(0.0, float(raw) / 1000.0)
+            except (TypeError, ValueError):
+                break
+    return parse_retry_after(headers.get("retry-after") or headers.get("Retry-After"))
+
+
+class ProviderError(RuntimeError):
+    """
+    Raised by adapters when a provider call fails.
+
+    `retryable` defaults from the status code: 408, 409 (a conflicting
+    request in flight), 429 and 5xx are transient, other 4xx are fatal.
+    Errors without a status code (timeouts, connection resets) are
+    retryable unless the adapter says otherwise.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        model: str | None,
+        message: str,
+        *,
+        status_code: int | None = None,
+        retry_after: float | None = None,
+        retryable: bool | None = None,
+    ) -> None:
+        super().__init__(f"[{provider}] {message}")
+        self.provider = provider
+        self.model = model
+        self.status_code = status_code
+        self.retry_after = retry_after
+        if retryable is None:
+            if status_code is None:
+                retryable = True
+            else:
+                retryable = status_code in RETRYABLE_STATUS_CODES or status_code >= 500
+        self.retryable = retryable
+
+
+class NoProviderAvailableError(RuntimeError):
+    """Raised when every candidate in a failover chain is open or has failed."""
+
+    def __init__(
+        self,
+        attempted: list[str],
+        last_error: BaseException | None = None,
+        *,
+        deadline_exceeded: bool = False,
+    ) -> None:
+        detail = f"No provider available (tried: {', '.join(attempted) or 'none'})"
+        if deadline_exceeded:
+            detail += " before the request deadline"
+        if last_error is not None:
+            detail += f": {last_error}"
+        super().__init__(detail)
+        self.attempted = attempted
+        self.last_error = last_error
+        self.deadline_exceeded = deadline_exceeded
+
+
+__all__ = [
+    "ProviderError",
+    "NoProviderAvailableError",
+    "parse_retry_after",
+    "retry_after_from_headers",
+]
@@ -0,0 +1,425 @@
+"""
+Provider execution with circuit breakers, retries, failover and optional hedging.
+
+`execute_with_failover` walks an ordered list of (provider, model) candidates.
+Candidates whose circuit is open are skipped without a network call. Transient
+errors are retried on the same model with jittered backoff (see
+`providers.retry`); fatal errors and exhausted retries fall through to the next
+candidate. Each call first takes a slot in its provider's bulkhead
+(`providers.bulkhead`); a shed call moves on without touching the breaker.
+The whole walk is bounded by the retry policy's deadline, and each call is
+handed what is left of it as `timeout_s` in its plan so a single slow
+attempt cannot outlive the deadline.
+
+With `hedge=True`, the first call races a backup: if the primary has not
+answered by its observed p95 latency, the next candidate is started in
+parallel and the first successful answer wins. Hedged calls run on a
+bounded pool that never queues: when it is full the request simply runs
+unhedged, so a burst of hedged traffic cannot make calls wait for a thread.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from logger import log_event
+from routing.circuit_breaker import BreakerRegistry, CircuitBreaker, breakers as default_breakers
+from routing.live_stats import LivePerformanceTable, model_stats as default_model_stats
+from tracing import span, stage
+
+from .bulkhead import BulkheadRegistry, BulkheadRejected, bulkheads as default_bulkheads
+from .errors import NoProviderAvailableError
+from .retry import RetryPolicy, default_retry_policy, is_retryable
+
+Candidate = Tuple[str, str]
+
+HEDGE_PERCENTILE = float(os.getenv("AGENTICLABS_HEDGE_PERCENTILE", "95"))
+HEDGE_DEFAULT_DELAY_MS = float(os.getenv("AGENTICLABS_HEDGE_DEFAULT_DELAY_MS", "3000"))
+HEDGE_MIN_DELAY_MS = float(os.getenv("AGENTICLABS_HEDGE_MIN_DELAY_MS", "50"))
+# Floor for the per-call timeout once the deadline is nearly spent.
+MIN_ATTEMPT_TIMEOUT_S = 0.5
+
+
+
+class _HedgePool:
+    """A thread pool that refuses work instead of queueing it once every worker is busy."""
+
+    def __init__(self, max_workers: int) -> None:
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agenticlabs-hedge")
+        self._slots = threading.BoundedSemaphore(max_workers)
+
+    def try_submit(self, fn, *args: Any, **kwargs: Any) -> "Optional[Future[Any]]":
+        if not self._slots.acquire(blocking=False):
+            return None
+        try:
+            future = self._pool.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+
+# A primary and its backup per default bulkhead slot: hedging never needs
+# more threads than the providers would admit calls.
+_hedge_pool = _HedgePool(
+    int(os.getenv("AGENTICLABS_HEDGE_POOL_SIZE", "0")) or 2 * default_bulkheads.default_config.max_concurrent
+)
+
+
+@dataclass
+class ExecutionOutcome:
+    provider: str
+    model: str
+    plan: Dict[str, Any]
+    result: Dict[str, Any]
+    failed_over: bool = False
+    attempts: List[Dict[str, Any]] = field(default_factory=list)
+    hedged: bool = False
+    hedge_loser: Optional[Candidate] = None
+    # Set when the losing hedge call had already finished; otherwise it is
+    # still running (sync HTTP calls cannot be aborted) and callers estimate.
+    hedge_loser_result: Optional[Dict[str, Any]] = None
+
+    @property
+    def attempt_count(self) -> int:
+        """Provider calls actually made, including retries and hedges."""
+        return sum(1 for attempt in self.attempts if attempt["outcome"] in {"ok", "error"})
+
+
+@dataclass
+class _Prepared:
+    provider: str
+    model: str
+    key: str
+    impl: Any
+    plan: Dict[str, Any]
+    breaker: CircuitBreaker
+    index: int
+
+
+def _completion_tokens(result: Dict[str, Any]) -> int:
+    tokens = result.get("completion_tokens")
+    if tokens is None:
+        tokens = (result.get("provenance") or {}).get("output_tokens", 0)
+    try:
+        return int(tokens or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def build_candidate_chain(
+    primary: Candidate,
+    ranked_keys: Iterable[str],
+    providers: Mapping[str, Any],
+    *,
+    max_candidates: int = 3,
+) -> List[Candidate]:
+    """
+    Primary first, then the ranked `provider:model` keys, de-duplicated and
+    limited to providers that are actually registered.
+    """
+    chain: List[Candidate] = [primary]
+    seen = {f"{primary[0]}:{primary[1]}"}
+    for key in ranked_keys:
+        if len(chain) >= max_candidates:
+            break
+        if key in seen or ":" not in key:
+            continue
+        provider, model = key.split(":", 1)
+        if provider not in providers:
+            continue
+        seen.add(key)
+        chain.append((provider, model))
+    return chain
+
+
+def hedge_delay_s(key: str, perf_table: LivePerformanceTable) -> float:
+    observed = perf_table.latency_percentile(key, HEDGE_PERCENTILE)
+    delay_ms = observed if observed is not None else HEDGE_DEFAULT_DELAY_MS
+    return max(delay_ms, HEDGE_MIN_DELAY_MS) / 1000.0
+
+
+class _Executor:
+    def __init__(
+        self,
+        candidates: Sequence[Candidate],
+        run_payload: Dict[str, Any],
+        prompt: str,
+        providers: Mapping[str, Any],
+        run_id: str,
+        registry: BreakerRegistry,
+        perf: LivePerformanceTable,
+        retry_policy: RetryPolicy,
+        bulkhead_registry: BulkheadRegistry,
+    ) -> None:
+        self.candidates = list(candidates)
+        self.run_payload = run_payload
+        self.prompt = prompt
+        self.providers = providers
+        self.run_id = run_id
+        self.registry = registry
+        self.perf = perf
+        self.retry_policy = retry_policy
+        self.bulkheads = bulkhead_registry
+        self.deadline = time.monotonic() + retry_policy.deadline_s
+        self.deadline_exceeded = False
+        self.attempts: List[Dict[str, Any]] = []
+        self.last_error: BaseException | None = None
+        self._cursor = 0
+
+    def remaining_s(self) -> float:
+        return self.deadline - time.monotonic()
+
+    def next_prepared(self) -> Optional[_Prepared]:
+        """Advance to the next candidate that is configured and has a closed (or probing) circuit."""
+        while self._cursor < len(self.candidates):
+            if self.remaining_s() <= 0:
+                self.deadline_exceeded = True
+                return None
+            index = self._cursor
+            self._cursor += 1
+            provider_name, model_name = self.candidates[index]
+            key = f"{provider_name}:{model_name}"
+            provider_impl = self.providers.get(provider_name)
+            if provider_impl is None:
+                self.attempts.append({"key": key, "outcome": "not_configured"})
+                continue
+
+            breaker = self.registry.get(key)
+            if not breaker.allow():
+                self.attempts.append({"key": key, "outcome": "circuit_open"})
+                log_event("provider_skipped", {"run_id": self.run_id, "key": key, "reason": "circuit_open"})
+                continue
+
+            with span("provider.plan", provider=provider_name, model=model_name), stage("plan"):
+                plan = provider_impl.plan(self.run_payload, model_name=model_name)
+            log_event("route_plan", {"run_id": self.run_id, "plan": plan})
+            return _Prepared(provider_name, model_name, key, provider_impl, plan, breaker, index)
+        return None
+
+    def call(self, prep: _Prepared, *, hedge: bool = False, attempt: int = 1) -> Dict[str, Any]:
+        try:
+            lease = self.bulkheads.acquire(prep.provider, prep.model, budget_s=self.remaining_s())
+        except BulkheadRejected as exc:
+            # Local saturation, not a provider fault: record nothing, but hand
+            # back a half-open probe slot so the next call can still probe.
+            prep.breaker.release_probe()
+            self.last_error = exc
+            self.attempts.append(
+                {"key": prep.key, "outcome": "shed", "attempt": attempt, "reason": exc.reason, "hedge": hedge}
+            )
+            log_event("provider_shed", {"run_id": self.run_id, "key": prep.key, "reason": exc.reason})
+            raise
+
+        queued_s = lease.queued_s
+        # A copy: the plan itself is logged and returned without the budget.
+        plan = {**prep.plan, "timeout_s": max(self.remaining_s(), MIN_ATTEMPT_TIMEOUT_S)}
+        t0 = time.perf_counter()
+        try:
+            with span(
+                "provider.execute",
+                provider=prep.provider,
+                model=prep.model,
+                candidate=prep.index + 1,
+                attempt=attempt,
+                hedge=hedge,
+                queue_ms=round(queued_s * 1000, 2),
+            ):
+                result = prep.impl.execute(plan, self.prompt)
+        except Exception as exc:
+            latency_ms = (time.perf_counter() - t0) * 1000.0
+            prep.breaker.record_failure(exc)
+            self.perf.record_failure(prep.key, latency_ms)
+            self.last_error = exc
+            self.attempts.append(
+                {
+                    "key": prep.key,
+                    "outcome": "error",
+                    "attempt": attempt,
+                    "status_code": getattr(exc, "status_code", None),
+                    "retryable": is_retryable(exc),
+                    "error": str(exc)[:300],
+                    "latency_ms": round(latency_ms, 2),
+                    "queue_ms": round(queued_s * 1000, 2),
+                    "hedge": hedge,
+                }
+            )
+            log_event("provider_failed", {"run_id": self.run_id, "key": prep.key, "error": str(exc)[:300]})
+            raise
+        finally:
+            lease.release()
+
+        latency_ms = (time.perf_counter() - t0) * 1000.0
+        prep.breaker.record_success()
+        self.perf.record_success(prep.key, latency_ms, _completion_tokens(result))
+        self.attempts.append(
+            {
+                "key": prep.key,
+                "outcome": "ok",
+                "attempt": attempt,
+                "latency_ms": round(latency_ms, 2),
+                "queue_ms": round(queued_s * 1000, 2),
+                "hedge": hedge,
+            }
+        )
+        return result
+
+    def call_with_retry(self, prep: _Prepared) -> Optional[Dict[str, Any]]:
+        """
+        Call `prep`, retrying transient errors with backoff. Returns None when
+        the caller should fall through to the next candidate.
+        """
+        attempt = 1
+        while True:
+            try:
+                return self.call(prep, attempt=attempt)
+            except Exception as exc:
+                if not is_retryable(exc) or attempt >= self.retry_policy.max_attempts_per_model:
+                    return None
+                delay = self.retry_policy.backoff_s(attempt, getattr(exc, "retry_after", None))
+                if delay is None or delay >= self.remaining_s():
+                    return None
+                # A retry is a new call as far as the breaker is concerned.
+                if not prep.breaker.allow():
+                    return None
+                log_event(
+                    "provider_retry",
+                    {"run_id": self.run_id, "key": prep.key, "attempt": attempt + 1, "delay_s": round(delay, 3)},
+                )
+                time.sleep(delay)
+                attempt += 1
+
+    def outcome(self, prep: _Prepared, result: Dict[str, Any]) -> ExecutionOutcome:
+        return ExecutionOutcome(
+            provider=prep.provider,
+            model=prep.model,
+            plan=prep.plan,
+            result=result,
+            failed_over=prep.index > 0,
+            attempts=self.attempts,
+        )
+
+    def submit(self, prep: _Prepared, *, hedge: bool) -> "Optional[Future[Dict[str, Any]]]":
+        """Start `prep` on the hedge pool, or return None when the pool is full."""
+        # Each task runs in its own copy of the caller's context so spans nest.
+        ctx = contextvars.copy_context()
+        future = _hedge_pool.try_submit(ctx.run, self.call, prep, hedge=hedge)
+        if future is None:
+            log_event("provider_hedge_skipped", {"run_id": self.run_id, "key": prep.key, "reason": "pool_full"})
+        return future
+
+    def run_hedged(self, primary: _Prepared) -> Optional[ExecutionOutcome]:
+        """
+        Race `primary` against the next candidate once the primary passes its
+        hedge delay. Returns None if every hedged call failed so the caller can
+        continue the normal failover chain. With the hedge pool full the
+        primary runs on this thread, unhedged, with the usual retries.
+        """
+        primary_future = self.submit(primary, hedge=False)
+        if primary_future is None:
+            result = self.call_with_retry(primary)
+            return self.outcome(primary, result) if result is not None else None
+        delay = min(hedge_delay_s(primary.key, self.perf), max(0.0, self.remaining_s()))
+        done, _ = wait([primary_future], timeout=delay)
+        if done and primary_future.exception() is None:
+            return self.outcome(primary, primary_future.result())
+
+        backup = None if done else self.next_prepared()
+        backup_future = self.submit(backup, hedge=True) if backup is not None else None
+        if backup is not None and backup_future is None:
+            # Not started: give back any half-open probe it reserved and
+            # leave it in the failover chain.
+            backup.breaker.release_probe()
+            self._cursor = backup.index
+        if backup_future is None:
+            try:
+                return self.outcome(primary, primary_future.result())
+            except Exception:
+                return None
+
+        log_event("provider_hedged", {"run_id": self.run_id, "primary": primary.key, "backup": backup.key})
+        pending = {primary_future: primary, backup_future: backup}
+        while pending:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in done:
+                winner = pending.pop(future)
+                if future.exception() is not None:
+                    continue
+                loser_future, loser = next(iter(pending.items())) if pending else (None, None)
+                outcome = self.outcome(winner, future.result())
+                outcome.hedged = True
+                if loser is not None and loser_future is not None:
+                    loser_future.cancel()
+                    outcome.hedge_loser = (loser.provider, loser.model)
+                    if loser_future.done() and not loser_future.cancelled() and loser_future.exception() is None:
+                        outcome.hedge_loser_result = loser_future.result()
+                    log_event(
+                        "provider_hedge_result",
+                        {"run_id": self.run_id, "winner": winner.key, "loser": loser.key},
+                    )
+                return outcome
+        return None
+
+
+def execute_with_failover(
+    candidates: Sequence[Candidate],
+    run_payload: Dict[str, Any],
+    prompt: str,
+    *,
+    providers: Mapping[str, Any],
+    run_id: str,
+    hedge: bool = False,
+    breaker_registry: BreakerRegistry | None = None,
+    perf_table: LivePerformanceTable | None = None,
+    retry_policy: RetryPolicy | None = None,
+    bulkhead_registry: BulkheadRegistry | None = None,
+) -> ExecutionOutcome:
+    executor = _Executor(
+        candidates,
+        run_payload,
+        prompt,
+        providers,
+        run_id,
+        breaker_registry or default_breakers,
+        perf_table or default_model_stats,
+        retry_policy or default_retry_policy,
+        bulkhead_registry or default_bulkheads,
+    )
+
+    first = True
+    while True:
+        prep = executor.next_prepared()
+        if prep is None:
+            break
+        if hedge and first:
+            first = False
+            outcome = executor.run_hedged(prep)
+            if outcome is not None:
+                return outcome
+            continue
+        first = False
+        result = executor.call_with_retry(prep)
+        if result is not None:
+            return executor.outcome(prep, result)
+
+    raise NoProviderAvailableError(
+        list(dict.fromkeys(a["key"] for a in executor.attempts)),
+        executor.last_error,
+        deadline_exceeded=executor.deadline_exceeded,
+    )
+
+
+__all__ = [
+    "Candidate",
+    "ExecutionOutcome",
+    "build_candidate_chain",
+    "execute_with_failover",
+    "hedge_delay_s",
+]
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+import threading
 import time
 from typing import Any, Dict, List
 
@@ -9,8 +10,13 @@ try:  # pragma: no cover - optional dependency
 except ImportError:  # pragma: no cover - optional dependency
     genai = None  # type: ignore
 
+from . import _async_runtime
+from .errors import ProviderError
+from .retry import attempt_timeout_s
+
 DEFAULT_MODEL = "gemini-2.0-flash"
 DEFAULT_MAX_TOKENS = 1024
+GEMINI_TIMEOUT_S = float(os.getenv("GEMINI_TIMEOUT_S", "60"))
 
 GEMINI_PRICING: Dict[str, Dict[str, float]] = {
     # USD cost per token
@@ -28,19 +34,38 @@ def _estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> fl
 
 
 class GeminiProvider:
+    """
+    Generation runs as a streamed async call on the shared provider loop.
+    Model handles are cached per model ID; each keeps its async client, so
+    the underlying channel is reused across requests.
+    """
+
     def __init__(self) -> None:
         self._configured = False
+        self._models: Dict[str, Any] = {}
+        self._models_lock = threading.Lock()
 
     def _ensure_configured(self) -> None:
         if genai is None:
-            raise RuntimeError("google-generativeai is not installed. Add it to requirements.")
+            raise ProviderError(
+                "gemini", None, "google-generativeai is not installed. Add it to requirements.", retryable=False
+            )
         if not self._configured:
             api_key = os.getenv("GEMINI_API_KEY")
             if not api_key:
-                raise RuntimeError("GEMINI_API_KEY is not configured")
+                raise ProviderError("gemini", None, "GEMINI_API_KEY is not configured", retryable=False)
             genai.configure(api_key=api_key)
             self._configured = True
 
+    def _model(self, model: str) -> Any:
+        handle = self._models.get(model)
+        if handle is None:
+            with self._models_lock:
+                handle = self._models.get(model)
+                if handle is None:
+                    handle = self._models[model] = genai.GenerativeModel(model)
+        return handle
+
     @staticmethod
     def _collapse_messages(messages: List[Dict[str, Any]]) -> str:
         user_chunks: List[str] = []
@@ -91,14 +116,23 @@ class GeminiProvider:
                 messages=[{"role": "user", "content": prompt}],
                 temperature=temperature,
                 max_tokens=max_tokens,
+                timeout_s=attempt_timeout_s(plan, GEMINI_TIMEOUT_S),
             )
             text_output = resp["content"].strip()
             latency_ms = resp["latency_ms"]
             usage = resp.get("usage") or {}
             prompt_tokens = int(usage.get("prompt_tokens", 0))
             completion_tokens = int(usage.get("completion_tokens", 0))
-        except Exception as exc:  # pragma: no cover - safety net
-            text_output = f"[Gemini error] {exc}"
+        except ProviderError:
+            raise
+        except Exception as exc:
+            code = getattr(exc, "code", None)
+            raise ProviderError(
+                "gemini",
+                model,
+                str(exc),
+                status_code=code if isinstance(code, int) else None,
+            ) from exc
 
         cost_usd = _estimate_cost(model, prompt_tokens, completion_tokens)
 
@@ -125,6 +159,22 @@ class GeminiProvider:
         *,
         temperature: float = 0.3,
         max_tokens: int = DEFAULT_MAX_TOKENS,
+        timeout_s: float = GEMINI_TIMEOUT_S,
+    ) -> Dict[str, Any]:
+        self._ensure_configured()
+        return _async_runtime.run(
+            self.chat_async(model, messages, temperature=temperature, max_tokens=max_tokens, timeout_s=timeout_s),
+            timeout_s=timeout_s,
+        )
+
+    async def chat_async(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        *,
+        temperature: float = 0.3,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        timeout_s: float = GEMINI_TIMEOUT_S,
     ) -> Dict[str, Any]:
         self._ensure_configured()
         user_text = self._collapse_messages(messages) or ""
@@ -134,19 +184,31 @@ class GeminiProvider:
             "max_output_tokens": max_tokens,
         }
 
-        gen_model = genai.GenerativeModel(model)
-
         t0 = time.perf_counter()
-        resp = gen_model.generate_content(
+        resp = await self._model(model).generate_content_async(
             user_text,
             generation_config=generation_config,
+            stream=True,
+            request_options={"timeout": timeout_s},
         )
+        chunks: List[str] = []
+        prompt_tokens = 0
+        completion_tokens = 0
+        async for chunk in resp:
+            try:
+                chunks.append(chunk.text)
+            except ValueError:
+                # Chunks without text parts (e.g. the final finish_reason chunk).
+                pass
+            # Usage is cumulative and usually only set on the last chunk.
+            usage = getattr(chunk, "usage_metadata", None)
+            if usage:
+                prompt_tokens = max(prompt_tokens, getattr(usage, "prompt_token_count", 0) or 0)
+                completion_tokens = max(completion_tokens, getattr(usage, "candidates_token_count", 0) or 0)
         latency_ms = (time.perf_counter() - t0) * 1000.0
 
-        text = getattr(resp, "text", "") or ""
-        usage = getattr(resp, "usage_metadata", None)
-        prompt_tokens = getattr(usage, "prompt_token_count", 0) if usage else 0
-        completion_tokens = getattr(usage, "candidates_token_count", 0) if usage else 0
+        # No text at all: let the SDK raise its explanation (e.g. a safety block).
+        text = "".join(chunks) if chunks else (getattr(resp, "text", "") or "")
 
         return {
             "content": text,
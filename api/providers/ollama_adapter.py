@@ -1,12 +1,43 @@
+import json
 import os
+import threading
 import time
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, Iterator, List
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from logger import log_event
+from tracing import inject_trace_headers
+
+from .errors import ProviderError, retry_after_from_headers
+from .ollama_sessions import session_contexts
+from .retry import attempt_timeout_s
 
 OLLAMA_BASE = os.getenv("OLLAMA_URL", "http://host.docker.internal:11434")
 DEFAULT_MODEL = os.getenv("OLLAMA_MODEL", "qwen2:7b-instruct")
-TIMEOUT = 120  # seconds
+CONNECT_TIMEOUT = float(os.getenv("OLLAMA_CONNECT_TIMEOUT_S", "5"))
+# Streaming: the read timeout bounds the gap between chunks (or the model
+# load before the first one), not the whole generation.
+READ_TIMEOUT = float(os.getenv("OLLAMA_READ_TIMEOUT_S", "120"))
+# Upper bound on a whole generation; the executor's remaining deadline caps
+# it further for routed calls.
+TOTAL_TIMEOUT = float(os.getenv("OLLAMA_TOTAL_TIMEOUT_S", "300"))
+# How long Ollama keeps a model loaded after a request ("30m", "-1" = forever).
+KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+PRELOAD_ENABLED = os.getenv("OLLAMA_PRELOAD", "1").lower() not in {"0", "false", "no"}
+
+_session = requests.Session()
+_session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+
+def _keep_alive() -> Any:
+    # Ollama takes durations as strings and plain seconds as numbers.
+    try:
+        return int(KEEP_ALIVE)
+    except ValueError:
+        return KEEP_ALIVE
 
 
 def _estimate_tokens(text: str) -> int:
@@ -18,38 +49,118 @@ def plan(req: Dict[str, Any], model_name: str | None = None) -> Dict[str, Any]:
     prompt = req.get("prompt", "")
     tokens = _estimate_tokens(prompt)
     model = model_name or DEFAULT_MODEL
-    return {
+    planned: Dict[str, Any] = {
         "target": {"provider": "ollama", "model": model},
         "est_tokens": tokens,
         "est_cost_usd": 0.0,
     }
+    max_tokens = req.get("max_tokens")
+    if isinstance(max_tokens, int) and max_tokens > 0:
+        # Ollama's name for the completion token limit.
+        planned["options"] = {"num_predict": max_tokens}
+    if req.get("session_id"):
+        planned["session"] = [
+            str(req.get("tenant_id") or ""),
+            str(req.get("agent_id") or "default-agent"),
+            str(req["session_id"]),
+        ]
+    return planned
 
 
-def execute(plan: Dict[str, Any], prompt: str) -> Dict[str, Any]:
-    target = plan.get("target") or {}
-    model = target.get("model") or DEFAULT_MODEL
+def _raise_http_error(model: str, e: requests.HTTPError) -> None:
+    response = e.response
+    raise ProviderError(
+        "ollama",
+        model,
+        str(e),
+        status_code=response.status_code if response is not None else None,
+        retry_after=retry_after_from_headers(response.headers) if response is not None else None,
+    ) from e
+
+
+def stream_generate(
+    model: str, prompt: str, *, timeout_s: float | None = None, **options: Any
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield Ollama's NDJSON chunks for one /api/generate call. The last chunk
+    has `done: true` and carries the eval counts and timings. With
+    `timeout_s` the whole generation must finish within it, not just each
+    gap between chunks.
+    """
+    deadline = time.monotonic() + timeout_s if timeout_s is not None else None
+    read_timeout = min(READ_TIMEOUT, timeout_s) if timeout_s is not None else READ_TIMEOUT
     payload = {
         "model": model,
         "prompt": prompt,
-        "stream": False,
+        "stream": True,
+        "keep_alive": _keep_alive(),
+        **options,
     }
-
-    start = time.time()
     try:
-        resp = requests.post(f"{OLLAMA_BASE}/api/generate", json=payload, timeout=TIMEOUT)
-        resp.raise_for_status()
-        data = resp.json()
-        output = data.get("response", "")
+        with _session.post(
+            f"{OLLAMA_BASE}/api/generate",
+            json=payload,
+            headers=inject_trace_headers(),
+            timeout=(CONNECT_TIMEOUT, read_timeout),
+            stream=True,
+        ) as resp:
+            resp.raise_for_status()
+            for line in resp.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise ProviderError("ollama", model, str(chunk["error"]))
+                yield chunk
+                if deadline is not None and not chunk.get("done") and time.monotonic() > deadline:
+                    # Closing the response makes Ollama stop generating.
+                    raise ProviderError("ollama", model, f"Generation exceeded {timeout_s:.1f}s")
     except requests.HTTPError as e:
-        output = f"[Ollama HTTP error] {e.response.status_code if e.response else 'unknown'}: {e}"
+        _raise_http_error(model, e)
     except requests.RequestException as e:
-        output = f"[Ollama error] {e}"
+        raise ProviderError("ollama", model, str(e)) from e
+    except ValueError as e:
+        raise ProviderError("ollama", model, f"Invalid stream chunk: {e}") from e
+
 
-    latency_ms = int((time.time() - start) * 1000)
-    tokens_in = _estimate_tokens(prompt)
-    tokens_out = _estimate_tokens(output)
+def execute(plan: Dict[str, Any], prompt: str) -> Dict[str, Any]:
+    target = plan.get("target") or {}
+    model = target.get("model") or DEFAULT_MODEL
+    session = tuple(plan["session"]) if plan.get("session") else None
+    # Earlier turns of this session, already evaluated by Ollama.
+    context, reset_reason = session_contexts.lookup(session, model) if session else (None, None)
+    options: Dict[str, Any] = {"context": context} if context else {}
+    if plan.get("options"):
+        options["options"] = dict(plan["options"])
 
-    return {
+    start = time.perf_counter()
+    first_token_ms = None
+    parts: List[str] = []
+    final: Dict[str, Any] = {}
+    try:
+        for chunk in stream_generate(model, prompt, timeout_s=attempt_timeout_s(plan, TOTAL_TIMEOUT), **options):
+            text = chunk.get("response") or ""
+            if text and first_token_ms is None:
+                first_token_ms = int((time.perf_counter() - start) * 1000)
+            parts.append(text)
+            if chunk.get("done"):
+                final = chunk
+    except ProviderError as exc:
+        # A timeout or 5xx says nothing about the context, and the retry (or
+        # the next turn) should still continue from it.
+        if session and not exc.retryable:
+            session_contexts.discard(session)
+        raise
+    output = "".join(parts)
+    if session:
+        session_contexts.put(session, model, final.get("context") or [])
+
+    latency_ms = int((time.perf_counter() - start) * 1000)
+    # prompt_eval_count is omitted when the whole prompt was already cached.
+    tokens_in = int(final.get("prompt_eval_count") or 0) or _estimate_tokens(prompt)
+    tokens_out = int(final.get("eval_count") or 0) or _estimate_tokens(output)
+
+    result: Dict[str, Any] = {
         "output": output.strip(),
         "confidence": 0.9,
         "latency_ms": latency_ms,
@@ -59,6 +170,59 @@ def execute(plan: Dict[str, Any], prompt: str) -> Dict[str, Any]:
         "provenance": {
             "provider": "ollama",
             "model": model,
-            "parameters": {"stream": False},
+            "parameters": {
+                "stream": True,
+                "keep_alive": KEEP_ALIVE,
+                "ttft_ms": first_token_ms,
+                # Nanoseconds in Ollama's response; non-zero means a cold load.
+                "load_ms": int((final.get("load_duration") or 0) / 1_000_000),
+                "session_context_tokens": len(context or []),
+            },
         },
     }
+    if session:
+        result["session_context_reset"] = reset_reason is not None
+        result["session_context_reset_reason"] = reset_reason
+    return result
+
+
+def preload(models: Iterable[str]) -> Dict[str, bool]:
+    """Load models into Ollama's memory (an empty generate) so first requests skip the load."""
+    loaded: Dict[str, bool] = {}
+    for model in dict.fromkeys(models):
+        t0 = time.perf_counter()
+        try:
+            resp = _session.post(
+                f"{OLLAMA_BASE}/api/generate",
+                json={"model": model, "keep_alive": _keep_alive()},
+                timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+            )
+            resp.raise_for_status()
+            loaded[model] = True
+            log_event("ollama_preload", {"model": model, "ms": round((time.perf_counter() - t0) * 1000, 1)})
+        except requests.RequestException as e:
+            loaded[model] = False
+            log_event("ollama_preload_failed", {"model": model, "error": str(e)[:300]})
+    return loaded
+
+
+def routed_models() -> List[str]:
+    """Ollama models the routing rules and model registry can send traffic to."""
+    from config.model_registry import MODEL_REGISTRY
+    from router.routing_rules import load_routing_rules
+
+    models = [DEFAULT_MODEL]
+    for bands in load_routing_rules().values():
+        models += [cfg["model"] for cfg in bands.values() if cfg.get("provider") == "ollama"]
+    models += [cfg.model_id for cfg in MODEL_REGISTRY.values() if cfg.provider == "ollama"]
+    return list(dict.fromkeys(models))
+
+
+def preload_in_background() -> threading.Thread | None:
+    if not PRELOAD_ENABLED:
+        return None
+    thread = threading.Thread(
+        target=lambda: preload(routed_models()), name="agenticlabs-ollama-preload", daemon=True
+    )
+    thread.start()
+    return thread
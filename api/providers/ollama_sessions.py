@@ -0,0 +1,136 @@
+"""
+Ollama `context` arrays kept between turns of an agent session.
+
+/api/generate returns the encoded conversation as `context`; sending it back
+with the next prompt lets Ollama continue without re-evaluating the earlier
+turns. Entries are keyed by (tenant, agent, session), tied to the model that
+produced them, and bounded by count, total tokens and idle time with LRU
+eviction. Tokens are stored as 32-bit arrays to keep memory predictable.
+
+A session whose context is dropped (evicted, expired, model changed or
+discarded after an error) is remembered, within the same count bound, so
+the next turn can report that it started over without its history.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+SessionKey = Tuple[str, str, str]
+
+
+@dataclass
+class _Entry:
+    model: str
+    tokens: array
+    touched: float
+
+
+class SessionContextStore:
+    def __init__(
+        self,
+        *,
+        max_sessions: int = 1000,
+        max_total_tokens: int = 8_000_000,
+        max_session_tokens: int = 131_072,
+        ttl_s: float = 1800.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_sessions = max(1, max_sessions)
+        self.max_total_tokens = max(1, max_total_tokens)
+        self.max_session_tokens = max(1, max_session_tokens)
+        self.ttl_s = ttl_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[SessionKey, _Entry]" = OrderedDict()
+        # Why a session's context went away, until its next turn reads it.
+        self._lost: "OrderedDict[SessionKey, str]" = OrderedDict()
+        self._total_tokens = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "SessionContextStore":
+        return cls(
+            max_sessions=int(os.getenv("OLLAMA_SESSION_MAX", "1000")),
+            max_total_tokens=int(os.getenv("OLLAMA_SESSION_MAX_TOTAL_TOKENS", "8000000")),
+            max_session_tokens=int(os.getenv("OLLAMA_SESSION_MAX_TOKENS", "131072")),
+            ttl_s=float(os.getenv("OLLAMA_SESSION_TTL_S", "1800")),
+        )
+
+    def _drop(self, key: SessionKey, reason: Optional[str] = None) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._total_tokens -= len(entry.tokens)
+        if reason is not None:
+            self._lost[key] = reason
+            self._lost.move_to_end(key)
+            while len(self._lost) > self.max_sessions:
+                self._lost.popitem(last=False)
+
+    def lookup(self, key: SessionKey, model: str) -> Tuple[Optional[List[int]], Optional[str]]:
+        """
+        (tokens, None) on a hit. On a miss, (None, reason) when the session
+        had a context that was dropped since its last turn ("evicted",
+        "expired", "model_changed", "too_long", "error"), else (None, None).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.model != model:
+                self._drop(key, "model_changed")
+            elif entry is not None and self._clock() - entry.touched > self.ttl_s:
+                self._drop(key, "expired")
+            elif entry is not None:
+                entry.touched = self._clock()
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.tokens.tolist(), None
+            self.misses += 1
+            return None, self._lost.pop(key, None)
+
+    def get(self, key: SessionKey, model: str) -> Optional[List[int]]:
+        return self.lookup(key, model)[0]
+
+    def put(self, key: SessionKey, model: str, tokens: Sequence[int]) -> None:
+        with self._lock:
+            self._drop(key)
+            self._lost.pop(key, None)
+            # Past this size Ollama truncates anyway; start the session over.
+            if len(tokens) > self.max_session_tokens:
+                self._lost[key] = "too_long"
+                return
+            if not tokens:
+                return
+            self._entries[key] = _Entry(model, array("i", tokens), self._clock())
+            self._total_tokens += len(tokens)
+            while len(self._entries) > self.max_sessions or self._total_tokens > self.max_total_tokens:
+                oldest = next(iter(self._entries))
+                self._drop(oldest, "evicted")
+                self.evictions += 1
+
+    def discard(self, key: SessionKey, reason: str = "error") -> None:
+        with self._lock:
+            self._drop(key, reason)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sessions": len(self._entries),
+                "total_tokens": self._total_tokens,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+session_contexts = SessionContextStore.from_env()
+
+__all__ = ["SessionContextStore", "SessionKey", "session_contexts"]
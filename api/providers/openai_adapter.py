@@ -5,6 +5,12 @@ from typing import Any, Dict
 import requests
 
 from pricing import estimate_cost
+from tracing import inject_trace_headers
+
+from .errors import ProviderError, retry_after_from_headers
+from .retry import attempt_timeout_s
+
+OPENAI_TIMEOUT_S = float(os.getenv("OPENAI_TIMEOUT_S", "60"))
 
 
 def plan(run_payload: Dict[str, Any], model_name: str = "gpt-4o-mini") -> Dict[str, Any]:
@@ -36,9 +42,11 @@ def execute(plan: Dict[str, Any], prompt: str) -> Dict[str, Any]:
     temperature = params.get("temperature", 0.2)
     max_tokens = params.get("max_tokens", 512)
 
+    timeout_s = attempt_timeout_s(plan, OPENAI_TIMEOUT_S)
+
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
-        raise RuntimeError("OPENAI_API_KEY is not configured")
+        raise ProviderError("openai", model, "OPENAI_API_KEY is not configured", retryable=False)
 
     payload = {
         "model": model,
@@ -56,20 +64,34 @@ def execute(plan: Dict[str, Any], prompt: str) -> Dict[str, Any]:
         "max_tokens": max_tokens,
     }
 
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-    }
+    headers = inject_trace_headers(
+        {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        }
+    )
 
     t0 = time.perf_counter()
-    resp = requests.post(
-        os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1") + "/chat/completions",
-        json=payload,
-        headers=headers,
-        timeout=60,
-    )
+    try:
+        resp = requests.post(
+            os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1") + "/chat/completions",
+            json=payload,
+            headers=headers,
+            timeout=(min(5.0, timeout_s), timeout_s),
+        )
+        resp.raise_for_status()
+    except requests.HTTPError as exc:
+        response = exc.response
+        raise ProviderError(
+            "openai",
+            model,
+            str(exc),
+            status_code=response.status_code if response is not None else None,
+            retry_after=retry_after_from_headers(response.headers) if response is not None else None,
+        ) from exc
+    except requests.RequestException as exc:
+        raise ProviderError("openai", model, str(exc)) from exc
     latency_ms = int((time.perf_counter() - t0) * 1000)
-    resp.raise_for_status()
     data = resp.json()
 
     choice = (data.get("choices") or [{}])[0]
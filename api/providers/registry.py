@@ -0,0 +1,107 @@
+"""
+Lazy provider registry.
+
+Adapters for hosted APIs import their vendor SDKs at module load, and the
+Gemini SDK alone costs several hundred milliseconds. Most workers only ever
+route to one or two providers, so the registry knows every provider by name
+but imports an adapter module the first time that provider is looked up.
+Membership tests (`name in PROVIDERS`) and iteration never import anything.
+
+An adapter whose import fails (an SDK missing from the image) is treated as
+not registered: lookups raise KeyError, so `PROVIDERS.get(name)` is None and
+the executor records the candidate as not configured. The failure is cached
+and logged once rather than retried on every request.
+"""
+
+from __future__ import annotations
+
+import importlib
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional
+
+from logger import log_event
+
+
+class ProviderRegistry(Mapping[str, Any]):
+    """
+    Maps provider name -> adapter. Each spec is "module" (the module is the
+    adapter) or "module:attribute" (an adapter instance defined in it).
+    """
+
+    def __init__(self, specs: Mapping[str, str]) -> None:
+        self._specs = dict(specs)
+        self._loaded: Dict[str, Any] = {}
+        self._failed: Dict[str, str] = {}
+        self._import_ms: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> Any:
+        adapter = self._loaded.get(name)
+        if adapter is not None:
+            return adapter
+        if name not in self._specs or name in self._failed:
+            raise KeyError(name)
+        with self._lock:
+            if name in self._loaded:
+                return self._loaded[name]
+            if name in self._failed:
+                raise KeyError(name)
+            module_name, _, attribute = self._specs[name].partition(":")
+            t0 = time.perf_counter()
+            try:
+                module = importlib.import_module(module_name)
+                adapter = getattr(module, attribute) if attribute else module
+            except (ImportError, AttributeError) as exc:
+                self._failed[name] = f"{type(exc).__name__}: {exc}"
+                log_event("provider_import_failed", {"provider": name, "module": module_name, "error": str(exc)})
+                raise KeyError(name) from exc
+            self._import_ms[name] = (time.perf_counter() - t0) * 1000.0
+            self._loaded[name] = adapter
+        log_event("provider_loaded", {"provider": name, "import_ms": round(self._import_ms[name], 1)})
+        return adapter
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._specs and name not in self._failed
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name in self._specs if name not in self._failed)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def register(self, name: str, spec: str) -> None:
+        """Add or replace a provider; a replaced adapter is re-imported on next lookup."""
+        with self._lock:
+            self._specs[name] = spec
+            self._loaded.pop(name, None)
+            self._failed.pop(name, None)
+            self._import_ms.pop(name, None)
+
+    def load(self, names: Optional[Iterable[str]] = None) -> Dict[str, Optional[str]]:
+        """Import `names` (default: all) now. Returns name -> None, or the import error."""
+        results: Dict[str, Optional[str]] = {}
+        for name in list(names) if names is not None else list(self._specs):
+            try:
+                self[name]
+                results[name] = None
+            except KeyError:
+                results[name] = self._failed.get(name, "unknown provider")
+        return results
+
+    def loaded(self) -> Dict[str, Any]:
+        return dict(self._loaded)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        out: Dict[str, Dict[str, Any]] = {}
+        for name in self._specs:
+            if name in self._loaded:
+                out[name] = {"state": "loaded", "import_ms": round(self._import_ms[name], 1)}
+            elif name in self._failed:
+                out[name] = {"state": "failed", "error": self._failed[name]}
+            else:
+                out[name] = {"state": "not_loaded"}
+        return out
+
+
+__all__ = ["ProviderRegistry"]
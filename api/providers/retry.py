@@ -0,0 +1,76 @@
+"""
+Retry policy for provider calls.
+
+Transient failures (429, 5xx, timeouts) are retried on the same model with
+capped, fully jittered exponential backoff; a server-supplied Retry-After
+replaces the computed delay, and one longer than `max_retry_after_s` moves
+straight on to the next model in the chain. Everything happens inside a total
+deadline so a slow chain of retries and fallbacks cannot hold a request
+forever. Each call gets what is left of the deadline as `plan["timeout_s"]`,
+which adapters use to cap their own HTTP timeouts (`attempt_timeout_s`).
+"""
+
+from __future__ import annotations
+
+import os
+import random
+from dataclasses import dataclass
+from typing import Any, Callable, Mapping
+
+from .errors import ProviderError
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts_per_model: int = 2
+    base_delay_s: float = 0.25
+    max_delay_s: float = 4.0
+    max_retry_after_s: float = 10.0
+    deadline_s: float = 60.0
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        return cls(
+            max_attempts_per_model=int(os.getenv("AGENTICLABS_RETRY_MAX_ATTEMPTS", "2")),
+            base_delay_s=float(os.getenv("AGENTICLABS_RETRY_BASE_DELAY_S", "0.25")),
+            max_delay_s=float(os.getenv("AGENTICLABS_RETRY_MAX_DELAY_S", "4")),
+            max_retry_after_s=float(os.getenv("AGENTICLABS_RETRY_MAX_RETRY_AFTER_S", "10")),
+            deadline_s=float(os.getenv("AGENTICLABS_PROVIDER_DEADLINE_S", "60")),
+        )
+
+    def backoff_s(
+        self,
+        attempt: int,
+        retry_after: float | None = None,
+        rand: Callable[[], float] = random.random,
+    ) -> float | None:
+        """
+        Delay before retry number `attempt` (1-based), or None when the server
+        asked for a longer pause than we are willing to wait on this model.
+        """
+        if retry_after is not None:
+            if retry_after > self.max_retry_after_s:
+                return None
+            return max(0.0, retry_after)
+        ceiling = min(self.max_delay_s, self.base_delay_s * (2 ** max(0, attempt - 1)))
+        return ceiling * rand()
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, ProviderError):
+        return exc.retryable
+    return isinstance(exc, (TimeoutError, ConnectionError))
+
+
+def attempt_timeout_s(plan: Mapping[str, Any], default_s: float) -> float:
+    """An adapter's timeout for this call: `default_s`, capped by the executor's remaining budget."""
+    budget = plan.get("timeout_s")
+    if isinstance(budget, (int, float)) and budget > 0:
+        return min(default_s, float(budget))
+    return default_s
+
+
+default_retry_policy = RetryPolicy.from_env()
+
+
+__all__ = ["RetryPolicy", "attempt_timeout_s", "default_retry_policy", "is_retryable"]
@@ -1,34 +1,96 @@
+"""
+Synthetic provider. With no configuration it answers in ~10 ms by echoing
+the prompt; for load tests give it a latency/fault profile:
+
+    AGENTICLABS_STUB_PROFILE="distribution=lognormal,ttft_ms=300,tokens_per_s=80,rate_limit_rate=0.02"
+    AGENTICLABS_STUB_PROFILE_STUB_SLOW_1="distribution=bimodal,ttft_ms=200,slow_ms=4000"
+
+The second form applies to one model name (non-alphanumerics become "_").
+See providers.synthetic for the profile fields.
+"""
+
+import os
+import random
+import threading
 import time
-from typing import Dict, Any
+from typing import Any, Dict
+
+from .errors import ProviderError
+from .synthetic import SyntheticProfile, estimate_tokens
 
 PRICING_USD_PER_1K_TOKENS = 0.0005  # e.g., $0.50 / 1M tokens
+DEFAULT_MODEL = "stub-echo-1"
+
+_rng = random.Random(os.getenv("AGENTICLABS_STUB_SEED"))
+_profiles: Dict[str, SyntheticProfile] = {}
+_profiles_lock = threading.Lock()
+
+
+def _env_profile(model: str) -> SyntheticProfile:
+    base = SyntheticProfile.parse(os.getenv("AGENTICLABS_STUB_PROFILE", ""))
+    env_name = "AGENTICLABS_STUB_PROFILE_" + "".join(c if c.isalnum() else "_" for c in model).upper()
+    raw = os.getenv(env_name)
+    return SyntheticProfile.parse(raw, base) if raw else base
 
-def _estimate_tokens(text: str) -> int:
-    # super rough: ~4 chars per token
-    return max(1, int(len(text) / 4))
 
-def plan(req: Dict[str, Any]) -> Dict[str, Any]:
+def profile_for(model: str) -> SyntheticProfile:
+    with _profiles_lock:
+        profile = _profiles.get(model)
+        if profile is None:
+            profile = _profiles[model] = _env_profile(model)
+        return profile
+
+
+def configure(model: str, profile: SyntheticProfile | None) -> None:
+    """Set (or with None, reset to the env default) the profile for `model` at runtime."""
+    with _profiles_lock:
+        if profile is None:
+            _profiles.pop(model, None)
+        else:
+            _profiles[model] = profile
+
+
+def plan(req: Dict[str, Any], model_name: str | None = None) -> Dict[str, Any]:
     prompt = req.get("prompt", "")
-    tokens = _estimate_tokens(prompt)
+    tokens = estimate_tokens(prompt)
     est_cost = (tokens / 1000.0) * PRICING_USD_PER_1K_TOKENS
     return {
-        "target": {"provider": "stub", "model": "stub-echo-1"},
+        "target": {"provider": "stub", "model": model_name or DEFAULT_MODEL},
         "est_tokens": tokens,
         "est_cost_usd": est_cost,
     }
 
+
 def execute(plan: Dict[str, Any], prompt: str) -> Dict[str, Any]:
-    start = time.time()
-    # pretend to "think"
-    time.sleep(0.01)
-    output = f"Stub summary: {prompt}"
+    model = (plan.get("target") or {}).get("model") or DEFAULT_MODEL
+    profile = profile_for(model)
+    start = time.perf_counter()
+
+    fault = profile.sample_fault(_rng)
+    if fault is not None:
+        time.sleep(profile.sample_ttft_s(_rng))
+        raise ProviderError(
+            "stub",
+            model,
+            f"synthetic {fault}",
+            status_code=fault,
+            retry_after=profile.retry_after_s if fault == 429 else None,
+        )
+
+    first_token_ms = None
+    parts = []
+    for piece in profile.stream(profile.completion(prompt), _rng):
+        if first_token_ms is None:
+            first_token_ms = int((time.perf_counter() - start) * 1000)
+        parts.append(piece)
+    output = "".join(parts)
 
-    tokens_in = _estimate_tokens(prompt)
-    tokens_out = _estimate_tokens(output)
+    tokens_in = estimate_tokens(prompt)
+    tokens_out = estimate_tokens(output)
     total_tokens = tokens_in + tokens_out
     cost = (total_tokens / 1000.0) * PRICING_USD_PER_1K_TOKENS
 
-    latency_ms = int((time.time() - start) * 1000)
+    latency_ms = int((time.perf_counter() - start) * 1000)
     return {
         "output": output,
         "confidence": 0.95,  # fixed high confidence for stub
@@ -38,7 +100,11 @@ def execute(plan: Dict[str, Any], prompt: str) -> Dict[str, Any]:
         "completion_tokens": tokens_out,
         "provenance": {
             "provider": "stub",
-            "model": "stub-echo-1",
-            "parameters": {"temperature": 0.0}
-        }
+            "model": model,
+            "parameters": {
+                "temperature": 0.0,
+                "distribution": profile.distribution,
+                "ttft_ms": first_token_ms,
+            },
+        },
     }
@@ -0,0 +1,115 @@
+"""
+Synthetic completions for load testing: configurable latency, streaming
+pace and fault injection without any network or spend.
+
+A `SyntheticProfile` describes one simulated model:
+
+- time to first token from a `fixed`, `lognormal` (median `ttft_ms`, shape
+  `sigma`) or `bimodal` distribution (`ttft_ms`, or `slow_ms` with
+  probability `slow_fraction`, e.g. cold starts or a slow replica);
+- `tokens_per_s` generation pace after the first token (0 = instant);
+- `output_tokens` words of filler output (0 = echo the prompt);
+- `error_rate` 500s and `rate_limit_rate` 429s with `retry_after_s`.
+
+Profiles parse from "distribution=lognormal,ttft_ms=200,sigma=0.6,..." so
+they can come from env vars, CLI flags or request headers. The stub
+provider and `mock_llm_server` both use them.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import re
+import time
+from dataclasses import dataclass, fields, replace
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+DISTRIBUTIONS = ("fixed", "lognormal", "bimodal")
+
+_FILLER = (
+    "the router picks a model for each prompt based on cost latency and quality "
+    "signals then records the outcome so later requests route better"
+).split()
+
+
+@dataclass(frozen=True)
+class SyntheticProfile:
+    distribution: str = "fixed"
+    ttft_ms: float = 10.0
+    sigma: float = 0.5
+    slow_ms: float = 1000.0
+    slow_fraction: float = 0.05
+    tokens_per_s: float = 0.0
+    output_tokens: int = 0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after_s: float = 1.0
+
+    @classmethod
+    def parse(cls, raw: str, base: "SyntheticProfile | None" = None) -> "SyntheticProfile":
+        """Parse "distribution=lognormal,ttft_ms=200" on top of `base`; unknown keys are ignored."""
+        profile = base or cls()
+        types = {f.name: f.type for f in fields(cls)}
+        updates: Dict[str, Any] = {}
+        for item in raw.split(","):
+            name, _, value = item.partition("=")
+            name, value = name.strip(), value.strip()
+            if name not in types or not value:
+                continue
+            if name == "distribution":
+                if value in DISTRIBUTIONS:
+                    updates[name] = value
+                continue
+            try:
+                updates[name] = int(value) if types[name] in ("int", int) else float(value)
+            except ValueError:
+                continue
+        return replace(profile, **updates)
+
+    def sample_ttft_s(self, rng: random.Random) -> float:
+        if self.distribution == "lognormal":
+            ms = self.ttft_ms * math.exp(rng.gauss(0.0, self.sigma))
+        elif self.distribution == "bimodal":
+            ms = self.slow_ms if rng.random() < self.slow_fraction else self.ttft_ms
+        else:
+            ms = self.ttft_ms
+        return max(0.0, ms) / 1000.0
+
+    def sample_fault(self, rng: random.Random) -> Optional[int]:
+        """Status code to fail this request with, or None."""
+        roll = rng.random()
+        if roll < self.rate_limit_rate:
+            return 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 500
+        return None
+
+    def completion(self, prompt: str) -> str:
+        if self.output_tokens <= 0:
+            return f"Stub summary: {prompt}"
+        return " ".join(_FILLER[i % len(_FILLER)] for i in range(self.output_tokens))
+
+    def stream(
+        self,
+        text: str,
+        rng: random.Random,
+        *,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> Iterator[str]:
+        """Yield `text` word by word, sleeping out the TTFT and generation pace."""
+        pieces: List[str] = re.findall(r"\s*\S+\s*", text) or [text]
+        sleep(self.sample_ttft_s(rng))
+        interval = 1.0 / self.tokens_per_s if self.tokens_per_s > 0 else 0.0
+        for index, piece in enumerate(pieces):
+            if index and interval:
+                sleep(interval)
+            yield piece
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 chars per token, matching the real adapters' fallback
+    return max(1, int(len(text) / 4))
+
+
+__all__ = ["DISTRIBUTIONS", "SyntheticProfile", "estimate_tokens"]
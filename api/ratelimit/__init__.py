@@ -0,0 +1,59 @@
+"""
+Request admission.
+
+Per tenant: `AGENTICLABS_RATE_LIMIT_BACKEND=redis` (with `REDIS_URL`) shares
+buckets and daily counters across workers; the default keeps them in process.
+Globally: `run_limiter` adapts the /v1/run in-flight limit to observed latency,
+and `fair_scheduler` shares provider capacity across tenants by tier weight.
+"""
+
+from __future__ import annotations
+
+import os
+
+from logger import log_event
+
+from .adaptive import AdaptiveConcurrencyLimiter
+from .fair_queue import FairQueueRejected, FairScheduler, tenant_weight
+from .limiter import InMemoryRateLimiter, RateDecision, RateLimitConfig
+from .reconcile import UsageReconciler
+
+
+def build_rate_limiter() -> InMemoryRateLimiter:
+    config = RateLimitConfig.from_env()
+    backend = os.getenv("AGENTICLABS_RATE_LIMIT_BACKEND", "memory").lower()
+    if backend == "redis":
+        try:
+            from .redis_backend import RedisRateLimiter
+
+            return RedisRateLimiter(os.getenv("REDIS_URL", "redis://localhost:6379/0"), config)
+        except Exception as exc:
+            # A missing package or a malformed REDIS_URL must not stop the
+            # app from starting; limits then hold per process only.
+            log_event("rate_limit_backend_error", {"backend": "redis", "error": f"{type(exc).__name__}: {exc}"})
+    return InMemoryRateLimiter(config)
+
+
+rate_limiter = build_rate_limiter()
+usage_reconciler = UsageReconciler(
+    rate_limiter,
+    interval_s=float(os.getenv("AGENTICLABS_USAGE_SYNC_INTERVAL_S", "5")),
+)
+run_limiter = AdaptiveConcurrencyLimiter.from_env()
+fair_scheduler = FairScheduler.from_env()
+
+__all__ = [
+    "AdaptiveConcurrencyLimiter",
+    "FairQueueRejected",
+    "FairScheduler",
+    "InMemoryRateLimiter",
+    "RateDecision",
+    "RateLimitConfig",
+    "UsageReconciler",
+    "build_rate_limiter",
+    "fair_scheduler",
+    "rate_limiter",
+    "run_limiter",
+    "tenant_weight",
+    "usage_reconciler",
+]
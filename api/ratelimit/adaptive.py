@@ -0,0 +1,175 @@
+"""
+Adaptive concurrency limit for the run endpoint.
+
+The in-flight limit is not fixed: every completed request feeds its latency
+to a limit algorithm, which shrinks the limit when latency inflates over the
+long-term baseline (queues building up in the DB pool or at a provider) and
+grows it again as latency recovers. Requests above the current limit are
+rejected immediately so callers can back off instead of piling up.
+
+Two algorithms are available:
+
+- `GradientLimit` (default): limit x clamp(tolerance x long_rtt / short_rtt)
+  plus a sqrt(limit) headroom, smoothed.
+- `AIMDLimit`: +1 while latency stays under a threshold, multiplicative
+  decrease on slow or failed requests.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class GradientLimit:
+    def __init__(
+        self,
+        *,
+        tolerance: float = 1.5,
+        smoothing: float = 0.2,
+        short_alpha: float = 0.3,
+        long_window: int = 500,
+    ) -> None:
+        self.tolerance = max(1.0, tolerance)
+        self.smoothing = min(max(smoothing, 0.01), 1.0)
+        self.short_alpha = short_alpha
+        self.long_alpha = 2.0 / (max(1, long_window) + 1)
+        self.short_rtt = 0.0
+        self.long_rtt = 0.0
+
+    def update(self, limit: float, rtt_s: float, inflight: int, dropped: bool) -> float:
+        if self.long_rtt == 0.0:
+            self.short_rtt = self.long_rtt = rtt_s
+        else:
+            self.short_rtt = self.short_alpha * rtt_s + (1 - self.short_alpha) * self.short_rtt
+            self.long_rtt = self.long_alpha * rtt_s + (1 - self.long_alpha) * self.long_rtt
+            # After a sustained slowdown, let the baseline drift back down quickly.
+            if self.long_rtt / max(self.short_rtt, 1e-9) > 2.0:
+                self.long_rtt *= 0.95
+
+        # Not using the capacity we have: nothing to learn about the limit.
+        if not dropped and inflight < limit / 2:
+            return limit
+
+        if dropped:
+            gradient = 0.5
+        else:
+            gradient = max(0.5, min(1.0, self.tolerance * self.long_rtt / max(self.short_rtt, 1e-9)))
+        target = limit * gradient + math.sqrt(limit)
+        return limit * (1 - self.smoothing) + target * self.smoothing
+
+
+class AIMDLimit:
+    def __init__(self, *, latency_threshold_s: float = 5.0, backoff: float = 0.9) -> None:
+        self.latency_threshold_s = latency_threshold_s
+        self.backoff = min(max(backoff, 0.5), 0.99)
+        self.short_rtt = 0.0
+
+    def update(self, limit: float, rtt_s: float, inflight: int, dropped: bool) -> float:
+        self.short_rtt = rtt_s if self.short_rtt == 0.0 else 0.3 * rtt_s + 0.7 * self.short_rtt
+        if dropped or rtt_s > self.latency_threshold_s:
+            return limit * self.backoff
+        if inflight >= limit / 2:
+            return limit + 1.0
+        return limit
+
+
+class Permit:
+    def __init__(self, limiter: "AdaptiveConcurrencyLimiter", inflight: int) -> None:
+        self._limiter = limiter
+        self._inflight = inflight
+        self._started = limiter._clock()
+        self._released = False
+
+    def release(self, *, dropped: bool = False, sample: bool = True) -> None:
+        """
+        Return the slot. `dropped` marks an overload failure (5xx/timeout);
+        `sample=False` skips the latency sample (e.g. fast client errors).
+        """
+        if self._released:
+            return
+        self._released = True
+        rtt_s = self._limiter._clock() - self._started
+        self._limiter._release(rtt_s, self._inflight, dropped=dropped, sample=sample)
+
+
+class AdaptiveConcurrencyLimiter:
+    def __init__(
+        self,
+        algorithm: Any | None = None,
+        *,
+        initial_limit: int = 20,
+        min_limit: int = 2,
+        max_limit: int = 200,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.algorithm = algorithm or GradientLimit()
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self._limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self.accepted = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_env(cls) -> "AdaptiveConcurrencyLimiter":
+        name = os.getenv("AGENTICLABS_ADAPTIVE_ALGORITHM", "gradient").lower()
+        if name == "aimd":
+            algorithm: Any = AIMDLimit(
+                latency_threshold_s=float(os.getenv("AGENTICLABS_ADAPTIVE_LATENCY_THRESHOLD_S", "5")),
+            )
+        else:
+            algorithm = GradientLimit(
+                tolerance=float(os.getenv("AGENTICLABS_ADAPTIVE_TOLERANCE", "1.5")),
+            )
+        return cls(
+            algorithm,
+            initial_limit=int(os.getenv("AGENTICLABS_ADAPTIVE_INITIAL_LIMIT", "20")),
+            min_limit=int(os.getenv("AGENTICLABS_ADAPTIVE_MIN_LIMIT", "2")),
+            max_limit=int(os.getenv("AGENTICLABS_ADAPTIVE_MAX_LIMIT", "200")),
+        )
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def try_acquire(self) -> Optional[Permit]:
+        with self._lock:
+            if self._inflight >= int(self._limit):
+                self.rejected += 1
+                return None
+            self._inflight += 1
+            self.accepted += 1
+            return Permit(self, self._inflight)
+
+    def retry_after_s(self) -> int:
+        """Rough time until a slot frees up, for the Retry-After header."""
+        rtt = getattr(self.algorithm, "short_rtt", 0.0) or 1.0
+        return max(1, int(math.ceil(rtt)))
+
+    def _release(self, rtt_s: float, inflight: int, *, dropped: bool, sample: bool) -> None:
+        with self._lock:
+            self._inflight = max(0, self._inflight - 1)
+            if not sample and not dropped:
+                return
+            updated = self.algorithm.update(self._limit, rtt_s, inflight, dropped)
+            self._limit = float(min(max(updated, self.min_limit), self.max_limit))
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "limit": int(self._limit),
+                "in_flight": self._inflight,
+                "accepted": self.accepted,
+                "rejected": self.rejected,
+                "short_rtt_ms": round(getattr(self.algorithm, "short_rtt", 0.0) * 1000, 2),
+                "long_rtt_ms": round(getattr(self.algorithm, "long_rtt", 0.0) * 1000, 2),
+            }
+
+
+__all__ = ["AIMDLimit", "AdaptiveConcurrencyLimiter", "GradientLimit", "Permit"]
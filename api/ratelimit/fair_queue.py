@@ -0,0 +1,226 @@
+"""
+Weighted fair queuing of provider capacity across tenants.
+
+A fixed number of provider executions may run at once. When they are all
+busy, requests queue per tenant and are dispatched in weighted fair queuing
+order: each request gets a start tag `max(virtual_time, tenant_last_finish)`
+and a finish tag `start + cost / weight`, the smallest finish tag runs next,
+and virtual time advances to the start tag of each dispatched request. A
+tenant's burst only pushes back its own tags, so other tenants keep getting
+their weighted share. A request that times out in the queue hands its share
+back. Each tenant's queue depth is capped.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterator, List, Tuple
+
+# Share of provider capacity per tenant tier (Tenant.max_band).
+TIER_WEIGHTS: Dict[str, float] = {"LOW": 1.0, "MEDIUM": 2.0, "HIGH": 4.0, "PREMIUM": 8.0}
+
+
+def tenant_weight(max_band: Any) -> float:
+    band = getattr(max_band, "value", max_band)
+    return TIER_WEIGHTS.get(str(band or "").upper(), 1.0)
+
+
+class FairQueueRejected(RuntimeError):
+    """Raised when a tenant's queue is full or its wait times out."""
+
+    def __init__(self, tenant_id: str, reason: str, retry_after_s: float) -> None:
+        super().__init__(f"Tenant {tenant_id} request not scheduled ({reason})")
+        self.tenant_id = tenant_id
+        self.reason = reason
+        self.retry_after_s = retry_after_s
+
+
+@dataclass
+class _Ticket:
+    tenant_id: str
+    start_tag: float
+    finish_tag: float
+    granted: bool = False
+    cancelled: bool = False
+
+
+@dataclass
+class _TenantState:
+    weight: float
+    last_finish: float = 0.0
+    queued: int = 0
+    in_flight: int = 0
+    admitted: int = 0
+    rejected: int = 0
+    ewma_wait_s: float = 0.0
+    recent_waits: Deque[float] = field(default_factory=lambda: deque(maxlen=500))
+
+    def record_wait(self, wait_s: float) -> None:
+        self.ewma_wait_s = wait_s if self.admitted == 0 else 0.2 * wait_s + 0.8 * self.ewma_wait_s
+        self.admitted += 1
+        self.recent_waits.append(wait_s)
+
+    def wait_percentile(self, pct: float) -> float:
+        if not self.recent_waits:
+            return 0.0
+        ordered = sorted(self.recent_waits)
+        return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+class FairScheduler:
+    def __init__(
+        self,
+        *,
+        capacity: int = 64,
+        max_queue_per_tenant: int = 32,
+        max_wait_s: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.capacity = max(1, capacity)
+        self.max_queue_per_tenant = max(0, max_queue_per_tenant)
+        self.max_wait_s = max_wait_s
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._tenants: Dict[str, _TenantState] = {}
+        self._heap: List[Tuple[float, int, _Ticket]] = []
+        self._seq = itertools.count()
+        self._virtual_time = 0.0
+        self._in_flight = 0
+
+    @classmethod
+    def from_env(cls) -> "FairScheduler":
+        return cls(
+            capacity=int(os.getenv("AGENTICLABS_FAIR_QUEUE_CAPACITY", "64")),
+            max_queue_per_tenant=int(os.getenv("AGENTICLABS_FAIR_QUEUE_TENANT_DEPTH", "32")),
+            max_wait_s=float(os.getenv("AGENTICLABS_FAIR_QUEUE_MAX_WAIT_S", "30")),
+        )
+
+    @property
+    def utilization(self) -> float:
+        """Share of capacity in use; above 1.0 requests are queueing."""
+        with self._cond:
+            queued = sum(state.queued for state in self._tenants.values())
+            return (self._in_flight + queued) / self.capacity
+
+    def _tenant(self, tenant_id: str, weight: float) -> _TenantState:
+        state = self._tenants.get(tenant_id)
+        if state is None:
+            state = _TenantState(weight=max(weight, 0.01))
+            self._tenants[tenant_id] = state
+        else:
+            state.weight = max(weight, 0.01)
+        return state
+
+    def _dispatch(self) -> None:
+        granted = False
+        while self._in_flight < self.capacity and self._heap:
+            _, _, ticket = heapq.heappop(self._heap)
+            if ticket.cancelled:
+                continue
+            ticket.granted = True
+            self._virtual_time = max(self._virtual_time, ticket.start_tag)
+            state = self._tenants[ticket.tenant_id]
+            state.queued -= 1
+            state.in_flight += 1
+            self._in_flight += 1
+            granted = True
+        if granted:
+            self._cond.notify_all()
+
+    def acquire(
+        self,
+        tenant_id: str,
+        weight: float = 1.0,
+        *,
+        cost: float = 1.0,
+        timeout_s: float | None = None,
+    ) -> float:
+        """Block until the tenant's request is scheduled; returns seconds waited."""
+        t0 = self._clock()
+        with self._cond:
+            state = self._tenant(tenant_id, weight)
+            if state.queued >= self.max_queue_per_tenant and self._in_flight >= self.capacity:
+                state.rejected += 1
+                raise FairQueueRejected(tenant_id, "tenant_queue_full", max(1.0, state.ewma_wait_s))
+
+            start = max(self._virtual_time, state.last_finish)
+            finish = start + max(cost, 0.0) / state.weight
+            state.last_finish = finish
+            ticket = _Ticket(tenant_id, start, finish)
+            state.queued += 1
+            heapq.heappush(self._heap, (finish, next(self._seq), ticket))
+            self._dispatch()
+
+            limit_s = self.max_wait_s if timeout_s is None else min(self.max_wait_s, timeout_s)
+            deadline = t0 + limit_s
+            while not ticket.granted:
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    ticket.cancelled = True
+                    # It never ran: later requests should not queue behind its cost.
+                    state.last_finish -= ticket.finish_tag - ticket.start_tag
+                    state.queued -= 1
+                    state.rejected += 1
+                    raise FairQueueRejected(tenant_id, "timeout", max(1.0, state.ewma_wait_s))
+                self._cond.wait(remaining)
+
+            waited = self._clock() - t0
+            state.record_wait(waited)
+            return waited
+
+    def release(self, tenant_id: str) -> None:
+        with self._cond:
+            state = self._tenants.get(tenant_id)
+            if state is not None:
+                state.in_flight = max(0, state.in_flight - 1)
+            self._in_flight = max(0, self._in_flight - 1)
+            self._dispatch()
+
+    @contextmanager
+    def slot(
+        self,
+        tenant_id: str,
+        weight: float = 1.0,
+        *,
+        cost: float = 1.0,
+        timeout_s: float | None = None,
+    ) -> Iterator[float]:
+        waited = self.acquire(tenant_id, weight, cost=cost, timeout_s=timeout_s)
+        try:
+            yield waited
+        finally:
+            self.release(tenant_id)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "capacity": self.capacity,
+                "in_flight": self._in_flight,
+                "tenants": {
+                    tenant_id: {
+                        "weight": state.weight,
+                        "queued": state.queued,
+                        "in_flight": state.in_flight,
+                        "admitted": state.admitted,
+                        "rejected": state.rejected,
+                        "ewma_wait_ms": round(state.ewma_wait_s * 1000, 2),
+                        "p99_wait_ms": round(state.wait_percentile(99) * 1000, 2),
+                    }
+                    for tenant_id, state in self._tenants.items()
+                },
+            }
+
+
+__all__ = [
+    "FairQueueRejected",
+    "FairScheduler",
+    "TIER_WEIGHTS",
+    "tenant_weight",
+]
@@ -0,0 +1,170 @@
+"""
+In-process per-tenant admission control.
+
+Every tenant gets a token bucket for short bursts plus a counter for the
+current UTC day checked against `Tenant.max_daily_requests`. Admission is a
+dict lookup and a little arithmetic under one lock, with no database access.
+
+Admitted requests accumulate as pending deltas that `UsageReconciler` drains
+into the durable daily usage table; the reconciler feeds the durable totals
+back so counts from other workers (or before a restart) are respected.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Tuple
+
+SECONDS_PER_DAY = 86_400
+
+DayKey = Tuple[str, str]  # (tenant_id, "YYYY-MM-DD")
+
+
+@dataclass(frozen=True)
+class RateDecision:
+    allowed: bool
+    retry_after_s: float = 0.0
+    remaining_today: int | None = None
+    reason: str | None = None
+
+
+@dataclass(frozen=True)
+class RateLimitConfig:
+    burst: int = 20
+    refill_per_s: float = 2.0
+
+    @classmethod
+    def from_env(cls) -> "RateLimitConfig":
+        return cls(
+            burst=int(os.getenv("AGENTICLABS_RATE_LIMIT_BURST", "20")),
+            refill_per_s=float(os.getenv("AGENTICLABS_RATE_LIMIT_PER_S", "2")),
+        )
+
+
+def utc_day(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def seconds_until_utc_midnight(ts: float) -> float:
+    return SECONDS_PER_DAY - (ts % SECONDS_PER_DAY)
+
+
+class _TenantState:
+    __slots__ = ("tokens", "updated_at", "day", "count")
+
+    def __init__(self, tokens: float, now: float, day: str) -> None:
+        self.tokens = tokens
+        self.updated_at = now
+        self.day = day
+        self.count = 0
+
+
+class InMemoryRateLimiter:
+    def __init__(
+        self,
+        config: RateLimitConfig | None = None,
+        *,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.config = config or RateLimitConfig()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tenants: Dict[str, _TenantState] = {}
+        self._pending: Dict[DayKey, int] = {}
+
+    def _state(self, tenant_id: str, now: float, day: str) -> _TenantState:
+        state = self._tenants.get(tenant_id)
+        if state is None:
+            state = _TenantState(float(self.config.burst), now, day)
+            self._tenants[tenant_id] = state
+        elif state.day != day:
+            state.day = day
+            state.count = 0
+        return state
+
+    def acquire(self, tenant_id: str, daily_limit: int | None, count: int = 1) -> RateDecision:
+        """
+        Admit `count` requests at once (a batch). They take `count` daily units
+        and `count` bucket tokens, capped at the burst size so a batch larger
+        than the burst drains the bucket instead of never fitting.
+        """
+        count = max(1, int(count))
+        now = self._clock()
+        day = utc_day(now)
+        with self._lock:
+            state = self._state(tenant_id, now, day)
+            if daily_limit and state.count + count > daily_limit:
+                return RateDecision(
+                    False,
+                    retry_after_s=seconds_until_utc_midnight(now),
+                    remaining_today=max(0, daily_limit - state.count),
+                    reason="daily_limit",
+                )
+
+            burst = float(self.config.burst)
+            rate = self.config.refill_per_s
+            needed = min(float(count), burst)
+            state.tokens = min(burst, state.tokens + (now - state.updated_at) * rate)
+            state.updated_at = now
+            if state.tokens < needed:
+                wait_s = (needed - state.tokens) / rate if rate > 0 else seconds_until_utc_midnight(now)
+                return RateDecision(False, retry_after_s=wait_s, reason="burst")
+
+            state.tokens -= needed
+            state.count += count
+            key = (tenant_id, day)
+            self._pending[key] = self._pending.get(key, 0) + count
+            remaining = max(0, daily_limit - state.count) if daily_limit else None
+            return RateDecision(True, remaining_today=remaining)
+
+    # ---- reconciliation hooks ----
+
+    def current_day(self) -> str:
+        return utc_day(self._clock())
+
+    def drain_pending(self) -> Dict[DayKey, int]:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def restore_pending(self, deltas: Dict[DayKey, int]) -> None:
+        """Put back deltas that could not be persisted."""
+        with self._lock:
+            for key, count in deltas.items():
+                self._pending[key] = self._pending.get(key, 0) + count
+
+    def tenants_for_day(self, day: str) -> Iterable[str]:
+        with self._lock:
+            return [tenant_id for tenant_id, state in self._tenants.items() if state.day == day]
+
+    def observe_durable(self, tenant_id: str, day: str, total: int) -> None:
+        """
+        Adopt the durable total for `day`. Requests admitted since the last
+        drain are not in `total` yet, so they are added on top.
+        """
+        with self._lock:
+            state = self._tenants.get(tenant_id)
+            if state is None or state.day != day:
+                return
+            state.count = int(total) + self._pending.get((tenant_id, day), 0)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                tenant_id: {"day": state.day, "count": state.count, "tokens": round(state.tokens, 2)}
+                for tenant_id, state in self._tenants.items()
+            }
+
+
+__all__ = [
+    "DayKey",
+    "RateDecision",
+    "RateLimitConfig",
+    "InMemoryRateLimiter",
+    "seconds_until_utc_midnight",
+    "utc_day",
+]
@@ -0,0 +1,82 @@
+"""
+Periodic sync between the in-process limiter and the durable usage table.
+
+Each tick drains the requests admitted since the last tick, adds them to
+`tenant_daily_usage`, and reads back today's totals so this worker sees
+traffic admitted by other workers or before a restart.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable
+
+from logger import log_event
+
+from .limiter import InMemoryRateLimiter
+
+
+class UsageReconciler:
+    def __init__(
+        self,
+        limiter: InMemoryRateLimiter,
+        session_factory: Callable[[], Any] | None = None,
+        *,
+        interval_s: float = 5.0,
+    ) -> None:
+        self._limiter = limiter
+        self._session_factory = session_factory
+        self._interval_s = max(0.5, interval_s)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _session(self):
+        if self._session_factory is None:
+            from db.session import SessionLocal
+
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def sync_once(self) -> None:
+        from db.usage_repo import add_daily_requests, daily_totals
+
+        deltas = self._limiter.drain_pending()
+        day = self._limiter.current_day()
+        persisted = False
+        db = self._session()
+        try:
+            add_daily_requests(db, deltas)
+            persisted = True
+            totals = daily_totals(db, day, self._limiter.tenants_for_day(day))
+        except Exception as exc:
+            db.rollback()
+            if not persisted:
+                self._limiter.restore_pending(deltas)
+            log_event("rate_limit_reconcile_failed", {"error": str(exc)[:300]})
+            return
+        finally:
+            db.close()
+        for tenant_id, total in totals.items():
+            self._limiter.observe_durable(tenant_id, day, total)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval_s):
+            self.sync_once()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="agenticlabs-usage-reconciler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background loop and persist whatever is still pending."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self._interval_s + 1)
+            self._thread = None
+        self.sync_once()
+
+
+__all__ = ["UsageReconciler"]
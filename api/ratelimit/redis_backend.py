@@ -0,0 +1,128 @@
+"""
+Redis-backed limiter so bursts and daily caps hold across workers.
+
+The bucket refill, daily-cap check and increment run in one Lua script, so
+one round trip both checks and records the request. If Redis is unreachable
+the limiter falls back to the in-process buckets instead of failing requests.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Callable
+
+try:  # pragma: no cover - optional dependency
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None  # type: ignore
+
+from logger import log_event
+
+from .limiter import (
+    InMemoryRateLimiter,
+    RateDecision,
+    RateLimitConfig,
+    seconds_until_utc_midnight,
+    utc_day,
+)
+
+_ACQUIRE_SCRIPT = """
+local bucket_key = KEYS[1]
+local daily_key = KEYS[2]
+local burst = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local daily_limit = tonumber(ARGV[4])
+local day_ttl = tonumber(ARGV[5])
+local count = tonumber(ARGV[6])
+local needed = math.min(count, burst)
+
+local used = tonumber(redis.call('GET', daily_key) or '0')
+if daily_limit > 0 and used + count > daily_limit then
+  return {0, 'daily_limit', tostring(used)}
+end
+
+local bucket = redis.call('HMGET', bucket_key, 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local bucket_ttl = math.ceil(burst / math.max(rate, 0.001)) + 60
+
+if tokens < needed then
+  redis.call('HSET', bucket_key, 'tokens', tokens, 'ts', now)
+  redis.call('EXPIRE', bucket_key, bucket_ttl)
+  return {0, 'burst', tostring((needed - tokens) / math.max(rate, 0.001))}
+end
+
+redis.call('HSET', bucket_key, 'tokens', tokens - needed, 'ts', now)
+redis.call('EXPIRE', bucket_key, bucket_ttl)
+used = redis.call('INCRBY', daily_key, count)
+redis.call('EXPIRE', daily_key, day_ttl)
+return {1, 'ok', tostring(used)}
+"""
+
+
+class RedisRateLimiter(InMemoryRateLimiter):
+    def __init__(
+        self,
+        url: str,
+        config: RateLimitConfig | None = None,
+        *,
+        prefix: str = "agenticlabs:ratelimit",
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if redis is None:
+            raise RuntimeError("redis package is not installed. Add it to requirements.")
+        super().__init__(config, clock=clock)
+        self._client: Any = redis.Redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25)
+        self._script = self._client.register_script(_ACQUIRE_SCRIPT)
+        self._prefix = prefix
+
+    def acquire(self, tenant_id: str, daily_limit: int | None, count: int = 1) -> RateDecision:
+        count = max(1, int(count))
+        now = self._clock()
+        day = utc_day(now)
+        try:
+            allowed, reason, value = self._script(
+                keys=[f"{self._prefix}:bucket:{tenant_id}", f"{self._prefix}:daily:{tenant_id}:{day}"],
+                args=[
+                    self.config.burst,
+                    self.config.refill_per_s,
+                    now,
+                    int(daily_limit or 0),
+                    int(seconds_until_utc_midnight(now)) + 3600,
+                    count,
+                ],
+            )
+        except Exception as exc:  # pragma: no cover - depends on a live Redis
+            log_event("rate_limit_backend_error", {"backend": "redis", "error": str(exc)[:300]})
+            return super().acquire(tenant_id, daily_limit, count)
+
+        reason = reason.decode() if isinstance(reason, bytes) else reason
+        value = float(value.decode() if isinstance(value, bytes) else value)
+        if not allowed:
+            if reason == "daily_limit":
+                return RateDecision(
+                    False,
+                    retry_after_s=seconds_until_utc_midnight(now),
+                    remaining_today=max(0, int(daily_limit or 0) - int(value)),
+                    reason=reason,
+                )
+            return RateDecision(False, retry_after_s=value, reason=reason)
+
+        # Redis holds the shared count; local pending deltas still feed the
+        # durable usage table, one share per worker.
+        with self._lock:
+            state = self._state(tenant_id, now, day)
+            state.count = int(value)
+            key = (tenant_id, day)
+            self._pending[key] = self._pending.get(key, 0) + count
+        remaining = max(0, int(daily_limit) - int(value)) if daily_limit else None
+        return RateDecision(True, remaining_today=remaining)
+
+    def observe_durable(self, tenant_id: str, day: str, total: int) -> None:
+        # Redis is the source of truth while it is reachable.
+        return None
+
+
+__all__ = ["RedisRateLimiter"]
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from dataclasses import replace
+
+from datetime import datetime, timezone
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
+
+from deps import require_admin
+from logger import log_event
+from providers.bulkhead import bulkheads
+from tracing import ProfilerBusy, SamplingProfiler
+
+router = APIRouter(prefix="/v1/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+class BulkheadUpdate(BaseModel):
+    max_concurrent: int | None = Field(None, ge=1)
+    max_queue: int | None = Field(None, ge=0)
+    max_queue_wait_s: float | None = Field(None, ge=0)
+
+
+@router.get("/bulkheads")
+def list_bulkheads():
+    """Current limits, occupancy and queue-time metrics per bulkhead."""
+    return bulkheads.snapshot()
+
+
+@router.put("/bulkheads/{key}")
+def update_bulkhead(key: str, payload: BulkheadUpdate):
+    """
+    Tune a bulkhead at runtime. `key` is a provider name or `provider:model`;
+    a new `provider:model` key adds a per-model limit.
+    """
+    current = bulkheads.get(key)
+    base = current.config if current is not None else bulkheads.default_config
+    updates = payload.model_dump(exclude_none=True)
+    if not updates and current is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown bulkhead {key}")
+    bulkhead = bulkheads.configure(key, replace(base, **updates))
+    return {key: bulkhead.snapshot()}
+
+
+@router.get("/profile")
+def profile_worker(
+    seconds: float = Query(10.0, gt=0, le=120),
+    interval_ms: float = Query(5.0, ge=1, le=100),
+    format: Literal["collapsed", "json"] = Query("collapsed"),
+    tags: Literal["none", "stage", "run"] = Query(
+        "stage", description="prefix stacks with stage:<name>, or with run:<id> and stage:<name>"
+    ),
+    idle: bool = Query(False, description="keep threads parked on locks, queues and selectors"),
+):
+    """
+    Sample the Python stacks of every thread in the worker that serves this
+    request, for `seconds`. The default collapsed output feeds flamegraph.pl,
+    speedscope or inferno; `json` returns the hottest functions. Samples are
+    wall-clock, so threads blocked on I/O show up as well. Only one profile
+    can run per worker at a time.
+    """
+    profiler = SamplingProfiler(interval_s=interval_ms / 1000.0, include_idle=idle, tags=tags)
+    try:
+        profile = profiler.run(seconds)
+    except ProfilerBusy as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    summary = profile.summary()
+    log_event("profile_taken", {k: summary[k] for k in ("duration_s", "samples", "thread_samples", "sampler_cpu_s")})
+    if format == "json":
+        return summary
+    filename = f"profile-{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.collapsed"
+    return PlainTextResponse(
+        profile.collapsed(),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
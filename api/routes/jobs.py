@@ -0,0 +1,87 @@
+import os
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from config.router import RouterMode
+from db.jobs_repo import cancel_job, count_queued, enqueue_job, get_job, list_jobs
+from db.session import get_db
+from deps import get_router_mode_dep, get_tenant_dep
+from jobs.webhook import UnsafeCallbackURL, check_callback_url
+from logger import log_event
+from models.tenant import Tenant
+from shared.jobs import JobCreate, JobRead
+
+MAX_QUEUED_PER_TENANT = int(os.getenv("AGENTICLABS_JOB_MAX_QUEUED_PER_TENANT", "1000"))
+
+router = APIRouter(prefix="/v1/jobs", tags=["jobs"])
+
+
+@router.post("", response_model=JobRead, status_code=status.HTTP_202_ACCEPTED)
+def submit_job(
+    payload: JobCreate,
+    db: Session = Depends(get_db),
+    router_mode: RouterMode = Depends(get_router_mode_dep),
+    tenant: Tenant = Depends(get_tenant_dep),
+):
+    """
+    Queue a run for background execution. Poll `GET /v1/jobs/{id}` or pass
+    `callback_url` to be notified when it finishes.
+    """
+    callback_url = str(payload.callback_url) if payload.callback_url else None
+    if callback_url:
+        try:
+            check_callback_url(callback_url)
+        except UnsafeCallbackURL as exc:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc))
+    if count_queued(db, str(tenant.id)) >= MAX_QUEUED_PER_TENANT:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Too many pending jobs ({MAX_QUEUED_PER_TENANT})",
+            headers={"Retry-After": "60"},
+        )
+    if payload.router_mode:
+        # Same fallback as /v1/run: an unknown mode uses the header/default.
+        try:
+            router_mode = RouterMode(payload.router_mode.lower())
+        except ValueError:
+            pass
+    job = enqueue_job(
+        db,
+        tenant_id=str(tenant.id),
+        payload=payload.model_dump(exclude={"callback_url"}),
+        router_mode=router_mode.value,
+        callback_url=callback_url,
+    )
+    log_event("job_queued", {"job_id": str(job.id), "tenant_id": str(tenant.id)})
+    return JobRead.model_validate(job)
+
+
+@router.get("", response_model=List[JobRead])
+def list_tenant_jobs(
+    status_filter: str | None = Query(None, alias="status"),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    tenant: Tenant = Depends(get_tenant_dep),
+):
+    return [JobRead.model_validate(job) for job in list_jobs(db, str(tenant.id), status=status_filter, limit=limit)]
+
+
+@router.get("/{job_id}", response_model=JobRead)
+def read_job(job_id: str, db: Session = Depends(get_db), tenant: Tenant = Depends(get_tenant_dep)):
+    job = get_job(db, job_id, str(tenant.id))
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return JobRead.model_validate(job)
+
+
+@router.delete("/{job_id}", response_model=JobRead)
+def delete_job(job_id: str, db: Session = Depends(get_db), tenant: Tenant = Depends(get_tenant_dep)):
+    """Cancel a job that has not started yet."""
+    job = get_job(db, job_id, str(tenant.id))
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    if not cancel_job(db, job):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Job is {job.status}")
+    return JobRead.model_validate(job)
@@ -1,17 +1,32 @@
 from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from db.router_runs_repo import list_runs
-from db.session import get_db
+from db.router_runs_repo import list_runs, list_runs_async
+from db.session import ASYNC_DB_ENABLED, get_async_db, get_db
 
 router = APIRouter(prefix="/v1/logs", tags=["logs"])
 
 
-@router.get("")
-async def list_logs(
-    offset: int = Query(0, ge=0),
-    limit: int = Query(50, ge=1, le=200),
-    db: Session = Depends(get_db),
-):
-    """Return most recent runs, newest first."""
-    return list_runs(db, offset=offset, limit=limit)
+if ASYNC_DB_ENABLED:
+
+    @router.get("")
+    async def list_logs(
+        offset: int = Query(0, ge=0),
+        limit: int = Query(50, ge=1, le=200),
+        db: AsyncSession = Depends(get_async_db),
+    ):
+        """Return most recent runs, newest first."""
+        return await list_runs_async(db, offset=offset, limit=limit)
+
+else:
+
+    # A plain def runs in the threadpool; the sync session must not block the event loop.
+    @router.get("")
+    def list_logs(
+        offset: int = Query(0, ge=0),
+        limit: int = Query(50, ge=1, le=200),
+        db: Session = Depends(get_db),
+    ):
+        """Return most recent runs, newest first."""
+        return list_runs(db, offset=offset, limit=limit)
@@ -10,6 +10,12 @@ from analytics.aggregate_overview import aggregate_overview_costs
 from analytics.aggregate_analytics import aggregate_analytics_costs
 from db.models import RouterRun
 from db.session import get_db
+from providers import PROVIDERS
+from providers.bulkhead import bulkheads
+from providers.ollama_sessions import session_contexts
+from ratelimit import fair_scheduler, run_limiter
+from routing.circuit_breaker import breakers
+from routing.live_stats import model_stats
 from shared.metrics import (
     OverviewSummary,
     ProviderBreakdownItem,
@@ -318,6 +324,25 @@ def get_provider_breakdown(
     )
 
 
+@router.get("/providers/health")
+def get_provider_health():
+    """
+    Live circuit-breaker state, EWMA performance and bulkhead occupancy
+    per provider:model, the adaptive /v1/run limit, per-tenant queue
+    wait times, Ollama session-context reuse and which provider adapters
+    this worker has imported.
+    """
+    return {
+        "providers": PROVIDERS.snapshot(),
+        "breakers": breakers.snapshot(),
+        "performance": model_stats.snapshot(),
+        "bulkheads": bulkheads.snapshot(),
+        "run_concurrency": run_limiter.snapshot(),
+        "tenant_scheduling": fair_scheduler.snapshot(),
+        "ollama_sessions": session_contexts.snapshot(),
+    }
+
+
 @router.get("/categories", response_model=CategoryBreakdownResponse)
 def get_category_distribution(
     window_hours: int = Query(168, ge=1, le=2160),
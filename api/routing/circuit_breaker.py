@@ -0,0 +1,201 @@
+"""
+Per-model circuit breakers.
+
+Each `provider:model` key keeps a rolling window of outcomes in one-second
+buckets. When the error rate crosses the threshold (after a minimum number of
+calls) the circuit opens and callers fail fast. After a cool-down the circuit
+goes half-open and lets a limited number of probe calls through; a successful
+probe closes it, a failed one re-opens it.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+@dataclass(frozen=True)
+class BreakerConfig:
+    window_s: float = 30.0
+    min_requests: int = 5
+    error_rate_threshold: float = 0.5
+    open_s: float = 15.0
+    half_open_probes: int = 1
+
+    @classmethod
+    def from_env(cls) -> "BreakerConfig":
+        return cls(
+            window_s=float(os.getenv("AGENTICLABS_BREAKER_WINDOW_S", "30")),
+            min_requests=int(os.getenv("AGENTICLABS_BREAKER_MIN_REQUESTS", "5")),
+            error_rate_threshold=float(os.getenv("AGENTICLABS_BREAKER_ERROR_RATE", "0.5")),
+            open_s=float(os.getenv("AGENTICLABS_BREAKER_OPEN_S", "15")),
+            half_open_probes=int(os.getenv("AGENTICLABS_BREAKER_HALF_OPEN_PROBES", "1")),
+        )
+
+
+class CircuitBreaker:
+    def __init__(self, config: BreakerConfig, clock: Callable[[], float] = time.monotonic) -> None:
+        self._config = config
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (bucket_second, successes, failures)
+        self._buckets: Deque[List[float]] = deque()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self.last_error: str | None = None
+
+    def _prune(self, now: float) -> None:
+        horizon = now - self._config.window_s
+        while self._buckets and self._buckets[0][0] <= horizon:
+            self._buckets.popleft()
+
+    def _add(self, now: float, *, success: bool) -> None:
+        second = float(int(now))
+        if not self._buckets or self._buckets[-1][0] != second:
+            self._buckets.append([second, 0, 0])
+        self._buckets[-1][1 if success else 2] += 1
+        self._prune(now)
+
+    def _counts(self) -> tuple[int, int]:
+        successes = sum(int(b[1]) for b in self._buckets)
+        failures = sum(int(b[2]) for b in self._buckets)
+        return successes, failures
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self._config.open_s:
+            return HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        """Reserve permission for one call. Half-open circuits admit probes only."""
+        now = self._clock()
+        with self._lock:
+            state = self._current_state(now)
+            if state == CLOSED:
+                return True
+            if state == OPEN:
+                return False
+            if self._state != HALF_OPEN:
+                self._state = HALF_OPEN
+                self._probes_in_flight = 0
+            if self._probes_in_flight < self._config.half_open_probes:
+                self._probes_in_flight += 1
+                return True
+            return False
+
+    def is_available(self) -> bool:
+        """Read-only check used by routing; does not reserve a probe slot."""
+        now = self._clock()
+        with self._lock:
+            state = self._current_state(now)
+            if state == CLOSED:
+                return True
+            if state == OPEN:
+                return False
+            if self._state != HALF_OPEN:
+                return True
+            return self._probes_in_flight < self._config.half_open_probes
+
+    def release_probe(self) -> None:
+        """Give back a probe slot reserved by `allow()` for a call that never reached the provider."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes_in_flight > 0:
+                self._probes_in_flight -= 1
+
+    def record_success(self) -> None:
+        now = self._clock()
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._probes_in_flight = 0
+                self._buckets.clear()
+            self._add(now, success=True)
+
+    def record_failure(self, error: BaseException | str | None = None) -> None:
+        now = self._clock()
+        with self._lock:
+            if error is not None:
+                self.last_error = str(error)[:300]
+            self._add(now, success=False)
+            if self._state == HALF_OPEN:
+                self._trip(now)
+                return
+            if self._state == CLOSED:
+                successes, failures = self._counts()
+                total = successes + failures
+                if (
+                    total >= self._config.min_requests
+                    and failures / total >= self._config.error_rate_threshold
+                ):
+                    self._trip(now)
+
+    def _trip(self, now: float) -> None:
+        self._state = OPEN
+        self._opened_at = now
+        self._probes_in_flight = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = self._clock()
+        with self._lock:
+            self._prune(now)
+            successes, failures = self._counts()
+            total = successes + failures
+            return {
+                "state": self._current_state(now),
+                "requests": total,
+                "failures": failures,
+                "error_rate": round(failures / total, 4) if total else 0.0,
+                "last_error": self.last_error,
+            }
+
+
+class BreakerRegistry:
+    """Lazily creates one breaker per `provider:model` key."""
+
+    def __init__(self, config: BreakerConfig | None = None, clock: Callable[[], float] = time.monotonic) -> None:
+        self.config = config or BreakerConfig()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, key: str) -> CircuitBreaker:
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(key)
+                if breaker is None:
+                    breaker = CircuitBreaker(self.config, self._clock)
+                    self._breakers[key] = breaker
+        return breaker
+
+    def is_available(self, key: str) -> bool:
+        breaker = self._breakers.get(key)
+        return breaker.is_available() if breaker is not None else True
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            items = list(self._breakers.items())
+        return {key: breaker.snapshot() for key, breaker in items}
+
+
+breakers = BreakerRegistry(BreakerConfig.from_env())
+
+
+__all__ = [
+    "CLOSED",
+    "OPEN",
+    "HALF_OPEN",
+    "BreakerConfig",
+    "CircuitBreaker",
+    "BreakerRegistry",
+    "breakers",
+]
@@ -0,0 +1,126 @@
+"""
+Live per-model performance table fed by completed provider calls.
+
+Keeps exponentially weighted moving averages of latency, output tokens/sec and
+error rate for each `provider:model` key, plus a short window of raw latencies
+for percentile estimates. Entries that have not been refreshed recently are
+treated as unknown so a model that was slow once is not starved forever.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Optional
+
+
+@dataclass
+class ModelPerf:
+    ewma_latency_ms: float = 0.0
+    ewma_tokens_per_s: float = 0.0
+    ewma_error_rate: float = 0.0
+    samples: int = 0
+    last_updated: float = 0.0
+    recent_latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=200))
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.recent_latencies:
+            return None
+        ordered = sorted(self.recent_latencies)
+        index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+        return ordered[index]
+
+
+class LivePerformanceTable:
+    def __init__(
+        self,
+        *,
+        alpha: float = 0.2,
+        min_samples: int = 3,
+        stale_after_s: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.alpha = max(0.01, min(alpha, 1.0))
+        self.min_samples = max(1, min_samples)
+        self.stale_after_s = stale_after_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._stats: Dict[str, ModelPerf] = {}
+
+    @classmethod
+    def from_env(cls) -> "LivePerformanceTable":
+        return cls(
+            alpha=float(os.getenv("AGENTICLABS_PERF_EWMA_ALPHA", "0.2")),
+            min_samples=int(os.getenv("AGENTICLABS_PERF_MIN_SAMPLES", "3")),
+            stale_after_s=float(os.getenv("AGENTICLABS_PERF_STALE_AFTER_S", "300")),
+        )
+
+    def _ewma(self, current: float, value: float, first: bool) -> float:
+        if first:
+            return value
+        return (self.alpha * value) + ((1.0 - self.alpha) * current)
+
+    def record_success(self, key: str, latency_ms: float, completion_tokens: int = 0) -> None:
+        latency_ms = max(0.0, float(latency_ms))
+        tokens_per_s = (completion_tokens / (latency_ms / 1000.0)) if latency_ms > 0 else 0.0
+        with self._lock:
+            perf = self._stats.setdefault(key, ModelPerf())
+            first = perf.samples == 0
+            perf.ewma_latency_ms = self._ewma(perf.ewma_latency_ms, latency_ms, first)
+            perf.ewma_tokens_per_s = self._ewma(perf.ewma_tokens_per_s, tokens_per_s, first)
+            perf.ewma_error_rate = self._ewma(perf.ewma_error_rate, 0.0, first)
+            perf.samples += 1
+            perf.last_updated = self._clock()
+            perf.recent_latencies.append(latency_ms)
+
+    def record_failure(self, key: str, latency_ms: float | None = None) -> None:
+        with self._lock:
+            perf = self._stats.setdefault(key, ModelPerf())
+            first = perf.samples == 0
+            perf.ewma_error_rate = self._ewma(perf.ewma_error_rate, 1.0, first)
+            if latency_ms is not None and latency_ms > 0:
+                perf.ewma_latency_ms = self._ewma(perf.ewma_latency_ms, float(latency_ms), first)
+            perf.samples += 1
+            perf.last_updated = self._clock()
+
+    def get(self, key: str) -> Optional[ModelPerf]:
+        """Return stats for `key`, or None if too few samples or stale."""
+        perf = self._stats.get(key)
+        if perf is None or perf.samples < self.min_samples:
+            return None
+        if self._clock() - perf.last_updated > self.stale_after_s:
+            return None
+        return perf
+
+    def latency_percentile(self, key: str, pct: float) -> Optional[float]:
+        perf = self.get(key)
+        if perf is None:
+            return None
+        with self._lock:
+            return perf.percentile(pct)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                key: {
+                    "ewma_latency_ms": round(perf.ewma_latency_ms, 2),
+                    "ewma_tokens_per_s": round(perf.ewma_tokens_per_s, 2),
+                    "ewma_error_rate": round(perf.ewma_error_rate, 4),
+                    "p95_latency_ms": perf.percentile(95),
+                    "samples": perf.samples,
+                }
+                for key, perf in self._stats.items()
+            }
+
+
+model_stats = LivePerformanceTable.from_env()
+
+
+__all__ = ["ModelPerf", "LivePerformanceTable", "model_stats"]
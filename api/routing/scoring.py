@@ -1,9 +1,13 @@
 from __future__ import annotations
 
-from typing import Iterable, Optional
+from typing import Iterable, List, Optional
 
 from config.model_registry import MODEL_REGISTRY, ModelConfig
 from routing.categories import QueryCategory
+from routing.circuit_breaker import breakers
+from routing.live_stats import LivePerformanceTable, model_stats
+
+NEUTRAL_LATENCY_SCORE = 0.5
 
 
 def capability_key_for_category(category: QueryCategory) -> str:
@@ -46,42 +50,102 @@ def risk_penalty_for_band(band: str) -> float:
     return 0.0
 
 
-def _weights_for_cost_mode(cost_mode: str) -> tuple[float, float]:
+def _weights_for_cost_mode(cost_mode: str) -> tuple[float, float, float]:
+    """Return (capability, cost, latency) weights for a tenant cost mode."""
     mode = (cost_mode or "balanced").lower()
     if mode == "cost":
-        return 0.45, 0.45
+        return 0.45, 0.45, 0.1
     if mode == "quality":
-        return 0.7, 0.2
-    return 0.55, 0.3
-
-
-def choose_enhanced_model(
+        return 0.7, 0.2, 0.1
+    return 0.55, 0.3, 0.15
+
+
+def latency_score(
+    model: ModelConfig,
+    reference_latency_ms: float | None,
+    perf_table: LivePerformanceTable = model_stats,
+) -> float:
+    """
+    Live speed score in [0, 1]: 1.0 for the fastest observed candidate,
+    scaled down by relative EWMA latency and by the EWMA error rate.
+    Models without fresh stats get a neutral score so they stay eligible.
+    """
+    perf = perf_table.get(model.key)
+    if perf is None or not reference_latency_ms:
+        return NEUTRAL_LATENCY_SCORE
+    speed = reference_latency_ms / max(perf.ewma_latency_ms, 1.0)
+    return max(0.0, min(speed, 1.0)) * (1.0 - perf.ewma_error_rate)
+
+
+def rank_enhanced_models(
     *,
     category: QueryCategory,
     allowed_model_keys: Iterable[str],
     resolved_band: str,
     cost_mode: str = "balanced",
-) -> Optional[ModelConfig]:
+    latency_weight: float | None = None,
+    skip_open_circuits: bool = True,
+    perf_table: LivePerformanceTable = model_stats,
+) -> List[ModelConfig]:
+    """
+    Score every allowed model and return them best-first. Models whose
+    circuit breaker is open are left out so callers never route to them.
+    `latency_weight` overrides the cost-mode default for the live latency term.
+    """
     candidates = [
         MODEL_REGISTRY[key]
         for key in allowed_model_keys
         if key in MODEL_REGISTRY
     ]
+    if skip_open_circuits:
+        candidates = [model for model in candidates if breakers.is_available(model.key)]
     if not candidates:
-        return None
+        return []
 
     cap_key = capability_key_for_category(category)
-    best_model: Optional[ModelConfig] = None
-    best_score = float("-inf")
     penalty = risk_penalty_for_band(resolved_band)
 
-    cap_weight, cost_weight = _weights_for_cost_mode(cost_mode)
+    cap_weight, cost_weight, default_latency_weight = _weights_for_cost_mode(cost_mode)
+    lat_weight = default_latency_weight if latency_weight is None else latency_weight
+
+    observed = [
+        perf.ewma_latency_ms
+        for perf in (perf_table.get(model.key) for model in candidates)
+        if perf is not None and perf.ewma_latency_ms > 0
+    ]
+    reference_latency_ms = min(observed) if observed else None
+
+    scored = []
     for model in candidates:
         capability = model.capabilities.get(cap_key, 0.6)
         cost_component = cost_score(model)
-        score = (cap_weight * capability) + (cost_weight * cost_component) - penalty
-        if score > best_score:
-            best_score = score
-            best_model = model
+        latency_component = latency_score(model, reference_latency_ms, perf_table)
+        score = (
+            (cap_weight * capability)
+            + (cost_weight * cost_component)
+            + (lat_weight * latency_component)
+            - penalty
+        )
+        scored.append((score, model))
+
+    # Stable sort keeps registry order for ties, matching the previous first-max pick.
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [model for _, model in scored]
 
-    return best_model
+
+def choose_enhanced_model(
+    *,
+    category: QueryCategory,
+    allowed_model_keys: Iterable[str],
+    resolved_band: str,
+    cost_mode: str = "balanced",
+    latency_weight: float | None = None,
+) -> Optional[ModelConfig]:
+    ranked = rank_enhanced_models(
+        category=category,
+        allowed_model_keys=allowed_model_keys,
+        resolved_band=resolved_band,
+        cost_mode=cost_mode,
+        latency_weight=latency_weight,
+    )
+    return ranked[0] if ranked else None
@@ -0,0 +1,838 @@
+"""
+The /v1/run pipeline, split into stages so single and batch runs share it.
+
+- `score_prompts`: complexity, band and category per prompt (pure, deduplicated).
+- `prepare_run`: limits, governance and routing; produces the candidate chain.
+- `execute_run`: fair-queued provider execution with failover.
+- `finalize_run`: cost, policy, ALRI and the response; no database access.
+- `persist_runs`: router_runs rows and tenant usage in one commit.
+
+Stages raise `HTTPException` exactly as the single-run endpoint always has.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from config.model_registry import MODEL_REGISTRY
+from config.router import RouterMode
+from cost.calculator import calculate_cost, resolve_model_key
+from costs import compute_costs
+from db.router_runs_repo import log_runs_bulk
+from governance.alri import compute_alri_v2
+from logger import log_event
+from models.tenant import AutonomyLevel, DataSensitivity, Tenant, TenantBand, TenantRegion
+from pricing import estimate_cost_for_model
+from providers import PROVIDERS
+from providers.errors import NoProviderAvailableError
+from providers.executor import Candidate, ExecutionOutcome, build_candidate_chain, execute_with_failover
+from ratelimit import FairQueueRejected, fair_scheduler, rate_limiter, tenant_weight
+from router import compute_alri_tag, evaluate_policy, new_run_id
+from router.complexity import choose_band, score_complexity
+from router.model_registry import NAIVE_BASELINE_MODEL_KEY
+from router.routing_bands import RoutingBand
+from router.rule_based import PROVIDER_DEFAULT_MODELS, SelectedModel, select_model
+from routing.categories import QueryCategory, classify_query
+from routing.scoring import rank_enhanced_models
+from shared.models import AuditInfo, MetricsInfo, PolicyEvaluation, Provenance, RunRequest, RunResponse
+from tracing import StageTimer, current_timer, current_trace_id, span, stage, use_timer
+
+DEFAULT_MAX_OUTPUT_TOKENS = 512
+FALLBACK_CHAIN_LENGTH = int(os.getenv("AGENTICLABS_FALLBACK_CHAIN_LENGTH", "3"))
+BAND_ORDER: List[str] = ["low", "medium", "high", "premium"]
+# Share of a tenant's fair-queue weight given to its background jobs.
+BACKGROUND_WEIGHT_FACTOR = float(os.getenv("AGENTICLABS_JOB_WEIGHT_FACTOR", "0.25"))
+
+
+def estimate_prompt_tokens(text: str) -> int:
+    if not text:
+        return 0
+    return max(1, len(text) // 4)
+
+
+def cap_band_for_tenant(band: str, max_band: TenantBand) -> str:
+    try:
+        band_idx = BAND_ORDER.index(band)
+    except ValueError:
+        band_idx = BAND_ORDER.index("medium")
+    try:
+        limit_idx = BAND_ORDER.index(max_band.value.lower())
+    except ValueError:
+        limit_idx = BAND_ORDER.index("high")
+    if band_idx > limit_idx:
+        return BAND_ORDER[limit_idx]
+    return band
+
+
+def ensure_request_limits(tenant: Tenant, estimated_tokens: int) -> None:
+    if estimated_tokens > tenant.max_tokens_per_request:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Request exceeds tenant max tokens ({tenant.max_tokens_per_request})",
+        )
+
+
+def admit_requests(tenant: Tenant, count: int = 1) -> None:
+    """Take `count` requests from the tenant's rate limit, or raise 429."""
+    decision = rate_limiter.acquire(str(tenant.id), tenant.max_daily_requests, count)
+    if not decision.allowed:
+        detail = (
+            f"Daily request limit reached ({tenant.max_daily_requests})"
+            if decision.reason == "daily_limit"
+            else "Too many requests"
+        )
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(max(1, int(math.ceil(decision.retry_after_s))))},
+        )
+
+
+def ensure_credit_limit(tenant: Tenant, estimated_cost: float, reserved_usd: float = 0.0) -> None:
+    usage = Decimal(str(tenant.usage_usd or 0)) + Decimal(str(reserved_usd or 0))
+    credit_limit = Decimal(str(tenant.credit_limit_usd or 0))
+    if usage + Decimal(str(estimated_cost)) > credit_limit:
+        raise HTTPException(
+            status_code=status.HTTP_402_PAYMENT_REQUIRED,
+            detail="Credit limit exceeded",
+        )
+
+
+def compute_risk_score(tenant: Tenant) -> int:
+    sensitivity = tenant.default_data_sensitivity
+    autonomy = tenant.default_autonomy_level
+    if sensitivity == DataSensitivity.PUBLIC:
+        return 0
+    if sensitivity == DataSensitivity.INTERNAL:
+        return 1
+    if sensitivity == DataSensitivity.PII:
+        return 2 if autonomy == AutonomyLevel.ANSWER_ONLY else 3
+    return 0
+
+
+def filter_governance_providers(
+    providers: List[str], tenant: Tenant, risk_score: int
+) -> tuple[List[str], List[str]]:
+    filtered = providers[:]
+    blocked: List[str] = []
+    if (
+        tenant.region == TenantRegion.EU
+        and tenant.default_data_sensitivity == DataSensitivity.PII
+    ):
+        if "gemini" in filtered:
+            filtered = [p for p in filtered if p != "gemini"]
+            blocked.append("gemini")
+    return filtered, blocked
+
+
+def allowed_model_keys_for_tenant(
+    tenant: Tenant, provider_whitelist: Iterable[str] | None = None
+) -> List[str]:
+    source = provider_whitelist if provider_whitelist is not None else (tenant.allowed_providers or [])
+    providers = [p.lower() for p in source]
+    if not providers:
+        providers = ["openai"]
+    keys = [
+        key
+        for key, cfg in MODEL_REGISTRY.items()
+        if cfg.provider in providers
+    ]
+    return keys
+
+
+def _enum_value(value: Any) -> Any:
+    return value.value if hasattr(value, "value") else value
+
+
+# ---- Scoring ----
+
+
+@dataclass(frozen=True)
+class PromptScore:
+    complexity: float
+    band: str
+    category: QueryCategory
+    category_conf: float
+
+
+def score_prompt(prompt: str) -> PromptScore:
+    cscore = score_complexity(prompt)
+    band = choose_band(cscore, prompt)
+    category, category_conf = classify_query(prompt)
+    return PromptScore(cscore, band, category, category_conf)
+
+
+def score_prompts(prompts: Sequence[str]) -> List[PromptScore]:
+    """Score a batch of prompts, computing each distinct prompt once."""
+    memo: Dict[str, PromptScore] = {}
+    scores: List[PromptScore] = []
+    for prompt in prompts:
+        score = memo.get(prompt)
+        if score is None:
+            score = memo[prompt] = score_prompt(prompt)
+        scores.append(score)
+    return scores
+
+
+# ---- Prepare ----
+
+
+@dataclass
+class PreparedRun:
+    rid: str
+    payload: RunRequest
+    router_mode: RouterMode
+    score: PromptScore
+    inferred_band: str
+    selected: SelectedModel
+    default_selection: SelectedModel
+    provider_name: str
+    model_name: str
+    resolved_band: str
+    selection_source: str
+    candidates: List[Candidate]
+    force_model: Any
+    estimated_total_tokens: int
+    estimated_upper_cost: float
+    governance_info: Dict[str, Any]
+    t_start: float
+    t_router_done: float = 0.0
+    # Per-run stage breakdown, persisted as router_runs.stage_timings.
+    timings: StageTimer = field(default_factory=StageTimer)
+
+
+def prepare_run(
+    payload: RunRequest,
+    tenant: Tenant,
+    router_mode: RouterMode,
+    *,
+    score: PromptScore | None = None,
+    rank_cache: Dict[Tuple[str, str], list] | None = None,
+    reserved_usd: float = 0.0,
+    admitted: bool = False,
+) -> PreparedRun:
+    """
+    Everything up to the provider call. `score` and `rank_cache` let batch
+    callers reuse scoring and model ranking; `reserved_usd` is the estimated
+    spend of earlier batch items, counted against the credit limit.
+    The rate limit is taken last, once every other check has passed, so a
+    refused request does not use up the tenant's allowance; `admitted`
+    skips it for items the caller admits itself (see `admit_requests`).
+    """
+    if payload.router_mode:
+        try:
+            router_mode = RouterMode(payload.router_mode.lower())
+        except ValueError:
+            router_mode = router_mode
+    rid = new_run_id()
+    t_start = time.perf_counter()
+    timings = StageTimer(run_id=rid)
+    log_event(
+        "router_in",
+        {"run_id": rid, "agent_id": payload.agent_id, "router_mode": router_mode.value},
+    )
+
+    # ---- Smart routing (with manual override) ----
+    with span("router.scoring", run_id=rid) as scoring_span, timings.stage("scoring"):
+        if score is None:
+            score = score_prompt(payload.prompt)
+        scoring_span.set_attributes({"complexity": round(score.complexity, 3), "category": score.category.value})
+    cscore = score.complexity
+    category = score.category
+    inferred_band = cap_band_for_tenant(
+        RoutingBand.normalize(score.band).value,
+        tenant.max_band,
+    )
+
+    with span("router.routing", run_id=rid, router_mode=router_mode.value) as routing_span, timings.stage("routing"):
+        overrides = payload.policy_overrides or {}
+        force_model = payload.force_model or overrides.get("force_model")
+        force_provider = payload.force_provider or overrides.get("force_provider")
+        force_band = payload.force_band or overrides.get("force_band")
+
+        def canonical_band(value: str | None) -> str:
+            return cap_band_for_tenant(
+                RoutingBand.normalize(value).value,
+                tenant.max_band,
+            )
+
+        requested_band = canonical_band(payload.band or inferred_band)
+        if isinstance(force_band, str) and force_band:
+            requested_band = canonical_band(force_band)
+
+        task_type = payload.task_type
+        estimated_prompt_tokens = estimate_prompt_tokens(payload.prompt)
+        estimated_total_tokens = estimated_prompt_tokens + DEFAULT_MAX_OUTPUT_TOKENS
+        ensure_request_limits(tenant, estimated_total_tokens)
+        risk_score = compute_risk_score(tenant)
+        configured_providers = [p.lower() for p in (tenant.allowed_providers or [])] or [
+            "openai"
+        ]
+        allowed_providers, blocked_providers = filter_governance_providers(
+            configured_providers, tenant, risk_score
+        )
+        if not allowed_providers:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="No providers available for this tenant based on policies",
+            )
+        allowed_model_keys = allowed_model_keys_for_tenant(
+            tenant, allowed_providers
+        )
+        if not allowed_model_keys:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="No models available for this tenant",
+            )
+
+        if force_provider and force_provider.lower() not in allowed_providers:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Provider not allowed for tenant",
+            )
+        force_provider = force_provider.lower() if force_provider else None
+
+        default_selection: SelectedModel = select_model(
+            band=inferred_band,
+            task_type=task_type,
+        )
+
+        selected: SelectedModel = select_model(
+            band=requested_band,
+            task_type=task_type,
+            force_provider=force_provider,
+            force_model=force_model,
+        )
+
+        if force_model and selected.provider not in allowed_providers:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Provider not allowed for tenant",
+            )
+
+        provider_name = selected.provider
+        model_name = selected.model
+        resolved_band = selected.band
+        selection_source = selected.route_source
+
+        if selected.provider not in allowed_providers:
+            fallback_provider = allowed_providers[0]
+            selected = select_model(
+                band=selected.band,
+                task_type=task_type,
+                force_provider=fallback_provider,
+            )
+            provider_name, model_name = selected.provider, selected.model
+
+        allowed_keys = [
+            key for key in allowed_model_keys if MODEL_REGISTRY[key].provider in allowed_providers
+        ] or allowed_model_keys
+
+        # Ranked once: drives the enhanced pick, the allow-list fallback and
+        # the failover chain. Models with an open circuit are already excluded.
+        rank_key = (category.value, resolved_band)
+        ranked_models = rank_cache.get(rank_key) if rank_cache is not None else None
+        if ranked_models is None:
+            ranked_models = rank_enhanced_models(
+                category=category,
+                allowed_model_keys=allowed_keys,
+                resolved_band=resolved_band,
+                cost_mode=_enum_value(tenant.cost_mode),
+            )
+            if rank_cache is not None:
+                rank_cache[rank_key] = ranked_models
+
+        # A forced provider narrows every later choice (the enhanced pick,
+        # the allow-list fallback, the failover chain) to its own models; a
+        # forced model is used as-is or refused.
+        eligible_models = (
+            [model for model in ranked_models if model.provider == force_provider]
+            if force_provider and not force_model
+            else ranked_models
+        )
+
+        if router_mode == RouterMode.ENHANCED and not force_model:
+            choice = eligible_models[0] if eligible_models else None
+            if choice:
+                provider_name = choice.provider
+                model_name = choice.model_id
+                selection_source = "enhanced"
+
+        final_key = f"{provider_name}:{model_name}"
+        if allowed_keys and final_key not in allowed_keys:
+            if force_model:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Model not allowed for tenant",
+                )
+            fallback_choice = eligible_models[0] if eligible_models else None
+            if fallback_choice:
+                provider_name = fallback_choice.provider
+                model_name = fallback_choice.model_id
+                selection_source = "enhanced"
+
+        if provider_name not in PROVIDERS:
+            provider_name = "openai"
+            model_name = PROVIDER_DEFAULT_MODELS.get(provider_name, model_name)
+
+        if force_model:
+            candidates = [(provider_name, model_name)]
+        else:
+            candidates = build_candidate_chain(
+                (provider_name, model_name),
+                [model.key for model in eligible_models],
+                PROVIDERS,
+                max_candidates=FALLBACK_CHAIN_LENGTH,
+            )
+
+        # Any candidate may end up serving the request; hold credit for the
+        # most expensive one.
+        estimated_upper_cost = max(
+            calculate_cost(
+                model_key=resolve_model_key(candidate_provider, candidate_model),
+                provider=candidate_provider,
+                model=candidate_model,
+                input_tokens=estimated_prompt_tokens,
+                output_tokens=DEFAULT_MAX_OUTPUT_TOKENS,
+            )
+            or 0.0
+            for candidate_provider, candidate_model in candidates
+        )
+        ensure_credit_limit(tenant, estimated_upper_cost, reserved_usd)
+        if not admitted:
+            admit_requests(tenant)
+        routing_span.set_attributes(
+            {"provider": provider_name, "model": model_name, "route_source": selection_source}
+        )
+
+    governance_info = {
+        "risk_score": risk_score,
+        "region": _enum_value(tenant.region),
+        "default_data_sensitivity": _enum_value(tenant.default_data_sensitivity),
+        "default_autonomy_level": _enum_value(tenant.default_autonomy_level),
+        "blocked_providers": blocked_providers,
+    }
+
+    log_event("route_complexity", {
+        "run_id": rid,
+        "score": round(cscore, 3),
+        "band": resolved_band,
+        "inferred_band": inferred_band,
+        "provider": provider_name,
+        "model": model_name,
+        "force_model": bool(force_model),
+        "force_band": bool(force_band),
+        "force_provider": bool(force_provider),
+        "route_source": selection_source,
+        "category": category.value,
+        "category_confidence": score.category_conf,
+        "risk_score": risk_score,
+        "blocked_providers": blocked_providers,
+    })
+
+    return PreparedRun(
+        rid=rid,
+        payload=payload,
+        router_mode=router_mode,
+        score=score,
+        inferred_band=inferred_band,
+        selected=selected,
+        default_selection=default_selection,
+        provider_name=provider_name,
+        model_name=model_name,
+        resolved_band=resolved_band,
+        selection_source=selection_source,
+        candidates=candidates,
+        force_model=force_model,
+        estimated_total_tokens=estimated_total_tokens,
+        estimated_upper_cost=float(estimated_upper_cost or 0.0),
+        governance_info=governance_info,
+        t_start=t_start,
+        t_router_done=time.perf_counter(),
+        timings=timings,
+    )
+
+
+# ---- Execute ----
+
+
+@dataclass
+class ExecutedRun:
+    prepared: PreparedRun
+    outcome: ExecutionOutcome
+    queue_wait_s: float
+    t_provider_start: float
+    t_provider_end: float
+
+
+def execute_run(prepared: PreparedRun, tenant: Tenant, *, background: bool = False) -> ExecutedRun:
+    """
+    `background` runs are scheduled as a separate, lower-weight flow of the
+    tenant, so queued jobs yield provider capacity to interactive requests.
+    """
+    flow = str(tenant.id)
+    weight = tenant_weight(tenant.max_band)
+    if background:
+        flow = f"{flow}/jobs"
+        weight *= BACKGROUND_WEIGHT_FACTOR
+    t_provider_start = time.perf_counter()
+    try:
+        with fair_scheduler.slot(
+            flow,
+            weight,
+            cost=max(1.0, prepared.estimated_total_tokens / 1000.0),
+        ) as queue_wait_s, use_timer(prepared.timings):
+            prepared.timings.add("queue", queue_wait_s * 1000.0)
+            outcome = execute_with_failover(
+                prepared.candidates,
+                {**prepared.payload.model_dump(), "tenant_id": str(tenant.id)},
+                prepared.payload.prompt,
+                providers=PROVIDERS,
+                run_id=prepared.rid,
+                hedge=bool(getattr(tenant, "hedge_requests", False)) and not prepared.force_model,
+            )
+    except FairQueueRejected as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS
+            if exc.reason == "tenant_queue_full"
+            else status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc),
+            headers={"Retry-After": str(int(math.ceil(exc.retry_after_s)))},
+        )
+    except NoProviderAvailableError as exc:
+        retry_after = getattr(exc.last_error, "retry_after", None)
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT
+            if exc.deadline_exceeded
+            else status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc),
+            headers={"Retry-After": str(int(math.ceil(retry_after)))} if retry_after else None,
+        )
+    t_provider_end = time.perf_counter()
+    # Provider calls, retries and backoff; the executor records "plan" itself.
+    prepared.timings.add(
+        "execute",
+        (t_provider_end - t_provider_start) * 1000.0
+        - prepared.timings.get("queue")
+        - prepared.timings.get("plan"),
+    )
+    log_event("provider_attempts", {
+        "run_id": prepared.rid,
+        "queue_wait_ms": round(queue_wait_s * 1000, 2),
+        "attempt_count": outcome.attempt_count,
+        "attempts": outcome.attempts,
+    })
+    return ExecutedRun(prepared, outcome, queue_wait_s, t_provider_start, t_provider_end)
+
+
+# ---- Finalize ----
+
+
+@dataclass
+class FinalizedRun:
+    response: RunResponse
+    run_row: Dict[str, Any]
+    billed_usd: float
+
+
+def finalize_run(executed: ExecutedRun, tenant: Tenant) -> FinalizedRun:
+    prepared = executed.prepared
+    outcome = executed.outcome
+    payload = prepared.payload
+    rid = prepared.rid
+    category = prepared.score.category
+    category_conf = prepared.score.category_conf
+    selected = prepared.selected
+    default_selection = prepared.default_selection
+
+    result = outcome.result
+    provider_name = prepared.provider_name
+    model_name = prepared.model_name
+    selection_source = prepared.selection_source
+    if outcome.failed_over:
+        provider_name = outcome.provider
+        model_name = outcome.model
+        selection_source = "hedge" if outcome.hedged else "failover"
+
+    with span("cost.compute", provider=provider_name, model=model_name), prepared.timings.stage("cost"):
+        prompt_tokens = result.get("prompt_tokens")
+        if prompt_tokens is None:
+            prompt_tokens = (result.get("provenance") or {}).get("input_tokens", 0)
+        completion_tokens = result.get("completion_tokens")
+        if completion_tokens is None:
+            completion_tokens = (result.get("provenance") or {}).get("output_tokens", 0)
+
+        prompt_tokens = int(prompt_tokens or 0)
+        completion_tokens = int(completion_tokens or 0)
+
+        model_key = resolve_model_key(provider_name, model_name) or f"{provider_name}:{model_name}"
+        cost_usd = calculate_cost(
+            model_key=model_key,
+            provider=provider_name,
+            model=model_name,
+            input_tokens=prompt_tokens,
+            output_tokens=completion_tokens,
+            cache_read_tokens=result.get("cached_prompt_tokens", 0),
+            cache_write_tokens=result.get("cache_write_tokens", 0),
+        )
+        if cost_usd <= 0:
+            legacy_cost, _ = compute_costs(
+                provider=provider_name,
+                model=model_name,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+            )
+            if legacy_cost and legacy_cost > 0:
+                cost_usd = legacy_cost
+            else:
+                cost_usd = float(result.get("cost_usd", 0.0) or 0.0)
+
+        baseline_cost = calculate_cost(
+            model_key=NAIVE_BASELINE_MODEL_KEY,
+            input_tokens=prompt_tokens,
+            output_tokens=completion_tokens,
+        )
+        if baseline_cost <= 0:
+            _, legacy_baseline = compute_costs(
+                provider=provider_name,
+                model=model_name,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+            )
+            baseline_cost = legacy_baseline or cost_usd
+        cost_usd = float(cost_usd or 0.0)
+        baseline_cost = float(baseline_cost or cost_usd)
+
+        result["cost_usd"] = cost_usd
+
+        # Both hedged calls are billed. The losing call usually has not
+        # finished yet, so assume it produced as much output as the winner.
+        hedge_cost_usd = None
+        if outcome.hedge_loser is not None:
+            loser_provider, loser_model = outcome.hedge_loser
+            loser_result = outcome.hedge_loser_result or {}
+            hedge_cost_usd = calculate_cost(
+                model_key=resolve_model_key(loser_provider, loser_model),
+                provider=loser_provider,
+                model=loser_model,
+                input_tokens=int(loser_result.get("prompt_tokens") or prompt_tokens),
+                output_tokens=int(loser_result.get("completion_tokens") or completion_tokens),
+            )
+
+    log_event("provider_out", {
+        "run_id": rid,
+        "latency_ms": result["latency_ms"],
+        "cost_usd": cost_usd,
+    })
+
+    # ---- Policy evaluation ----
+    threshold = 0.7
+    if payload.policy_overrides and isinstance(payload.policy_overrides.get("confidence_threshold"), (int, float)):
+        threshold = float(payload.policy_overrides["confidence_threshold"])
+    pol = evaluate_policy(result["confidence"], threshold)
+
+    # ---- ALRI tag ----
+    ctx = payload.context or {}
+    alri_tag = compute_alri_tag(ctx.get("risk_band"), ctx.get("jurisdiction"))
+
+    # ---- Metrics ----
+    overrides_used = selected.route_source == "manual_override"
+
+    run_status = "ok" if not pol["hil_triggered"] else "hil_required"
+
+    with span("governance.alri", run_id=rid) as alri_span, prepared.timings.stage("alri"):
+        alri_score, alri_tier = compute_alri_v2(
+            band=selected.band,
+            provider=provider_name,
+            model=model_name,
+            prompt_tokens=int(prompt_tokens or 0),
+            completion_tokens=int(completion_tokens or 0),
+            cost_usd=result["cost_usd"],
+            baseline_cost_usd=baseline_cost,
+            overrides_used=overrides_used,
+            prompt_text=payload.prompt,
+        )
+        alri_span.set_attributes({"alri_score": alri_score, "alri_tier": alri_tier})
+
+    # Time queued behind other batch items between prepare and execute is
+    # not part of this run's latency.
+    t_done = time.perf_counter()
+    router_latency_ms = (prepared.t_router_done - prepared.t_start) * 1000.0
+    provider_latency_ms = (executed.t_provider_end - executed.t_provider_start) * 1000.0
+    processing_latency_ms = max(0.0, (t_done - executed.t_provider_end) * 1000.0)
+    total_latency_ms = router_latency_ms + provider_latency_ms + processing_latency_ms
+
+    # Routing efficiency: compare against default selection cost
+    default_model_key = resolve_model_key(
+        default_selection.provider, default_selection.model
+    ) or f"{default_selection.provider}:{default_selection.model}"
+    default_cost = calculate_cost(
+        model_key=default_model_key,
+        provider=default_selection.provider,
+        model=default_selection.model,
+        input_tokens=prompt_tokens,
+        output_tokens=completion_tokens,
+    )
+    if default_cost <= 0:
+        legacy_default_cost, _ = compute_costs(
+            provider=default_selection.provider,
+            model=default_selection.model,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+        )
+        default_cost = legacy_default_cost
+    default_cost = float(default_cost or 0.0)
+    epsilon = 0.02
+    routing_efficient = False
+    if default_cost > 0:
+        routing_efficient = cost_usd <= (default_cost * (1 + epsilon))
+    else:
+        routing_efficient = True
+
+    what_if_cost_usd = estimate_cost_for_model(
+        "gpt-4.1",
+        prompt_tokens,
+        category,
+    )
+
+    run_row = dict(
+        tenant_id=str(tenant.id),
+        run_id=rid,
+        band=prepared.resolved_band,
+        provider=provider_name,
+        model=model_name,
+        latency_ms=total_latency_ms,
+        router_latency_ms=router_latency_ms,
+        provider_latency_ms=provider_latency_ms,
+        processing_latency_ms=processing_latency_ms,
+        prompt_tokens=int(prompt_tokens or 0),
+        completion_tokens=int(completion_tokens or 0),
+        cost_usd=result["cost_usd"],
+        baseline_cost_usd=baseline_cost,
+        alri_score=alri_score,
+        alri_tier=alri_tier,
+        status=run_status,
+        routing_efficient=routing_efficient,
+        query_category=category.value,
+        query_category_conf=category_conf,
+        counterfactual_cost_usd=what_if_cost_usd,
+        hedged=outcome.hedged,
+        hedge_cost_usd=hedge_cost_usd,
+        attempt_count=outcome.attempt_count,
+        stage_timings=prepared.timings.as_dict(),
+    )
+
+    session_context_reset = result.get("session_context_reset")
+    reset_reason = result.get("session_context_reset_reason")
+    if payload.session_id and outcome.failed_over and prepared.provider_name == "ollama" and provider_name != "ollama":
+        # The session's context lives with the local model; this turn went without it.
+        session_context_reset, reset_reason = True, "failover"
+    if session_context_reset:
+        log_event("session_context_reset", {"run_id": rid, "provider": provider_name, "reason": reset_reason})
+
+    # ---- Response ----
+    provenance = result.get("provenance") or {}
+    provenance.update(
+        {
+            "provider": provider_name,
+            "model": model_name,
+            "route_source": selection_source,
+            "trace_id": current_trace_id(),
+        }
+    )
+    provenance["governance"] = prepared.governance_info
+    result["provenance"] = provenance
+
+    resp = RunResponse(
+        run_id=rid,
+        status=run_status,
+        output=result["output"],
+        confidence=result["confidence"],
+        provenance=Provenance(**result["provenance"]),
+        policy_evaluation=PolicyEvaluation(**pol),
+        metrics=MetricsInfo(latency_ms=int(total_latency_ms), cost_usd=result["cost_usd"]),
+        audit=AuditInfo(retention_class=alri_tag, audit_hash=None),
+        query_category=category.value,
+        query_category_conf=category_conf,
+        session_context_reset=session_context_reset,
+    )
+
+    return FinalizedRun(
+        response=resp,
+        run_row=run_row,
+        billed_usd=float(cost_usd or 0.0) + float(hedge_cost_usd or 0.0),
+    )
+
+
+# ---- Persist ----
+
+
+def persist_runs(db: Session, tenant: Tenant, finalized: Sequence[FinalizedRun]) -> None:
+    """
+    Write all runs and the tenant's added usage in a single commit. Usage is
+    added in the UPDATE itself, so concurrent writers (other workers, the
+    job queue, batch runs) never overwrite each other's increments.
+    """
+    if not finalized:
+        return
+    with span("db.log_run", runs=len(finalized)):
+        log_runs_bulk(db, [item.run_row for item in finalized], commit=False)
+    with span("db.tenant_commit", runs=len(finalized)):
+        billed = sum((Decimal(str(item.billed_usd)) for item in finalized), Decimal("0"))
+        usage_usd = db.execute(
+            update(Tenant)
+            .where(Tenant.id == tenant.id)
+            .values(usage_usd=func.coalesce(Tenant.usage_usd, 0) + billed)
+            .returning(Tenant.usage_usd)
+            .execution_options(synchronize_session=False)
+        ).scalar_one()
+        db.commit()
+        # The caller's instance sees the new total without being marked dirty.
+        set_committed_value(tenant, "usage_usd", usage_usd)
+
+
+def run_once(payload: RunRequest, tenant: Tenant, router_mode: RouterMode, db: Session) -> RunResponse:
+    prepared = prepare_run(payload, tenant, router_mode)
+    finalized = finalize_run(execute_run(prepared, tenant), tenant)
+    request_timer = current_timer()
+    if request_timer is not None:
+        request_timer.merge(prepared.timings)
+    # The run row is written here, so its own stage_timings stop before "db".
+    with stage("db"):
+        persist_runs(db, tenant, [finalized])
+    log_event("router_out", {"run_id": prepared.rid, "status": finalized.response.status})
+    return finalized.response
+
+
+__all__ = [
+    "DEFAULT_MAX_OUTPUT_TOKENS",
+    "ExecutedRun",
+    "FinalizedRun",
+    "PreparedRun",
+    "PromptScore",
+    "admit_requests",
+    "allowed_model_keys_for_tenant",
+    "cap_band_for_tenant",
+    "compute_risk_score",
+    "ensure_credit_limit",
+    "ensure_request_limits",
+    "estimate_prompt_tokens",
+    "execute_run",
+    "filter_governance_providers",
+    "finalize_run",
+    "persist_runs",
+    "prepare_run",
+    "run_once",
+    "score_prompt",
+    "score_prompts",
+]
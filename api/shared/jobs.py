@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from pydantic import AnyHttpUrl, BaseModel
+
+from shared.models import RunRequest
+
+
+class JobCreate(RunRequest):
+    callback_url: Optional[AnyHttpUrl] = None
+
+
+class JobRead(BaseModel):
+    id: UUID
+    status: str
+    run_id: Optional[str] = None
+    attempts: int = 0
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[Dict[str, Any]] = None
+    webhook_status: Optional[str] = None
+    created_at: datetime
+    available_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -1,9 +1,14 @@
+import os
+
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 class RunRequest(BaseModel):
     prompt: str = Field(..., description="User prompt or task")
     agent_id: Optional[str] = Field(default="default-agent")
+    session_id: Optional[str] = Field(
+        default=None, max_length=128, description="Conversation ID; local models reuse context across its turns"
+    )
     context: Optional[Dict[str, Any]] = None
     policy_overrides: Optional[Dict[str, Any]] = None
     router_mode: Optional[str] = Field(
@@ -15,10 +20,23 @@ class RunRequest(BaseModel):
     force_model: Optional[str] = None
     force_band: Optional[str] = None
 
+BATCH_MAX_ITEMS = int(os.getenv("AGENTICLABS_BATCH_MAX_ITEMS", "500"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("AGENTICLABS_BATCH_MAX_CONCURRENCY", "16"))
+# Finished batch items are written (and billed) in chunks of this size.
+BATCH_PERSIST_EVERY = int(os.getenv("AGENTICLABS_BATCH_PERSIST_EVERY", "25"))
+
+class BatchRunRequest(BaseModel):
+    items: List[RunRequest] = Field(..., min_length=1, max_length=BATCH_MAX_ITEMS)
+    max_concurrency: Optional[int] = Field(
+        default=None, ge=1, le=BATCH_MAX_CONCURRENCY,
+        description="Provider calls in flight at once (defaults to the server maximum)",
+    )
+
 class Provenance(BaseModel):
     provider: str
     model: str
     route_source: Optional[str] = None
+    trace_id: Optional[str] = None
     parameters: Dict[str, Any] = {}
 
 class PolicyEvaluation(BaseModel):
@@ -45,6 +63,9 @@ class RunResponse(BaseModel):
     policy_evaluation: PolicyEvaluation
     metrics: MetricsInfo
     audit: AuditInfo
+    # Session runs only: true when this turn ran without the session's
+    # earlier context (dropped, expired, or served by a failover provider).
+    session_context_reset: Optional[bool] = None
 
 class MetricsSnapshot(BaseModel):
     total_runs: int
@@ -29,6 +29,7 @@ class TenantRead(TenantBase):
     usage_usd: Decimal
     max_daily_requests: int
     max_tokens_per_request: int
+    hedge_requests: bool = False
     created_at: datetime
     updated_at: datetime | None = None
 
@@ -49,3 +50,4 @@ class UserRead(BaseModel):
 class TenantSettingsUpdate(BaseModel):
     default_data_sensitivity: DataSensitivity | None = None
     default_autonomy_level: AutonomyLevel | None = None
+    hedge_requests: bool | None = None
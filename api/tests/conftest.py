@@ -1,12 +1,59 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 
 def _ensure_api_on_path() -> None:
     api_root = Path(__file__).resolve().parents[1]
     api_str = str(api_root)
     if api_str not in sys.path:
         sys.path.insert(0, api_str)
+    # The shared `core` ports and `adapters` live at the repository root;
+    # appended so the API's own packages still win on name clashes.
+    repo_str = str(api_root.parent)
+    if repo_str not in sys.path:
+        sys.path.append(repo_str)
 
 
 _ensure_api_on_path()
+
+
+class FakeClock:
+    """A callable clock for code that takes `clock=`; advance it with `clock.now += s`."""
+
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def sqlite_sessions(monkeypatch):
+    """A sessionmaker on an in-memory SQLite database with every table created."""
+    from sqlalchemy import String, create_engine
+    from sqlalchemy.dialects.postgresql import JSONB, UUID
+    from sqlalchemy.ext.compiler import compiles
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from db.models import Base, RouterRun
+    import models.tenant  # noqa: F401  registers the tenants table
+
+    compiles(JSONB, "sqlite")(lambda type_, compiler, **kw: "JSON")
+    compiles(UUID, "sqlite")(lambda type_, compiler, **kw: "CHAR(32)")
+    # Runs carry the tenant id as a string; SQLite has no native UUID to coerce it.
+    monkeypatch.setattr(RouterRun.__table__.c.tenant_id, "type", String(36))
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    try:
+        yield sessionmaker(bind=engine, autoflush=False, future=True)
+    finally:
+        engine.dispose()
@@ -0,0 +1,43 @@
+from ratelimit.adaptive import AIMDLimit, AdaptiveConcurrencyLimiter, GradientLimit
+
+
+def _run_batch(limiter, clock, size, rtt_s, **release_kwargs):
+    permits = [limiter.try_acquire() for _ in range(size)]
+    clock.now += rtt_s
+    for permit in permits:
+        if permit is not None:
+            permit.release(**release_kwargs)
+    return permits
+
+
+def test_rejects_above_limit_without_queueing(clock):
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, min_limit=1, clock=clock)
+    first, second = limiter.try_acquire(), limiter.try_acquire()
+    assert first and second
+    assert limiter.try_acquire() is None
+    assert limiter.snapshot()["rejected"] == 1
+    first.release(sample=False)
+    assert limiter.try_acquire() is not None
+
+
+def test_gradient_shrinks_on_latency_inflation_and_recovers(clock):
+    limiter = AdaptiveConcurrencyLimiter(GradientLimit(), initial_limit=20, min_limit=2, max_limit=100, clock=clock)
+    for _ in range(20):
+        _run_batch(limiter, clock, 20, 0.1)
+    healthy = limiter.limit
+    for _ in range(20):
+        _run_batch(limiter, clock, limiter.limit, 1.0)
+    degraded = limiter.limit
+    assert degraded < healthy
+    for _ in range(60):
+        _run_batch(limiter, clock, limiter.limit, 0.1)
+    assert limiter.limit > degraded
+
+
+def test_aimd_backs_off_on_failures_and_grows_under_load(clock):
+    limiter = AdaptiveConcurrencyLimiter(AIMDLimit(latency_threshold_s=1.0), initial_limit=10, clock=clock)
+    _run_batch(limiter, clock, 10, 0.1, dropped=True)
+    assert limiter.limit < 10
+    before = limiter.limit
+    _run_batch(limiter, clock, before, 0.1)
+    assert limiter.limit > before
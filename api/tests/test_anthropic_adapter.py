@@ -0,0 +1,52 @@
+import importlib
+from types import SimpleNamespace
+
+from cost.calculator import calculate_cost
+
+# `providers.anthropic_adapter` the attribute is the provider instance.
+anthropic_mod = importlib.import_module("providers.anthropic_adapter")
+
+LONG_PREFIX = "Reference document. " * 400
+
+
+class _Endpoint:
+    def __init__(self, calls, name, usage):
+        self._calls = calls
+        self._name = name
+        self._usage = usage
+
+    async def create(self, **kwargs):
+        self._calls.append((self._name, kwargs))
+        return SimpleNamespace(content=[SimpleNamespace(text=" ok ")], usage=self._usage)
+
+
+def test_long_prefix_uses_prompt_cache_and_is_billed_at_cache_rates(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+    usage = SimpleNamespace(input_tokens=20, output_tokens=10, cache_read_input_tokens=2000, cache_creation_input_tokens=0)
+    calls = []
+    provider = anthropic_mod.AnthropicProvider()
+    provider._client = SimpleNamespace(
+        messages=_Endpoint(calls, "messages", usage),
+        beta=SimpleNamespace(prompt_caching=SimpleNamespace(messages=_Endpoint(calls, "cached", usage))),
+    )
+    model = "claude-3-sonnet-20240229"
+
+    plan = provider.plan({"context": {"prompt_prefix": LONG_PREFIX}}, model)
+    result = provider.execute(plan, "Summarize section 2.")
+
+    endpoint, kwargs = calls[0]
+    assert endpoint == "cached"
+    blocks = kwargs["messages"][0]["content"]
+    assert blocks[0]["cache_control"] == {"type": "ephemeral"}
+    assert blocks[1]["text"] == "Summarize section 2."
+    assert result["output"] == "ok"
+    assert (result["prompt_tokens"], result["cached_prompt_tokens"]) == (2020, 2000)
+    full_price = anthropic_mod._estimate_cost(model, 2020, 10)
+    assert result["cost_usd"] < full_price / 3
+    assert calculate_cost(
+        model_key="x:y", provider="anthropic", model=model, input_tokens=2020, output_tokens=10, cache_read_tokens=2000
+    ) < calculate_cost(model_key="x:y", provider="anthropic", model=model, input_tokens=2020, output_tokens=10)
+
+    provider.execute(provider.plan({}, model), "short prompt")
+    assert calls[1][0] == "messages"
+    assert calls[1][1]["system"] == anthropic_mod.DEFAULT_SYS_PROMPT
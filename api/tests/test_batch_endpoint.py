@@ -0,0 +1,168 @@
+import asyncio
+import json
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+import deps
+import main
+import run_pipeline
+from config.router import RouterMode
+from db.models import RouterRun
+from db.session import get_db
+from models.tenant import Tenant
+from providers.registry import ProviderRegistry
+from ratelimit import InMemoryRateLimiter, RateLimitConfig
+from ratelimit.adaptive import AdaptiveConcurrencyLimiter
+from shared.models import BatchRunRequest
+
+TENANT_ID = uuid.UUID("00000000-0000-0000-0000-0000000000b7")
+
+
+@pytest.fixture
+def batch_env(sqlite_sessions, monkeypatch):
+    Session = sqlite_sessions
+    with Session() as db:
+        db.add(Tenant(
+            id=TENANT_ID,
+            name="Batch",
+            slug="batch",
+            allowed_providers=["openai", "anthropic"],
+            credit_limit_usd=100,
+            usage_usd=0,
+        ))
+        db.commit()
+
+    def override_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    # Every routed provider answers through the synthetic stub adapter.
+    stubbed = ProviderRegistry({name: "providers.stub" for name in ("openai", "anthropic", "gemini", "ollama")})
+    monkeypatch.setattr(run_pipeline, "PROVIDERS", stubbed)
+    monkeypatch.setattr(
+        run_pipeline, "rate_limiter", InMemoryRateLimiter(RateLimitConfig(burst=20, refill_per_s=2.0))
+    )
+    monkeypatch.setattr(deps, "run_limiter", AdaptiveConcurrencyLimiter(initial_limit=5))
+    monkeypatch.setattr(main, "SessionLocal", Session)
+    main.app.dependency_overrides[get_db] = override_db
+    try:
+        yield Session
+    finally:
+        main.app.dependency_overrides.pop(get_db, None)
+
+
+def _post(items, **extra):
+    client = TestClient(main.app)
+    resp = client.post(
+        "/v1/run/batch",
+        json={"items": items, **extra},
+        headers={"X-Agentic-Tenant-Id": str(TENANT_ID)},
+    )
+    lines = [json.loads(line) for line in resp.text.splitlines() if line]
+    return resp, lines
+
+
+def _stored(Session):
+    with Session() as db:
+        runs = db.scalar(select(func.count()).select_from(RouterRun))
+        usage = float(db.get(Tenant, TENANT_ID).usage_usd)
+    return runs, usage
+
+
+def test_batch_is_admitted_once_for_all_items(batch_env):
+    resp, lines = _post([{"prompt": f"question {i}"} for i in range(100)])
+    assert resp.status_code == 200
+    summary = lines[-1]
+    assert summary["status"] == "summary"
+    assert (summary["succeeded"], summary["failed"]) == (100, 0)
+    assert _stored(batch_env)[0] == 100
+
+    # The batch drained the bucket; the next one is turned away as a whole.
+    resp, _ = _post([{"prompt": "again"}])
+    assert resp.status_code == 429
+
+
+def test_batch_reports_item_errors_per_line(batch_env, monkeypatch):
+    original = main.finalize_run
+
+    def flaky_finalize(executed, tenant):
+        prompt = executed.prepared.payload.prompt
+        if prompt == "boom":
+            raise RuntimeError("adapter bug")
+        if prompt == "upstream":
+            raise HTTPException(status_code=502, detail="All providers failed")
+        return original(executed, tenant)
+
+    monkeypatch.setattr(main, "finalize_run", flaky_finalize)
+    resp, lines = _post([
+        {"prompt": "fine"},
+        {"prompt": "boom"},
+        {"prompt": "upstream"},
+        {"prompt": "not allowed", "force_provider": "gemini"},
+    ])
+    assert resp.status_code == 200
+    by_index = {line["index"]: line for line in lines if "index" in line}
+    assert by_index[0]["status"] == "ok"
+    assert (by_index[1]["status"], by_index[1]["status_code"]) == ("error", 500)
+    assert (by_index[2]["status_code"], by_index[2]["detail"]) == (502, "All providers failed")
+    assert by_index[3]["status_code"] == 403
+    assert (lines[-1]["succeeded"], lines[-1]["failed"]) == (1, 3)
+    assert _stored(batch_env)[0] == 1
+
+
+def _run_directly(Session, prompts, *, permit=None, max_concurrency=2):
+    """Call the handler without the ASGI stack, to drive its stream by hand."""
+    with Session() as db:
+        tenant = db.get(Tenant, TENANT_ID)
+        db.expunge(tenant)
+    payload = BatchRunRequest(items=[{"prompt": p} for p in prompts], max_concurrency=max_concurrency)
+    return main.run_batch_endpoint(payload, permit=permit, router_mode=RouterMode.ENHANCED, tenant=tenant)
+
+
+def test_batch_holds_its_concurrency_slot_until_the_stream_ends(batch_env):
+    limiter = deps.run_limiter
+    response = _run_directly(batch_env, ["one", "two", "three"], permit=limiter.try_acquire())
+    assert limiter.snapshot()["in_flight"] == 1
+
+    async def drain():
+        return [chunk async for chunk in response.body_iterator]
+
+    lines = asyncio.run(drain())
+    assert json.loads(lines[-1])["succeeded"] == 3
+    # Released once the stream is done, without feeding the batch's duration
+    # into the latency gradient.
+    assert limiter.snapshot()["in_flight"] == 0
+    assert limiter.limit == 5
+
+    _post([{"prompt": "via http"}])
+    assert limiter.snapshot()["in_flight"] == 0
+    resp, _ = _post([{"prompt": f"over {i}"} for i in range(50)])
+    assert resp.status_code == 429
+    assert limiter.snapshot()["in_flight"] == 0
+
+
+def test_finished_items_are_persisted_when_the_stream_breaks_off(batch_env):
+    response = _run_directly(batch_env, [f"item {i} " + "context " * 400 for i in range(6)])
+
+    async def read_one_then_disconnect():
+        body = response.body_iterator
+        first = await body.__anext__()
+        await body.aclose()
+        return json.loads(first)
+
+    first = asyncio.run(read_one_then_disconnect())
+    assert first["status"] == "ok"
+    runs, usage = _stored(batch_env)
+    # Unstarted calls are dropped; everything that ran is written and billed.
+    assert 1 <= runs <= 6
+    with batch_env() as db:
+        billed = db.scalar(select(func.sum(RouterRun.cost_usd)))
+    assert billed > 0
+    assert usage == pytest.approx(billed, abs=1e-4)
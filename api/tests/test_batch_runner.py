@@ -0,0 +1,80 @@
+import uuid
+
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from batch_runner import BatchRunner, Checkpoint, _Progress, iter_input
+from db.models import RouterRun
+from models.tenant import Tenant
+
+TENANT_ID = uuid.UUID("00000000-0000-0000-0000-0000000000b8")
+
+
+def test_progress_advances_low_water_mark_over_out_of_order_completions(tmp_path):
+    path = tmp_path / "in.jsonl"
+    path.write_bytes(b'{"prompt": "a"}\n{"prompt": "bb"}\n{"prompt": "ccc"}\n')
+    lines = list(iter_input(str(path), 0, 0))
+    assert [index for index, _, _ in lines] == [0, 1, 2]
+
+    checkpoint = Checkpoint(str(path), path.stat().st_size)
+    progress = _Progress(checkpoint)
+    progress.mark(2, lines[2][1])
+    progress.mark(1, lines[1][1])
+    assert checkpoint.next_index == 0
+    progress.sync()
+    assert checkpoint.done_ahead == [1, 2]
+
+    progress.mark(0, lines[0][1])
+    progress.sync()
+    assert (checkpoint.next_index, checkpoint.next_offset, checkpoint.done_ahead) == (3, path.stat().st_size, [])
+
+    ckpt_path = tmp_path / "out.ckpt"
+    checkpoint.save(str(ckpt_path))
+    resumed = Checkpoint.load(str(ckpt_path))
+    assert list(iter_input(str(path), resumed.next_index, resumed.next_offset)) == []
+
+
+def test_stop_during_retry_wait_leaves_the_item_unanswered(monkeypatch):
+    import run_pipeline
+
+    def rate_limited(*args, **kwargs):
+        raise HTTPException(status_code=429, detail="slow down", headers={"Retry-After": "30"})
+
+    monkeypatch.setattr(run_pipeline, "prepare_run", rate_limited)
+    runner = BatchRunner(tenant_id="t", router_mode="enhanced")
+    runner.stop()
+    assert runner._run_item(b'{"prompt": "hi"}') == (None, None)
+
+
+def _row(run_id, cost):
+    return dict(
+        tenant_id=str(TENANT_ID), run_id=run_id, band="low", provider="openai", model="gpt-4.1-mini",
+        latency_ms=10.0, prompt_tokens=5, completion_tokens=5, cost_usd=cost, baseline_cost_usd=cost,
+    )
+
+
+def test_resume_writes_only_the_pending_runs_that_missed_the_commit(sqlite_sessions, monkeypatch, tmp_path):
+    import db.session
+    from db.router_runs_repo import log_runs_bulk
+
+    Session = sqlite_sessions
+    monkeypatch.setattr(db.session, "SessionLocal", Session)
+    with Session() as s:
+        s.add(Tenant(id=TENANT_ID, name="Batch", slug="batch-runner", credit_limit_usd=100, usage_usd=1))
+        log_runs_bulk(s, [_row("r_committed", 1.0)])
+        tenant = s.get(Tenant, TENANT_ID)
+        s.expunge(tenant)
+
+    ckpt_path = str(tmp_path / "out.ckpt")
+    checkpoint = Checkpoint("in.jsonl", 10, pending_runs=[
+        {"run_row": _row("r_committed", 1.0), "billed_usd": 1.0},
+        {"run_row": _row("r_lost", 2.0), "billed_usd": 2.0},
+    ])
+    runner = BatchRunner(tenant_id=str(TENANT_ID))
+    runner._tenant = tenant
+    runner._recover(checkpoint, ckpt_path)
+
+    with Session() as s:
+        assert sorted(s.scalars(select(RouterRun.run_id))) == ["r_committed", "r_lost"]
+        assert float(s.get(Tenant, TENANT_ID).usage_usd) == 3.0
+    assert Checkpoint.load(ckpt_path).pending_runs == []
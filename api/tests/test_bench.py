@@ -0,0 +1,30 @@
+from bench import compare, measure, run_suite
+from bench.corpus import make_prompt
+
+
+def test_corpus_prompts_hit_exact_sizes():
+    assert [len(make_prompt(n)) for n in (10, 1_000, 200_000)] == [10, 1_000, 200_000]
+
+
+def test_measure_reports_per_op_stats():
+    stats = measure(lambda: sum(range(50)), sample_s=0.001, repeats=3)
+    assert stats["loops"] >= 1 and stats["repeats"] == 3
+    assert 0 < stats["ns_per_op"]["min"] <= stats["ns_per_op"]["median"] <= stats["ns_per_op"]["max"]
+
+
+def test_run_suite_covers_prepare_run_and_unsized_cases():
+    rows = run_suite(only=["prepare_run", "calculate_cost"], sizes=["10B", "1KB"], sample_s=0.001, repeats=1)
+    assert [(row["case"], row["size"]) for row in rows] == [
+        ("cost.calculate_cost", "-"),
+        ("pipeline.prepare_run", "10B"),
+        ("pipeline.prepare_run", "1KB"),
+    ]
+
+
+def test_compare_flags_regressions_over_threshold():
+    def doc(median):
+        return {"results": [{"case": "c", "size": "1KB", "ns_per_op": {"median": median}}]}
+
+    assert compare(doc(100), doc(115), threshold_pct=10)[0]["status"] == "regression"
+    assert compare(doc(100), doc(105), threshold_pct=10)[0]["status"] == "same"
+    assert compare(doc(100), doc(80), threshold_pct=10)[0]["status"] == "improvement"
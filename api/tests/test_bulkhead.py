@@ -0,0 +1,55 @@
+import threading
+import time
+
+import pytest
+
+from providers.bulkhead import Bulkhead, BulkheadConfig, BulkheadRegistry, BulkheadRejected
+
+
+def test_queue_full_is_shed_immediately():
+    bulkhead = Bulkhead("ollama", BulkheadConfig(max_concurrent=1, max_queue=0, max_queue_wait_s=1))
+    bulkhead.acquire()
+    with pytest.raises(BulkheadRejected) as exc:
+        bulkhead.acquire()
+    assert exc.value.reason == "queue_full"
+    assert exc.value.retryable is False
+    bulkhead.release()
+    assert bulkhead.acquire() == 0.0
+
+
+def test_waiters_are_admitted_in_fifo_order():
+    bulkhead = Bulkhead("ollama", BulkheadConfig(max_concurrent=1, max_queue=4, max_queue_wait_s=2))
+    bulkhead.acquire()
+    order = []
+
+    def worker(name):
+        bulkhead.acquire()
+        order.append(name)
+        bulkhead.release()
+
+    threads = []
+    for name in ("a", "b", "c"):
+        thread = threading.Thread(target=worker, args=(name,))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.02)
+    bulkhead.release()
+    for thread in threads:
+        thread.join(timeout=2)
+    assert order == ["a", "b", "c"]
+    assert bulkhead.snapshot()["max_queue_ms"] > 0
+
+
+def test_expected_wait_over_budget_is_shed_and_limits_are_tunable():
+    registry = BulkheadRegistry()
+    registry.configure("ollama", BulkheadConfig(max_concurrent=1, max_queue=8, max_queue_wait_s=10))
+    with registry.slot("ollama", "qwen2"):
+        time.sleep(0.05)
+    lease = registry.acquire("ollama", "qwen2")
+    with pytest.raises(BulkheadRejected) as exc:
+        registry.acquire("ollama", "qwen2", budget_s=0.01)
+    assert exc.value.reason == "over_budget"
+    registry.configure("ollama", BulkheadConfig(max_concurrent=2, max_queue=8, max_queue_wait_s=10))
+    registry.acquire("ollama", "qwen2", budget_s=0.01).release()
+    lease.release()
+    assert registry.snapshot()["ollama"]["in_flight"] == 0
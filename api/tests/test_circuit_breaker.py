@@ -0,0 +1,47 @@
+from routing.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    BreakerConfig,
+    BreakerRegistry,
+)
+
+
+def _registry(clock):
+    config = BreakerConfig(window_s=30, min_requests=3, error_rate_threshold=0.5, open_s=10)
+    return BreakerRegistry(config, clock)
+
+
+def test_breaker_opens_after_error_rate_threshold(clock):
+    registry = _registry(clock)
+    breaker = registry.get("openai:gpt-4o")
+    breaker.record_success()
+    breaker.record_failure("boom")
+    assert breaker.snapshot()["state"] == CLOSED
+    breaker.record_failure("boom")
+    assert breaker.snapshot()["state"] == OPEN
+    assert breaker.allow() is False
+    assert registry.is_available("openai:gpt-4o") is False
+    assert registry.is_available("openai:gpt-4o-mini") is True
+
+
+def test_half_open_admits_single_probe_then_closes_on_success(clock):
+    breaker = _registry(clock).get("ollama:qwen2:7b-instruct")
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 11
+    assert breaker.snapshot()["state"] == HALF_OPEN
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+    breaker.record_success()
+    assert breaker.snapshot()["state"] == CLOSED
+
+
+def test_failed_probe_reopens_circuit(clock):
+    breaker = _registry(clock).get("gemini:gemini-2.0-flash")
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 11
+    assert breaker.allow() is True
+    breaker.record_failure()
+    assert breaker.snapshot()["state"] == OPEN
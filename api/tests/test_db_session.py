@@ -0,0 +1,30 @@
+from db.session import async_database_url, async_engine_options, engine_options
+
+PG_URL = "postgresql+psycopg2://agentic:secret@db:5432/agenticlabs"
+
+
+def test_engine_options_from_env(monkeypatch):
+    monkeypatch.setenv("AGENTICLABS_DB_POOL_SIZE", "4")
+    monkeypatch.setenv("AGENTICLABS_DB_MAX_OVERFLOW", "2")
+    monkeypatch.setenv("AGENTICLABS_DB_POOL_PRE_PING", "0")
+    options = engine_options(PG_URL)
+    assert (options["pool_size"], options["max_overflow"], options["pool_pre_ping"]) == (4, 2, False)
+    assert options["pool_recycle"] == 1800
+
+    sqlite = engine_options("sqlite:///:memory:")
+    assert "pool_size" not in sqlite and sqlite["pool_pre_ping"] is False
+
+
+def test_async_url_swaps_postgres_driver(monkeypatch):
+    monkeypatch.delenv("AGENTICLABS_ASYNC_DATABASE_URL", raising=False)
+    assert async_database_url(PG_URL) == "postgresql+asyncpg://agentic:secret@db:5432/agenticlabs"
+    assert async_database_url("postgresql://u:p@h/db").startswith("postgresql+asyncpg://")
+    monkeypatch.setenv("AGENTICLABS_ASYNC_DATABASE_URL", "postgresql+asyncpg://other/db")
+    assert async_database_url(PG_URL) == "postgresql+asyncpg://other/db"
+
+
+def test_statement_cache_applies_to_asyncpg_only(monkeypatch):
+    monkeypatch.setenv("AGENTICLABS_DB_STATEMENT_CACHE_SIZE", "0")
+    options = async_engine_options("postgresql+asyncpg://u:p@h/db")
+    assert options["connect_args"] == {"prepared_statement_cache_size": 0, "statement_cache_size": 0}
+    assert "connect_args" not in async_engine_options("sqlite+aiosqlite:///x.db")
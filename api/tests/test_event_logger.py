@@ -0,0 +1,45 @@
+import io
+import json
+
+from logger.event_logger import DROP_OLDEST, EventLogger, parse_sample_rates
+
+
+def _events(buf):
+    return [json.loads(line) for line in buf.getvalue().splitlines()]
+
+
+def test_parse_sample_rates_clamps_and_skips_invalid_entries():
+    rates = parse_sample_rates("route_plan=0.1, router_in=2,bad,provider_out=x")
+    assert rates == {"route_plan": 0.1, "router_in": 1.0}
+
+
+def test_drop_oldest_keeps_most_recent_events():
+    buf = io.StringIO()
+    logger = EventLogger(
+        buf, max_buffer=2, batch_size=10, flush_interval_s=5.0, drop_policy=DROP_OLDEST
+    )
+    for i in range(4):
+        logger.log("router_in", {"i": i})
+    logger.flush()
+    assert [e["i"] for e in _events(buf)] == [2, 3]
+    assert logger.dropped == 2
+
+
+def test_zero_sample_rate_suppresses_event_type():
+    buf = io.StringIO()
+    logger = EventLogger(buf, sample_rates={"route_plan": 0.0})
+    logger.log("route_plan", {"run_id": "r_1"})
+    logger.log("router_out", {"run_id": "r_1"})
+    logger.flush()
+    assert [e["event"] for e in _events(buf)] == ["router_out"]
+
+
+def test_payload_is_captured_when_logged():
+    buf = io.StringIO()
+    logger = EventLogger(buf, batch_size=10, flush_interval_s=5.0)
+    payload = {"attempts": [{"key": "openai:gpt-4o"}]}
+    logger.log("provider_failed", payload)
+    payload["attempts"][0]["key"] = "mutated"
+    payload["attempts"].append(object())
+    logger.flush()
+    assert _events(buf)[0]["attempts"] == [{"key": "openai:gpt-4o"}]
@@ -0,0 +1,270 @@
+import time
+
+import pytest
+
+from providers.errors import NoProviderAvailableError, ProviderError, parse_retry_after
+from providers.executor import execute_with_failover
+from providers.retry import RetryPolicy
+from routing.circuit_breaker import BreakerRegistry
+from routing.live_stats import LivePerformanceTable
+
+
+class _Provider:
+    def __init__(self, name, delay_s=0.0, fail=False):
+        self.name = name
+        self.delay_s = delay_s
+        self.fail = fail
+        self.calls = 0
+        self.plans = []
+
+    def plan(self, run_payload, model_name=None):
+        return {"provider": self.name, "model": model_name}
+
+    def execute(self, plan, prompt):
+        self.calls += 1
+        self.plans.append(plan)
+        time.sleep(self.delay_s)
+        if self.fail:
+            raise ProviderError(self.name, plan["model"], "boom", status_code=500)
+        return {"output": self.name, "prompt_tokens": 3, "completion_tokens": 5}
+
+
+def _perf_with_p95(key, latency_ms):
+    perf = LivePerformanceTable(min_samples=1)
+    perf.record_success(key, latency_ms)
+    return perf
+
+
+def test_failover_moves_to_next_candidate():
+    providers = {"openai": _Provider("openai", fail=True), "anthropic": _Provider("anthropic")}
+    outcome = execute_with_failover(
+        [("openai", "gpt-4o"), ("anthropic", "claude-3-5-sonnet")],
+        {},
+        "hi",
+        providers=providers,
+        run_id="r1",
+        breaker_registry=BreakerRegistry(),
+        perf_table=LivePerformanceTable(),
+        retry_policy=RetryPolicy(max_attempts_per_model=1),
+    )
+    assert outcome.provider == "anthropic"
+    assert outcome.failed_over is True
+    assert [a["outcome"] for a in outcome.attempts] == ["error", "ok"]
+
+
+def test_hedge_fires_after_p95_and_fast_backup_wins():
+    slow = _Provider("openai", delay_s=0.5)
+    fast = _Provider("anthropic")
+    outcome = execute_with_failover(
+        [("openai", "gpt-4o"), ("anthropic", "claude-3-5-sonnet")],
+        {},
+        "hi",
+        providers={"openai": slow, "anthropic": fast},
+        run_id="r2",
+        hedge=True,
+        breaker_registry=BreakerRegistry(),
+        perf_table=_perf_with_p95("openai:gpt-4o", 60),
+    )
+    assert outcome.hedged is True
+    assert outcome.provider == "anthropic"
+    assert outcome.hedge_loser == ("openai", "gpt-4o")
+    assert fast.calls == 1
+
+
+def test_hedge_not_sent_when_primary_answers_in_time():
+    fast = _Provider("openai")
+    backup = _Provider("anthropic")
+    outcome = execute_with_failover(
+        [("openai", "gpt-4o"), ("anthropic", "claude-3-5-sonnet")],
+        {},
+        "hi",
+        providers={"openai": fast, "anthropic": backup},
+        run_id="r3",
+        hedge=True,
+        breaker_registry=BreakerRegistry(),
+        perf_table=_perf_with_p95("openai:gpt-4o", 500),
+    )
+    assert outcome.hedged is False
+    assert outcome.provider == "openai"
+    assert backup.calls == 0
+
+
+class _Flaky(_Provider):
+    def __init__(self, name, failures, status_code=503, retry_after=None):
+        super().__init__(name)
+        self.failures = failures
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    def execute(self, plan, prompt):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ProviderError(
+                self.name, plan["model"], "flaky", status_code=self.status_code, retry_after=self.retry_after
+            )
+        return {"output": self.name, "prompt_tokens": 3, "completion_tokens": 5}
+
+
+def _run(providers, policy):
+    return execute_with_failover(
+        [("openai", "gpt-4o"), ("anthropic", "claude-3-5-sonnet")],
+        {},
+        "hi",
+        providers=providers,
+        run_id="retry",
+        breaker_registry=BreakerRegistry(),
+        perf_table=LivePerformanceTable(),
+        retry_policy=policy,
+    )
+
+
+def test_transient_error_is_retried_on_same_model():
+    flaky = _Flaky("openai", failures=1, status_code=429, retry_after=0)
+    outcome = _run({"openai": flaky, "anthropic": _Provider("anthropic")}, RetryPolicy(base_delay_s=0))
+    assert outcome.provider == "openai"
+    assert outcome.attempt_count == 2
+    assert [a["attempt"] for a in outcome.attempts] == [1, 2]
+
+
+def test_fatal_error_falls_through_without_retry():
+    fatal = _Flaky("openai", failures=5, status_code=400)
+    outcome = _run({"openai": fatal, "anthropic": _Provider("anthropic")}, RetryPolicy(base_delay_s=0))
+    assert fatal.calls == 1
+    assert outcome.provider == "anthropic"
+
+
+def test_long_retry_after_skips_to_next_model_and_backoff_is_capped():
+    throttled = _Flaky("openai", failures=5, status_code=429, retry_after=120)
+    policy = RetryPolicy(base_delay_s=1.0, max_delay_s=2.0, max_retry_after_s=10)
+    outcome = _run({"openai": throttled, "anthropic": _Provider("anthropic")}, policy)
+    assert throttled.calls == 1
+    assert outcome.provider == "anthropic"
+    assert policy.backoff_s(5, rand=lambda: 1.0) == 2.0
+    assert policy.backoff_s(1, retry_after=3) == 3
+
+
+def test_retry_after_header_parsing():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("not a date") is None
+
+
+def test_each_call_is_given_the_remaining_deadline_as_its_timeout():
+    first = _Provider("openai", delay_s=0.2, fail=True)
+    second = _Provider("anthropic")
+    outcome = execute_with_failover(
+        [("openai", "gpt-4o"), ("anthropic", "claude-3-5-sonnet")],
+        {},
+        "hi",
+        providers={"openai": first, "anthropic": second},
+        run_id="r-deadline",
+        breaker_registry=BreakerRegistry(),
+        perf_table=LivePerformanceTable(),
+        retry_policy=RetryPolicy(max_attempts_per_model=1, deadline_s=5.0),
+    )
+    budget_first = first.plans[0]["timeout_s"]
+    budget_second = second.plans[0]["timeout_s"]
+    assert 4.5 < budget_first <= 5.0
+    assert budget_second <= budget_first - 0.2
+    assert "timeout_s" not in outcome.plan
+
+
+def test_full_hedge_pool_runs_the_primary_unhedged_on_the_caller(monkeypatch):
+    import threading
+
+    from providers import executor
+
+    monkeypatch.setattr(executor, "_hedge_pool", executor._HedgePool(1))
+    slow = _Provider("openai", delay_s=0.3)
+    backup = _Provider("anthropic")
+    threads = []
+    slow.execute = lambda plan, prompt, _run=slow.execute: threads.append(threading.current_thread()) or _run(plan, prompt)
+
+    def run(run_id):
+        return execute_with_failover(
+            [("openai", "gpt-4o"), ("anthropic", "claude-3-5-sonnet")],
+            {},
+            "hi",
+            providers={"openai": slow, "anthropic": backup},
+            run_id=run_id,
+            hedge=True,
+            breaker_registry=BreakerRegistry(),
+            perf_table=_perf_with_p95("openai:gpt-4o", 60),
+        )
+
+    # The first run's primary holds the only pool thread; its backup cannot
+    # start, so it waits for the primary instead.
+    first = run("r-pool-1")
+    assert (first.provider, first.hedged, backup.calls) == ("openai", False, 0)
+
+    holder = threading.Thread(target=run, args=("r-pool-2",))
+    holder.start()
+    time.sleep(0.05)
+    second = run("r-pool-3")
+    holder.join()
+    assert (second.provider, second.hedged) == ("openai", False)
+    assert threading.main_thread() in threads
+
+
+def test_shed_call_during_half_open_gives_the_probe_back():
+    from providers.bulkhead import BulkheadConfig, BulkheadRegistry
+    from routing.circuit_breaker import HALF_OPEN, BreakerConfig
+
+    now = [1000.0]
+    breakers = BreakerRegistry(BreakerConfig(min_requests=1, open_s=10), clock=lambda: now[0])
+    breaker = breakers.get("openai:gpt-4o")
+    breaker.record_failure("boom")
+    now[0] += 11
+    assert breaker.snapshot()["state"] == HALF_OPEN
+
+    bulkheads = BulkheadRegistry(BulkheadConfig(max_concurrent=1, max_queue=0))
+    provider = _Provider("openai")
+
+    def run():
+        return execute_with_failover(
+            [("openai", "gpt-4o")],
+            {},
+            "hi",
+            providers={"openai": provider},
+            run_id="r-shed",
+            breaker_registry=breakers,
+            perf_table=LivePerformanceTable(),
+            bulkhead_registry=bulkheads,
+        )
+
+    held = bulkheads.acquire("openai", "gpt-4o")
+    with pytest.raises(NoProviderAvailableError):
+        run()
+    held.release()
+    assert breaker.is_available() is True
+
+    now[0] += 1000
+    outcome = run()
+    assert (outcome.provider, provider.calls) == ("openai", 1)
+    assert breaker.snapshot()["state"] == "closed"
+
+
+def test_backup_left_unstarted_by_a_full_hedge_pool_can_still_fail_over(monkeypatch):
+    from providers import executor
+    from routing.circuit_breaker import HALF_OPEN, BreakerConfig
+
+    monkeypatch.setattr(executor, "_hedge_pool", executor._HedgePool(1))
+    now = [1000.0]
+    breakers = BreakerRegistry(BreakerConfig(min_requests=1, open_s=10), clock=lambda: now[0])
+    breakers.get("anthropic:claude-3-5-sonnet").record_failure("boom")
+    now[0] += 11
+    assert breakers.get("anthropic:claude-3-5-sonnet").snapshot()["state"] == HALF_OPEN
+
+    primary = _Provider("openai", delay_s=0.3, fail=True)
+    backup = _Provider("anthropic")
+    outcome = execute_with_failover(
+        [("openai", "gpt-4o"), ("anthropic", "claude-3-5-sonnet")],
+        {},
+        "hi",
+        providers={"openai": primary, "anthropic": backup},
+        run_id="r-rewind",
+        hedge=True,
+        breaker_registry=breakers,
+        perf_table=_perf_with_p95("openai:gpt-4o", 60),
+        retry_policy=RetryPolicy(max_attempts_per_model=1),
+    )
+    assert (outcome.provider, outcome.hedged, backup.calls) == ("anthropic", False, 1)
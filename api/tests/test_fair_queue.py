@@ -0,0 +1,75 @@
+import threading
+import time
+
+import pytest
+
+from ratelimit.fair_queue import FairQueueRejected, FairScheduler, tenant_weight
+
+
+def _queued(scheduler, tenant_id):
+    return scheduler.snapshot()["tenants"].get(tenant_id, {}).get("queued", 0)
+
+
+def _enqueue(scheduler, tenant_id, weight, order):
+    """Start a waiting request and return once the scheduler has queued it."""
+    def worker():
+        scheduler.acquire(tenant_id, weight)
+        order.append(tenant_id)
+        scheduler.release(tenant_id)
+
+    expected = _queued(scheduler, tenant_id) + 1
+    thread = threading.Thread(target=worker)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while _queued(scheduler, tenant_id) < expected:
+        assert time.monotonic() < deadline, "request was never queued"
+        time.sleep(0.001)
+    return thread
+
+
+def test_heavier_tenant_gets_proportionally_more_slots():
+    scheduler = FairScheduler(capacity=1, max_queue_per_tenant=10, max_wait_s=5)
+    scheduler.acquire("hold", 1.0)
+    order = []
+    threads = [_enqueue(scheduler, "noisy", 1.0, order) for _ in range(4)]
+    threads += [_enqueue(scheduler, "premium", tenant_weight("HIGH"), order) for _ in range(4)]
+    scheduler.release("hold")
+    for thread in threads:
+        thread.join(timeout=5)
+    # Premium requests queued later still overtake the noisy tenant's backlog.
+    assert order[:5] == ["premium", "premium", "premium", "noisy", "premium"]
+    tenants = scheduler.snapshot()["tenants"]
+    assert tenants["premium"]["admitted"] == 4
+    assert tenants["noisy"]["p99_wait_ms"] > tenants["premium"]["ewma_wait_ms"]
+
+
+def test_tenant_queue_depth_is_capped_and_waits_time_out():
+    scheduler = FairScheduler(capacity=1, max_queue_per_tenant=0, max_wait_s=0.05)
+    scheduler.acquire("a")
+    with pytest.raises(FairQueueRejected) as exc:
+        scheduler.acquire("b")
+    assert exc.value.reason == "tenant_queue_full"
+
+    scheduler = FairScheduler(capacity=1, max_queue_per_tenant=2, max_wait_s=0.05)
+    scheduler.acquire("a")
+    with pytest.raises(FairQueueRejected) as exc:
+        scheduler.acquire("b")
+    assert exc.value.reason == "timeout"
+    scheduler.release("a")
+    assert scheduler.acquire("b") < 0.05
+    assert scheduler.snapshot()["tenants"]["b"]["rejected"] == 1
+
+
+def test_timed_out_requests_give_their_share_back():
+    scheduler = FairScheduler(capacity=1, max_queue_per_tenant=10, max_wait_s=5)
+    scheduler.acquire("hold")
+    for _ in range(3):
+        with pytest.raises(FairQueueRejected):
+            scheduler.acquire("a", timeout_s=0.01)
+    order = []
+    threads = [_enqueue(scheduler, tenant, 1.0, order) for tenant in ("b", "b", "a")]
+    scheduler.release("hold")
+    for thread in threads:
+        thread.join(timeout=5)
+    # Had the timeouts been charged, "a" would queue behind both of b's requests.
+    assert order == ["b", "a", "b"]
@@ -0,0 +1,67 @@
+import importlib
+from types import SimpleNamespace
+
+# `providers.gemini_adapter` the attribute is the provider instance.
+gemini = importlib.import_module("providers.gemini_adapter")
+
+
+class _Stream:
+    def __init__(self, chunks):
+        self._chunks = chunks
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for chunk in self._chunks:
+            yield chunk
+
+
+class _Chunk:
+    def __init__(self, text=None, usage=None):
+        self._text = text
+        self.usage_metadata = usage
+
+    @property
+    def text(self):
+        if self._text is None:
+            raise ValueError("no parts")
+        return self._text
+
+
+class _FakeGenAI:
+    def __init__(self):
+        self.models_built = []
+
+    def configure(self, api_key):
+        pass
+
+    def GenerativeModel(self, model):
+        self.models_built.append(model)
+
+        async def generate_content_async(text, **kwargs):
+            assert kwargs["stream"] is True
+            return _Stream([
+                _Chunk("Hello, "),
+                _Chunk("world"),
+                _Chunk(None, SimpleNamespace(prompt_token_count=12, candidates_token_count=4)),
+            ])
+
+        return SimpleNamespace(generate_content_async=generate_content_async)
+
+
+def test_streamed_execute_reuses_model_handle_and_reports_usage(monkeypatch):
+    fake = _FakeGenAI()
+    monkeypatch.setattr(gemini, "genai", fake)
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+    provider = gemini.GeminiProvider()
+    plan = provider.plan({}, "gemini-1.5-flash")
+
+    first = provider.execute(plan, "hi")
+    provider.execute(plan, "hi again")
+
+    assert fake.models_built == ["gemini-1.5-flash"]
+    assert first["output"] == "Hello, world"
+    assert (first["prompt_tokens"], first["completion_tokens"]) == (12, 4)
+    assert first["cost_usd"] == gemini._estimate_cost("gemini-1.5-flash", 12, 4)
+    assert first["provenance"]["mode"] == "generate_content"
@@ -0,0 +1,172 @@
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select, update
+
+import run_pipeline
+from db import jobs_repo
+from db.models import RouterRun, RunJob
+from jobs import webhook
+from jobs.worker import JobWorkerPool
+from models.tenant import Tenant
+from providers.registry import ProviderRegistry
+from ratelimit import InMemoryRateLimiter, RateLimitConfig
+
+
+def _resolver(*addresses):
+    def resolve(host, port, proto=0):
+        return [(socket.AF_INET6 if ":" in a else socket.AF_INET, socket.SOCK_STREAM, proto, "", (a, port)) for a in addresses]
+
+    return resolve
+
+
+@pytest.mark.parametrize(
+    "url, addresses, reason",
+    [
+        ("http://hooks.example.com/x", ["93.184.216.34"], "https"),
+        ("https://hooks.example.com/x", ["127.0.0.1"], "non-public"),
+        ("https://hooks.example.com/x", ["93.184.216.34", "10.0.0.7"], "non-public"),
+        ("https://metadata.internal/x", ["169.254.169.254"], "non-public"),
+        ("https://hooks.example.com/x", ["::ffff:192.168.1.1"], "non-public"),
+        ("https://hooks.example.com/x", ["fe80::1"], "non-public"),
+    ],
+)
+def test_callback_urls_to_internal_addresses_are_rejected(url, addresses, reason):
+    with pytest.raises(webhook.UnsafeCallbackURL, match=reason):
+        webhook.check_callback_url(url, allowed_hosts=(), allow_insecure=False, resolve=_resolver(*addresses))
+
+
+def test_public_https_callbacks_and_allow_list():
+    public = _resolver("93.184.216.34", "2606:2800:220:1:248:1893:25c8:1946")
+    webhook.check_callback_url("https://hooks.example.com/x", allowed_hosts=(), allow_insecure=False, resolve=public)
+    allowed = (".example.com",)
+    webhook.check_callback_url("https://a.example.com/x", allowed_hosts=allowed, allow_insecure=False, resolve=public)
+    with pytest.raises(webhook.UnsafeCallbackURL, match="allow-list"):
+        webhook.check_callback_url("https://evil.io/x", allowed_hosts=allowed, allow_insecure=False, resolve=public)
+
+
+def test_retry_schedule_follows_status_and_retry_after():
+    pool = JobWorkerPool(retry_base_s=5.0)
+    assert pool.retry_in_s(HTTPException(status_code=400), 0) is None
+    assert pool.retry_in_s(HTTPException(status_code=402), 0) is None
+    assert pool.retry_in_s(HTTPException(status_code=429, headers={"Retry-After": "7"}), 3) == 7.0
+    assert pool.retry_in_s(HTTPException(status_code=503), 2) == 20.0
+    assert pool.retry_in_s(HTTPException(status_code=503), 10) == 300.0
+
+
+def test_webhook_is_signed_and_retried_on_server_errors(monkeypatch):
+    sent = []
+    codes = iter([502, 200])
+
+    class _Resp:
+        def __init__(self, code):
+            self.status_code = code
+
+    def fake_post(url, data, headers, timeout, allow_redirects):
+        assert allow_redirects is False
+        sent.append(headers)
+        return _Resp(next(codes))
+
+    monkeypatch.setattr(webhook, "check_callback_url", lambda url: None)
+    monkeypatch.setattr(webhook.requests, "post", fake_post)
+    outcome = webhook.deliver_webhook("https://example.com/hook", {"id": "j1"}, secret="s3cret", sleep=lambda s: None)
+    assert outcome == "delivered"
+    assert len(sent) == 2
+    assert sent[0]["X-AgenticLabs-Signature"] == webhook.sign(b'{"id": "j1"}', "s3cret")
+
+    monkeypatch.setattr(webhook.requests, "post", lambda *a, **k: _Resp(404))
+    assert webhook.deliver_webhook("https://example.com/hook", {}, secret=None, sleep=lambda s: None) == "http_404"
+
+    def rebound(url):
+        raise webhook.UnsafeCallbackURL("callback_url resolves to a non-public address")
+
+    monkeypatch.setattr(webhook, "check_callback_url", rebound)
+    assert webhook.deliver_webhook("https://example.com/hook", {}, secret=None, sleep=lambda s: None) == "blocked"
+
+
+TENANT_ID = uuid.UUID("00000000-0000-0000-0000-00000000a0b5")
+
+
+@pytest.fixture
+def job_env(sqlite_sessions, monkeypatch):
+    Session = sqlite_sessions
+    with Session() as db:
+        db.add(Tenant(id=TENANT_ID, name="Jobs", slug="jobs", allowed_providers=["openai"], credit_limit_usd=100))
+        db.commit()
+    stubbed = ProviderRegistry({name: "providers.stub" for name in ("openai", "anthropic", "gemini", "ollama")})
+    monkeypatch.setattr(run_pipeline, "PROVIDERS", stubbed)
+    monkeypatch.setattr(run_pipeline, "rate_limiter", InMemoryRateLimiter(RateLimitConfig(burst=20, refill_per_s=2.0)))
+    return Session
+
+
+def _runs(Session):
+    with Session() as db:
+        return db.scalar(select(func.count()).select_from(RouterRun))
+
+
+def test_stale_lease_uses_an_attempt_and_fails_at_the_limit(job_env):
+    with job_env() as db:
+        job = jobs_repo.enqueue_job(db, tenant_id=str(TENANT_ID), payload={"prompt": "hi"})
+        job_id = job.id
+        for expected in ("queued", "queued", "failed"):
+            claimed = jobs_repo.claim_jobs(db, "dead-worker")
+            assert [j.id for j in claimed] == [job_id]
+            # The worker dies mid-run; its lease has long expired.
+            db.execute(update(RunJob).values(started_at=datetime.now(timezone.utc) - timedelta(hours=1)))
+            db.commit()
+            jobs_repo.requeue_stale(db, lease_s=60, max_attempts=3)
+            db.refresh(job)
+            assert job.status == expected
+        assert job.attempts == 3
+        assert job.error["detail"] == "Worker lease expired"
+
+
+def test_result_is_recorded_only_by_the_worker_holding_the_job(job_env):
+    pool = JobWorkerPool(session_factory=job_env)
+    with job_env() as db:
+        job_id = jobs_repo.enqueue_job(db, tenant_id=str(TENANT_ID), payload={"prompt": "hi"}).id
+        [job] = jobs_repo.claim_jobs(db, "slow-worker")
+        # The lease expired and another worker picked the job up meanwhile.
+        db.execute(update(RunJob).values(locked_by="other-worker"))
+        db.commit()
+        pool._process(db, job, "slow-worker")
+    assert _runs(job_env) == 0
+    with job_env() as db:
+        job = db.get(RunJob, job_id)
+        assert (job.status, job.locked_by) == ("running", "other-worker")
+
+    with job_env() as db:
+        pool._process(db, db.get(RunJob, job_id), "other-worker")
+    assert _runs(job_env) == 1
+    with job_env() as db:
+        job = db.get(RunJob, job_id)
+        assert job.status == "succeeded"
+        assert job.run_id is not None
+
+
+def test_failure_to_record_requeues_without_a_partial_write(job_env, monkeypatch):
+    def broken_persist(db, tenant, finalized):
+        run_pipeline.log_runs_bulk(db, [item.run_row for item in finalized], commit=False)
+        raise RuntimeError("connection reset")
+
+    monkeypatch.setattr(run_pipeline, "persist_runs", broken_persist)
+    pool = JobWorkerPool(session_factory=job_env)
+    with job_env() as db:
+        job_id = jobs_repo.enqueue_job(db, tenant_id=str(TENANT_ID), payload={"prompt": "hi"}).id
+    assert pool.run_once("worker")
+    assert _runs(job_env) == 0
+    with job_env() as db:
+        job = db.get(RunJob, job_id)
+        assert (job.status, job.attempts, job.run_id) == ("queued", 1, None)
+
+
+def test_unknown_router_mode_falls_back_like_a_direct_run(job_env):
+    pool = JobWorkerPool(session_factory=job_env)
+    with job_env() as db:
+        job_id = jobs_repo.enqueue_job(db, tenant_id=str(TENANT_ID), payload={"prompt": "hi"}, router_mode="foo").id
+    assert pool.run_once("worker")
+    with job_env() as db:
+        assert db.get(RunJob, job_id).status == "succeeded"
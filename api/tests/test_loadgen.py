@@ -0,0 +1,75 @@
+import asyncio
+import json
+import random
+
+import httpx
+
+from loadgen import LatencyHistogram, Recorder, Workload, build_report, closed_loop
+
+
+def test_histogram_percentiles_within_relative_error():
+    hist = LatencyHistogram(precision_bits=7)
+    values = list(range(1, 100_001))
+    random.Random(3).shuffle(values)
+    for v in values:
+        hist.record(v)
+    for p in (50, 90, 99, 99.9):
+        exact = int(p / 100 * 100_000)
+        assert abs(hist.percentile(p) - exact) / exact <= 1 / 128
+    assert hist.percentile(100) == hist.max == 100_000
+    assert hist.summary()["count"] == 100_000
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    body = json.loads(request.content)
+    if request.headers["X-Agentic-Tenant-Id"] == "noisy":
+        return httpx.Response(429, json={"detail": "Too many requests"})
+    if "items" in body:
+        lines = [
+            {"index": 0, "status": "ok", "result": {"metrics": {"cost_usd": 0.5}, "provenance": {"provider": "stub"}}},
+            {"index": 1, "status": "error", "status_code": 402, "detail": "Credit limit exceeded"},
+            {"status": "summary", "items": 2},
+        ]
+        return httpx.Response(200, content="".join(json.dumps(line) + "\n" for line in lines))
+    return httpx.Response(200, json={"metrics": {"cost_usd": 0.25}, "provenance": {"provider": "stub", "model": "m"}})
+
+
+def _run(workload: Workload, requests: int) -> dict:
+    recorder = Recorder(interval_s=1.0)
+
+    async def go():
+        async with httpx.AsyncClient(base_url="http://router", transport=httpx.MockTransport(_handler)) as client:
+            await closed_loop(
+                client, workload, recorder,
+                concurrency=4, ramp_s=0, duration_s=10, max_requests=requests, seed=1,
+            )
+
+    asyncio.run(go())
+    return build_report(recorder, 1.0, 1.0)
+
+
+def test_closed_loop_reports_cost_errors_and_tenant_mix():
+    workload = Workload(
+        tenants=[("acme", 1.0), ("noisy", 1.0)],
+        categories=[("general", 1.0)],
+        prompts={"general": ["hello"]},
+    )
+    report = _run(workload, 40)
+    assert report["requests"] == 40
+    ok = report["by_tenant"]["acme"]["requests"]
+    assert report["statuses"] == {"200": ok, "429": 40 - ok}
+    assert report["by_tenant"]["noisy"]["error_rate"] == 1.0
+    assert report["cost_usd"]["total"] == ok * 0.25
+
+
+def test_batch_endpoint_counts_items_from_ndjson_stream():
+    workload = Workload(
+        tenants=[("acme", 1.0)],
+        categories=[("general", 1.0)],
+        prompts={"general": ["hello"]},
+        endpoint="batch",
+        batch_size=2,
+    )
+    report = _run(workload, 3)
+    assert report["runs_per_s"] == 3.0  # one of the two items failed in each batch
+    assert report["cost_usd"] == {"total": 1.5, "per_run": 0.5}
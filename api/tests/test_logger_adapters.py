@@ -0,0 +1,120 @@
+import io
+import json
+import threading
+
+from adapters.logger.postgres_logger import INSERT_SQL, PostgresLogger
+from adapters.logger.stdout_logger import StdoutLogger
+
+
+class _BlockingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def write(self, text):
+        self.release.wait(5.0)
+        return super().write(text)
+
+
+def test_stdout_logger_writes_full_batches_off_the_calling_thread():
+    stream = _BlockingStream()
+    logger = StdoutLogger(stream, batch_size=2, flush_interval_s=5.0)
+    payload = {"run_id": "r_1", "tags": ["a"]}
+    for _ in range(4):
+        # Returns although the stream is stuck: the write happens elsewhere.
+        logger.log("router_in", payload)
+    payload["tags"].append("mutated")
+    stream.release.set()
+    logger.close()
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert len(events) == 4
+    assert all(event["tags"] == ["a"] for event in events)
+
+
+def test_stdout_logger_counts_write_errors():
+    class _Broken(io.StringIO):
+        def write(self, text):
+            raise OSError("broken pipe")
+
+    logger = StdoutLogger(_Broken(), batch_size=2)
+    logger.log("router_in", {})
+    logger.log("router_in", {})
+    logger.flush()
+    assert logger.failed == 2
+
+
+class _Cursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def executemany(self, sql, rows):
+        if self.conn.fail_inserts:
+            raise RuntimeError("relation does not exist")
+        self.conn.pending.extend(rows)
+
+
+class _Connection:
+    def __init__(self, log, fail_inserts=False):
+        self.log = log
+        self.fail_inserts = fail_inserts
+        self.pending = []
+        self.closed = False
+
+    def cursor(self):
+        return _Cursor(self)
+
+    def commit(self):
+        self.log.extend(self.pending)
+        self.pending = []
+
+    def rollback(self):
+        raise RuntimeError("connection already closed")
+
+    def close(self):
+        self.closed = True
+
+
+def test_postgres_logger_batches_inserts_in_the_background():
+    written = []
+    logger = PostgresLogger(lambda: _Connection(written), batch_size=3, flush_interval_s=5.0)
+    for i in range(5):
+        logger.log("router_out", {"i": i})
+    logger.close()
+    assert [json.loads(row[2])["i"] for row in written] == [0, 1, 2, 3, 4]
+    assert {row[1] for row in written} == {"router_out"}
+    assert INSERT_SQL.startswith("INSERT INTO event_log")
+
+
+def test_postgres_logger_targets_the_event_log_table():
+    from db.models import EventLog
+
+    columns = INSERT_SQL.split("(", 1)[1].split(")", 1)[0]
+    assert EventLog.__tablename__ == "event_log"
+    assert {name.strip() for name in columns.split(",")} <= set(EventLog.__table__.c.keys())
+
+
+def test_postgres_logger_survives_connect_insert_and_rollback_failures():
+    written = []
+    attempts = iter([ConnectionError("db down"), _Connection(written, fail_inserts=True), _Connection(written)])
+
+    def connect():
+        conn = next(attempts)
+        if isinstance(conn, Exception):
+            raise conn
+        return conn
+
+    logger = PostgresLogger(connect, batch_size=1, flush_interval_s=5.0)
+    for i in range(3):
+        logger.log("router_out", {"i": i})
+        logger.flush()
+    logger.close()
+    # The failed connect and the failed insert (whose rollback also raised)
+    # each lose their batch; the third reconnects and succeeds.
+    assert logger.failed == 2
+    assert [json.loads(row[2])["i"] for row in written] == [2]
@@ -0,0 +1,152 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from providers import ollama_adapter
+from providers.errors import ProviderError
+from providers.ollama_sessions import SessionContextStore
+
+
+class _Handler(BaseHTTPRequestHandler):
+    requests_seen = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.requests_seen.append(body)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        if "prompt" not in body:
+            self.wfile.write(b'{"done": true}\n')
+            return
+        slow = body["prompt"] == "slow"
+        for word in ("Hello", " there") * (4 if slow else 1):
+            self.wfile.write(json.dumps({"response": word, "done": False}).encode() + b"\n")
+            self.wfile.flush()
+            if slow:
+                time.sleep(0.1)
+        context = body.get("context", []) + [len(self.requests_seen)] * 3
+        final = {
+            "response": "",
+            "done": True,
+            "prompt_eval_count": 26,
+            "eval_count": 2,
+            "load_duration": 3_000_000,
+            "context": context,
+        }
+        self.wfile.write(json.dumps(final).encode() + b"\n")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def ollama_server(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(ollama_adapter, "OLLAMA_BASE", f"http://127.0.0.1:{server.server_port}")
+    _Handler.requests_seen = []
+    yield _Handler.requests_seen
+    server.shutdown()
+
+
+def test_execute_streams_and_reports_real_eval_counts(ollama_server):
+    result = ollama_adapter.execute(ollama_adapter.plan({"prompt": "hi"}, "qwen2:7b-instruct"), "hi")
+    assert result["output"] == "Hello there"
+    assert (result["prompt_tokens"], result["completion_tokens"]) == (26, 2)
+    assert result["provenance"]["parameters"]["load_ms"] == 3
+    sent = ollama_server[0]
+    assert sent["stream"] is True and sent["keep_alive"] == ollama_adapter._keep_alive()
+
+
+def test_preload_sends_empty_generate_per_model(ollama_server):
+    assert ollama_adapter.preload(["a", "b", "a"]) == {"a": True, "b": True}
+    assert [body["model"] for body in ollama_server] == ["a", "b"]
+    assert "qwen2:7b-instruct" in ollama_adapter.routed_models()
+
+
+def test_session_turns_send_back_previous_context(ollama_server, monkeypatch):
+    monkeypatch.setattr(ollama_adapter, "session_contexts", SessionContextStore())
+    req = {"prompt": "hi", "tenant_id": "t1", "agent_id": "a1", "session_id": "s1"}
+    first = ollama_adapter.execute(ollama_adapter.plan(req, "m"), "hi")
+    second = ollama_adapter.execute(ollama_adapter.plan(req, "m"), "again")
+    other_tenant = ollama_adapter.execute(ollama_adapter.plan({**req, "tenant_id": "t2"}, "m"), "hi")
+
+    assert "context" not in ollama_server[0]
+    assert ollama_server[1]["context"] == [1, 1, 1]
+    assert "context" not in ollama_server[2]
+    assert first["provenance"]["parameters"]["session_context_tokens"] == 0
+    assert second["provenance"]["parameters"]["session_context_tokens"] == 3
+    assert other_tenant["provenance"]["parameters"]["session_context_tokens"] == 0
+
+
+def test_session_store_evicts_lru_and_expires_idle_sessions():
+    now = [0.0]
+    store = SessionContextStore(max_sessions=2, max_total_tokens=5, ttl_s=10, clock=lambda: now[0])
+    store.put(("t", "a", "1"), "m", [1, 2])
+    store.put(("t", "a", "2"), "m", [3])
+    assert store.get(("t", "a", "1"), "m") == [1, 2]
+    store.put(("t", "a", "3"), "m", [4])
+    assert store.get(("t", "a", "2"), "m") is None
+    assert store.get(("t", "a", "1"), "other-model") is None
+    store.put(("t", "a", "4"), "m", [5, 6, 7, 8])
+    assert store.snapshot()["total_tokens"] <= 5
+    now[0] = 11
+    assert store.get(("t", "a", "4"), "m") is None
+
+
+def test_generation_is_cut_off_at_the_attempt_budget(ollama_server):
+    # Chunks keep arriving well inside the read timeout; the total is what runs over.
+    plan = {**ollama_adapter.plan({"prompt": "slow"}, "m"), "timeout_s": 0.25}
+    started = time.perf_counter()
+    with pytest.raises(ProviderError, match="exceeded"):
+        ollama_adapter.execute(plan, "slow")
+    assert time.perf_counter() - started < 1.0
+
+
+def test_max_tokens_is_sent_as_num_predict(ollama_server):
+    ollama_adapter.execute(ollama_adapter.plan({"prompt": "hi", "max_tokens": 64}, "m"), "hi")
+    ollama_adapter.execute(ollama_adapter.plan({"prompt": "hi"}, "m"), "hi")
+    assert ollama_server[0]["options"] == {"num_predict": 64}
+    assert "options" not in ollama_server[1]
+
+
+def test_session_context_survives_retryable_errors_and_reports_resets(ollama_server, monkeypatch):
+    store = SessionContextStore(max_sessions=1)
+    monkeypatch.setattr(ollama_adapter, "session_contexts", store)
+    req = {"prompt": "hi", "tenant_id": "t1", "agent_id": "a1", "session_id": "s1"}
+    first = ollama_adapter.execute(ollama_adapter.plan(req, "m"), "hi")
+    assert first["session_context_reset"] is False
+
+    # A timed-out attempt leaves the context for the retry.
+    with pytest.raises(ProviderError):
+        ollama_adapter.execute({**ollama_adapter.plan(req, "m"), "timeout_s": 0.05}, "slow")
+    retried = ollama_adapter.execute(ollama_adapter.plan(req, "m"), "again")
+    assert retried["provenance"]["parameters"]["session_context_tokens"] == 3
+    assert retried["session_context_reset"] is False
+
+    # Another session evicts this one; its next turn says it started over.
+    ollama_adapter.execute(ollama_adapter.plan({**req, "session_id": "s2"}, "m"), "hi")
+    evicted = ollama_adapter.execute(ollama_adapter.plan(req, "m"), "hi")
+    assert (evicted["session_context_reset"], evicted["session_context_reset_reason"]) == (True, "evicted")
+    assert "session_context_reset" not in ollama_adapter.execute(ollama_adapter.plan({"prompt": "hi"}, "m"), "hi")
+
+
+def test_session_store_reports_why_a_context_was_lost():
+    now = [0.0]
+    store = SessionContextStore(ttl_s=10, clock=lambda: now[0])
+    key = ("t", "a", "1")
+    assert store.lookup(key, "m") == (None, None)
+    store.put(key, "m", [1])
+    store.discard(key)
+    assert store.lookup(key, "m") == (None, "error")
+    assert store.lookup(key, "m") == (None, None)
+    store.put(key, "m", [1])
+    assert store.lookup(key, "other") == (None, "model_changed")
+    store.put(key, "m", [1])
+    now[0] = 11
+    assert store.lookup(key, "m") == (None, "expired")
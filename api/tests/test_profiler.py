@@ -0,0 +1,49 @@
+import threading
+import time
+
+import pytest
+
+from tracing import ProfilerBusy, SamplingProfiler, StageTimer, use_timer
+from tracing import profiler as profiler_module
+
+
+def _busy(stop):
+    timer = StageTimer(run_id="r_test")
+    with use_timer(timer):
+        while not stop.is_set():
+            with timer.stage("scoring"):
+                sum(i * i for i in range(2000))
+
+
+def test_profile_samples_other_threads_with_stage_and_run_tags():
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy, args=(stop,), name="busy-worker")
+    worker.start()
+    try:
+        profile = SamplingProfiler(interval_s=0.002, tags="run").run(0.3)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert profile.samples > 10
+    busy = [stack for stack in profile.stacks if stack[0] == "thread:busy-worker"]
+    assert busy
+    assert any(stack[1:3] == ("run:r_test", "stage:scoring") for stack in busy)
+    assert "_busy (" in profile.collapsed()
+    assert profile.summary()["top_total"]
+    assert not profiler_module.profiling_active() and not profiler_module._thread_tags
+
+
+def test_only_one_profile_per_process():
+    results = []
+    runner = threading.Thread(target=lambda: results.append(SamplingProfiler().run(0.3)))
+    runner.start()
+    time.sleep(0.05)
+    with pytest.raises(ProfilerBusy):
+        SamplingProfiler().run(0.1)
+    runner.join()
+    assert results
+
+
+def test_tags_cost_nothing_when_idle():
+    assert profiler_module.push_tag("r", "scoring") is None
@@ -0,0 +1,60 @@
+import sys
+
+import import_budget
+from providers import PROVIDERS
+from providers.registry import ProviderRegistry
+
+
+def test_registry_imports_on_first_lookup():
+    registry = ProviderRegistry({"stub": "providers.stub", "anthropic": "providers.anthropic_adapter:anthropic_adapter"})
+    assert "stub" in registry and list(registry) == ["stub", "anthropic"]
+    assert registry.snapshot()["stub"] == {"state": "not_loaded"}
+
+    stub = registry["stub"]
+    assert stub is sys.modules["providers.stub"]
+    assert registry.get("stub") is stub
+    assert registry.snapshot()["stub"]["state"] == "loaded"
+    assert registry["anthropic"] is sys.modules["providers.anthropic_adapter"].anthropic_adapter
+    assert set(registry.loaded()) == {"stub", "anthropic"}
+
+
+def test_registry_treats_failed_import_as_unregistered():
+    registry = ProviderRegistry({"stub": "providers.stub", "missing": "providers.no_such_adapter"})
+    assert "missing" in registry
+    assert registry.get("missing") is None
+    assert "missing" not in registry
+    assert list(registry) == ["stub"] and len(registry) == 1
+    assert registry.snapshot()["missing"]["state"] == "failed"
+    assert registry.load() == {"stub": None, "missing": registry.snapshot()["missing"]["error"]}
+
+    registry.register("missing", "providers.stub")
+    assert registry["missing"] is registry["stub"]
+
+
+def test_default_registry_knows_every_provider():
+    assert set(PROVIDERS) >= {"openai", "anthropic", "gemini", "ollama", "stub"}
+
+
+def test_parse_importtime_output():
+    stderr = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 |   json.decoder",
+            "import time:      2000 |       2120 | json",
+            "import time:       500 |        500 |     anthropic._client",
+            "import time:      1000 |       4000 | main",
+        ]
+    )
+    profile = import_budget.ImportProfile.parse("main", stderr)
+    assert profile.total_ms == 4.0
+    assert profile.slowest(1)[0].module == "json"
+    assert profile.imported("anthropic") and not profile.imported("google.generativeai")
+    assert import_budget.check(profile, budget_ms=3.0) == [
+        "anthropic imported eagerly",
+        "import main took 4ms (budget 3ms)",
+    ]
+
+
+def test_main_does_not_import_provider_sdks():
+    profile = import_budget.measure("main")
+    assert import_budget.check(profile, budget_ms=None) == []
@@ -0,0 +1,65 @@
+from ratelimit.limiter import InMemoryRateLimiter, RateLimitConfig, utc_day
+
+
+def test_burst_bucket_rejects_then_refills(clock):
+    limiter = InMemoryRateLimiter(RateLimitConfig(burst=2, refill_per_s=1.0), clock=clock)
+    assert limiter.acquire("t1", 100).allowed
+    assert limiter.acquire("t1", 100).allowed
+    rejected = limiter.acquire("t1", 100)
+    assert not rejected.allowed
+    assert rejected.reason == "burst"
+    assert 0 < rejected.retry_after_s <= 1.0
+    assert limiter.acquire("t2", 100).allowed
+    clock.now += 1.0
+    assert limiter.acquire("t1", 100).allowed
+
+
+def test_daily_limit_retries_after_utc_midnight_and_resets(clock):
+    limiter = InMemoryRateLimiter(RateLimitConfig(burst=10, refill_per_s=10), clock=clock)
+    assert limiter.acquire("t1", 2).remaining_today == 1
+    assert limiter.acquire("t1", 2).remaining_today == 0
+    rejected = limiter.acquire("t1", 2)
+    assert rejected.reason == "daily_limit"
+    assert rejected.retry_after_s == 86_400 - (clock.now % 86_400)
+    clock.now += rejected.retry_after_s
+    assert limiter.acquire("t1", 2).allowed
+
+
+def test_durable_totals_include_other_workers_and_pending_survives(clock):
+    limiter = InMemoryRateLimiter(RateLimitConfig(burst=10, refill_per_s=10), clock=clock)
+    day = utc_day(clock.now)
+    assert limiter.acquire("t1", 5).allowed
+    drained = limiter.drain_pending()
+    assert drained == {("t1", day): 1}
+    assert limiter.acquire("t1", 5).allowed
+    # Durable table saw our first request plus three from another worker.
+    limiter.observe_durable("t1", day, 4)
+    assert limiter.acquire("t1", 5).reason == "daily_limit"
+    limiter.restore_pending(drained)
+    assert limiter.drain_pending() == {("t1", day): 2}
+
+
+def test_batch_admission_takes_count_units_once(clock):
+    limiter = InMemoryRateLimiter(RateLimitConfig(burst=20, refill_per_s=2.0), clock=clock)
+    # Larger than the burst: drains the bucket but still fits.
+    decision = limiter.acquire("t1", 1000, count=100)
+    assert decision.allowed and decision.remaining_today == 900
+    assert not limiter.acquire("t1", 1000).allowed
+    assert limiter.drain_pending() == {("t1", utc_day(clock.now)): 100}
+
+    clock.now += 10.0
+    rejected = limiter.acquire("t1", 1000, count=950)
+    assert rejected.reason == "daily_limit" and rejected.remaining_today == 900
+    assert limiter.acquire("t1", 1000, count=5).allowed
+
+
+def test_unusable_redis_backend_falls_back_to_memory(monkeypatch):
+    import ratelimit
+    from ratelimit import redis_backend
+
+    def malformed(url, config):
+        raise ValueError("Redis URL must specify one of the following schemes")
+
+    monkeypatch.setenv("AGENTICLABS_RATE_LIMIT_BACKEND", "redis")
+    monkeypatch.setattr(redis_backend, "RedisRateLimiter", malformed)
+    assert type(ratelimit.build_rate_limiter()) is InMemoryRateLimiter
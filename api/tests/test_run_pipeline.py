@@ -0,0 +1,160 @@
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+import run_pipeline
+from config.router import RouterMode
+from cost.calculator import calculate_cost
+from models.tenant import (
+    AutonomyLevel,
+    CostMode,
+    DataSensitivity,
+    GovernanceMode,
+    Tenant,
+    TenantBand,
+    TenantRegion,
+    TenantStatus,
+)
+from providers.executor import ExecutionOutcome
+from providers.registry import ProviderRegistry
+from ratelimit import InMemoryRateLimiter, RateLimitConfig
+from run_pipeline import score_prompts
+from shared.models import RunRequest
+
+
+def test_score_prompts_scores_each_distinct_prompt_once(monkeypatch):
+    calls = []
+    original = run_pipeline.score_complexity
+
+    def counting(prompt):
+        calls.append(prompt)
+        return original(prompt)
+
+    monkeypatch.setattr(run_pipeline, "score_complexity", counting)
+    prompts = ["summarize this", "write a python function", "summarize this"]
+    scores = score_prompts(prompts)
+    assert len(scores) == 3
+    assert scores[0] is scores[2]
+    assert sorted(calls) == ["summarize this", "write a python function"]
+
+
+def _tenant(**overrides):
+    fields = dict(
+        id=uuid.uuid4(),
+        name="Routing",
+        slug="routing",
+        region=TenantRegion.US,
+        governance_mode=GovernanceMode.STANDARD,
+        cost_mode=CostMode.BALANCED,
+        allowed_providers=["openai", "anthropic"],
+        max_band=TenantBand.PREMIUM,
+        default_data_sensitivity=DataSensitivity.PUBLIC,
+        default_autonomy_level=AutonomyLevel.ANSWER_ONLY,
+        credit_limit_usd=100,
+        usage_usd=0,
+        max_daily_requests=1000,
+        max_tokens_per_request=4000,
+        status=TenantStatus.ACTIVE,
+    )
+    fields.update(overrides)
+    return Tenant(**fields)
+
+
+@pytest.fixture
+def routing(monkeypatch):
+    stubbed = ProviderRegistry({name: "providers.stub" for name in ("openai", "anthropic", "gemini", "ollama")})
+    monkeypatch.setattr(run_pipeline, "PROVIDERS", stubbed)
+    monkeypatch.setattr(run_pipeline, "rate_limiter", InMemoryRateLimiter(RateLimitConfig(burst=100, refill_per_s=10.0)))
+
+
+def test_forced_provider_limits_enhanced_pick_and_failover_chain(routing):
+    prepared = run_pipeline.prepare_run(
+        RunRequest(prompt="Write a python function that merges two sorted lists", force_provider="Anthropic"),
+        _tenant(),
+        RouterMode.ENHANCED,
+    )
+    assert prepared.provider_name == "anthropic"
+    assert {provider for provider, _ in prepared.candidates} == {"anthropic"}
+
+
+def test_forced_model_outside_the_allow_list_is_refused(routing):
+    with pytest.raises(HTTPException) as excinfo:
+        run_pipeline.prepare_run(
+            RunRequest(prompt="hello", force_provider="openai", force_model="gpt-unlisted"),
+            _tenant(),
+            RouterMode.ENHANCED,
+        )
+    assert excinfo.value.status_code == 403
+
+
+def test_credit_is_checked_against_the_most_expensive_candidate(routing):
+    tenant = _tenant()
+    prepared = run_pipeline.prepare_run(RunRequest(prompt="Explain the tradeoffs of B-trees"), tenant, RouterMode.ENHANCED)
+    assert len(prepared.candidates) > 1
+    costs = [
+        calculate_cost(
+            model_key=f"{provider}:{model}",
+            provider=provider,
+            model=model,
+            input_tokens=run_pipeline.estimate_prompt_tokens("Explain the tradeoffs of B-trees"),
+            output_tokens=run_pipeline.DEFAULT_MAX_OUTPUT_TOKENS,
+        )
+        for provider, model in prepared.candidates
+    ]
+    assert prepared.estimated_upper_cost == pytest.approx(max(costs))
+
+
+def test_session_turn_failed_over_from_ollama_reports_context_reset(routing):
+    tenant = _tenant(allowed_providers=["ollama", "openai"])
+    payload = RunRequest(prompt="hello", session_id="s1", force_provider="ollama")
+    prepared = run_pipeline.prepare_run(payload, tenant, RouterMode.ENHANCED)
+    assert prepared.provider_name == "ollama"
+    stub_result = {"output": "hi", "confidence": 0.9, "latency_ms": 5, "prompt_tokens": 3, "completion_tokens": 1}
+    outcome = ExecutionOutcome(
+        provider="openai", model="gpt-4o-mini", plan={}, result=stub_result, failed_over=True
+    )
+    executed = run_pipeline.ExecutedRun(prepared, outcome, 0.0, 0.0, 0.01)
+    assert run_pipeline.finalize_run(executed, tenant).response.session_context_reset is True
+
+
+def test_refused_requests_do_not_use_up_the_rate_limit(routing, monkeypatch):
+    limiter = InMemoryRateLimiter(RateLimitConfig(burst=1, refill_per_s=0.0))
+    monkeypatch.setattr(run_pipeline, "rate_limiter", limiter)
+    tenant = _tenant(credit_limit_usd=0)
+    for _ in range(3):
+        with pytest.raises(HTTPException) as excinfo:
+            run_pipeline.prepare_run(RunRequest(prompt="hello"), tenant, RouterMode.ENHANCED)
+        assert excinfo.value.status_code == 402
+
+    tenant.credit_limit_usd = 100
+    run_pipeline.prepare_run(RunRequest(prompt="hello"), tenant, RouterMode.ENHANCED)
+    with pytest.raises(HTTPException) as excinfo:
+        run_pipeline.prepare_run(RunRequest(prompt="hello"), tenant, RouterMode.ENHANCED)
+    assert excinfo.value.status_code == 429
+
+
+def test_persist_runs_adds_usage_without_overwriting_other_writers(sqlite_sessions):
+    Session = sqlite_sessions
+    tenant_id = uuid.uuid4()
+    with Session() as db:
+        db.add(_tenant(id=tenant_id, usage_usd=1))
+        db.commit()
+
+    def finalized(cost):
+        row = dict(
+            tenant_id=str(tenant_id), run_id=f"r_{cost}", band="low", provider="openai", model="gpt-4.1-mini",
+            latency_ms=1.0, prompt_tokens=1, completion_tokens=1, cost_usd=cost, baseline_cost_usd=cost,
+        )
+        return run_pipeline.FinalizedRun(response=None, run_row=row, billed_usd=cost)
+
+    # Both writers loaded the tenant before either one committed.
+    first, second = Session(), Session()
+    stale_a, stale_b = first.get(Tenant, tenant_id), second.get(Tenant, tenant_id)
+    run_pipeline.persist_runs(first, stale_a, [finalized(2.0)])
+    run_pipeline.persist_runs(second, stale_b, [finalized(4.0)])
+    assert float(stale_b.usage_usd) == 7.0
+    first.close()
+    second.close()
+    with Session() as db:
+        assert float(db.get(Tenant, tenant_id).usage_usd) == 7.0
@@ -0,0 +1,41 @@
+from routing.categories import QueryCategory
+from routing.live_stats import LivePerformanceTable
+from routing.scoring import rank_enhanced_models
+
+KEYS = ["openai:gpt-4o-mini", "openai:gpt-4.1-mini", "gemini:gemini-2.0-flash"]
+
+
+def _rank(perf_table, **kwargs):
+    return [
+        model.key
+        for model in rank_enhanced_models(
+            category=QueryCategory.CODING,
+            allowed_model_keys=KEYS,
+            resolved_band="low",
+            perf_table=perf_table,
+            **kwargs,
+        )
+    ]
+
+
+def test_ranking_without_live_stats_matches_static_scores():
+    ranked = _rank(LivePerformanceTable())
+    assert ranked[0] == "openai:gpt-4.1-mini"
+
+
+def test_slow_model_is_deprioritized_by_live_latency():
+    table = LivePerformanceTable(min_samples=1)
+    for _ in range(3):
+        table.record_success("openai:gpt-4.1-mini", latency_ms=9000, completion_tokens=100)
+        table.record_success("openai:gpt-4o-mini", latency_ms=400, completion_tokens=100)
+        table.record_success("gemini:gemini-2.0-flash", latency_ms=500, completion_tokens=100)
+    assert _rank(table)[0] == "openai:gpt-4o-mini"
+    assert _rank(table, latency_weight=0.0)[0] == "openai:gpt-4.1-mini"
+
+
+def test_erroring_model_loses_latency_credit():
+    table = LivePerformanceTable(min_samples=1, alpha=1.0)
+    table.record_success("openai:gpt-4o-mini", latency_ms=400)
+    table.record_success("openai:gpt-4.1-mini", latency_ms=400)
+    table.record_failure("openai:gpt-4.1-mini", latency_ms=400)
+    assert _rank(table)[0] == "openai:gpt-4o-mini"
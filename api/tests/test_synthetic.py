@@ -0,0 +1,75 @@
+import json
+import random
+import threading
+
+import pytest
+import requests
+
+from mock_llm_server import MockLLMServer
+from providers import ollama_adapter, stub
+from providers.errors import ProviderError
+from providers.synthetic import SyntheticProfile
+
+
+def test_profile_parse_ignores_unknown_and_invalid_fields():
+    profile = SyntheticProfile.parse("distribution=bimodal,ttft_ms=50,output_tokens=7,bogus=1,sigma=x")
+    assert (profile.distribution, profile.ttft_ms, profile.output_tokens) == ("bimodal", 50.0, 7)
+    assert profile.sigma == SyntheticProfile().sigma
+    assert SyntheticProfile.parse("distribution=zipf").distribution == "fixed"
+
+
+def test_latency_distributions():
+    rng = random.Random(7)
+    lognormal = SyntheticProfile(distribution="lognormal", ttft_ms=100, sigma=0.5)
+    samples = sorted(lognormal.sample_ttft_s(rng) for _ in range(2001))
+    assert 0.08 < samples[1000] < 0.12
+    bimodal = SyntheticProfile(distribution="bimodal", ttft_ms=10, slow_ms=1000, slow_fraction=0.2)
+    slow = sum(bimodal.sample_ttft_s(rng) == 1.0 for _ in range(2000))
+    assert 300 < slow < 500
+
+
+def test_stub_plan_takes_model_name_and_injects_faults():
+    assert stub.plan({"prompt": "hi"}, model_name="stub-fast")["target"]["model"] == "stub-fast"
+    result = stub.execute(stub.plan({"prompt": "hi"}), "hi")
+    assert result["output"] == "Stub summary: hi"
+
+    stub.configure("stub-429", SyntheticProfile(ttft_ms=0, rate_limit_rate=1.0, retry_after_s=2))
+    try:
+        with pytest.raises(ProviderError) as exc:
+            stub.execute(stub.plan({"prompt": "hi"}, "stub-429"), "hi")
+        assert (exc.value.status_code, exc.value.retry_after, exc.value.retryable) == (429, 2, True)
+    finally:
+        stub.configure("stub-429", None)
+
+
+@pytest.fixture
+def mock_server():
+    server = MockLLMServer(("127.0.0.1", 0), SyntheticProfile(ttft_ms=0, output_tokens=5), seed=1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_mock_server_speaks_openai_streaming_and_ollama(mock_server, monkeypatch):
+    body = {"model": "gpt-4o-mini", "stream": True, "messages": [{"role": "user", "content": "hi"}]}
+    with requests.post(f"{mock_server}/v1/chat/completions", json=body, stream=True, timeout=5) as resp:
+        lines = [line for line in resp.iter_lines() if line]
+    assert lines[-1] == b"data: [DONE]"
+    text = "".join(json.loads(line[6:])["choices"][0]["delta"].get("content", "") for line in lines[:-1])
+    assert len(text.split()) == 5
+
+    monkeypatch.setattr(ollama_adapter, "OLLAMA_BASE", mock_server)
+    result = ollama_adapter.execute(ollama_adapter.plan({"prompt": "hello"}, "mock"), "hello")
+    assert len(result["output"].split()) == 5 and result["completion_tokens"] > 0
+
+
+def test_mock_server_injects_rate_limits_per_request(mock_server):
+    resp = requests.post(
+        f"{mock_server}/v1/messages",
+        json={"model": "claude", "messages": [{"role": "user", "content": "hi"}], "max_tokens": 10},
+        headers={"X-Mock-Profile": "rate_limit_rate=1,retry_after_s=3"},
+        timeout=5,
+    )
+    assert resp.status_code == 429 and resp.headers["Retry-After"] == "3"
+    assert resp.json()["error"]["type"] == "rate_limit_error"
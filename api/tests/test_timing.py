@@ -0,0 +1,40 @@
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from tracing import ServerTimingMiddleware, StageTimer, current_timer, stage
+
+
+def test_stage_timer_accumulates_and_formats_server_timing():
+    timer = StageTimer()
+    with timer.stage("execute"):
+        time.sleep(0.01)
+    timer.add("execute", 5)
+    timer.add("db write", 1.25)
+    assert timer.get("execute") >= 15
+    header = timer.server_timing(total_ms=30)
+    assert header.startswith("execute;dur=")
+    assert "db_write;dur=1.2" in header and header.endswith("total;dur=30.0")
+
+
+def test_stage_outside_a_request_is_a_no_op():
+    assert current_timer() is None
+    with stage("scoring"):
+        pass
+
+
+def test_middleware_reports_stages_from_sync_endpoints():
+    app = FastAPI()
+    app.add_middleware(ServerTimingMiddleware, enabled=True)
+
+    @app.get("/work")
+    def work():
+        with stage("routing"):
+            time.sleep(0.005)
+        return {"ok": True}
+
+    resp = TestClient(app).get("/work")
+    entries = dict(item.split(";dur=") for item in resp.headers["server-timing"].split(", "))
+    assert float(entries["routing"]) >= 5
+    assert float(entries["total"]) >= float(entries["routing"])
@@ -0,0 +1,43 @@
+from tracing import Tracer, inject_trace_headers, parse_traceparent
+
+
+class _CollectingExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+    def shutdown(self):
+        pass
+
+
+def test_parse_traceparent_rejects_malformed_headers():
+    assert parse_traceparent(None) is None
+    assert parse_traceparent("garbage") is None
+    assert parse_traceparent("00-" + "0" * 32 + "-" + "1" * 16 + "-01") is None
+    trace_id, span_id, sampled = parse_traceparent("00-" + "a" * 32 + "-" + "b" * 16 + "-01")
+    assert trace_id == "a" * 32
+    assert span_id == "b" * 16
+    assert sampled is True
+
+
+def test_child_span_continues_remote_trace_and_propagates_header():
+    tracer = Tracer(_CollectingExporter(), sample_rate=1.0)
+    remote = "00-" + "a" * 32 + "-" + "b" * 16 + "-01"
+    with tracer.start_span("root", traceparent=remote) as root:
+        with tracer.start_span("child") as child:
+            headers = inject_trace_headers()
+    assert root.trace_id == "a" * 32
+    assert root.parent_span_id == "b" * 16
+    assert child.parent_span_id == root.span_id
+    assert headers["traceparent"] == f"00-{'a' * 32}-{child.span_id}-01"
+
+
+def test_unsampled_root_still_issues_trace_id():
+    tracer = Tracer(_CollectingExporter(), sample_rate=0.0)
+    with tracer.start_span("root") as root:
+        pass
+    assert len(root.trace_id) == 32
+    assert root.sampled is False
+    assert root.traceparent.endswith("-00")
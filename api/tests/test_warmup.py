@@ -0,0 +1,105 @@
+from warmup import DEFAULT_STEPS, WarmUp, WarmupStep
+
+
+def test_optional_failure_does_not_block_readiness():
+    def broken():
+        raise RuntimeError("sdk missing")
+
+    warm = WarmUp([WarmupStep("rules", lambda: {"n": 1}), WarmupStep("providers", broken, required=False)])
+    assert warm.snapshot()["status"] == "pending" and not warm.ready
+    assert warm.run() is True
+    snapshot = warm.snapshot()
+    assert snapshot["ready"] and snapshot["elapsed_ms"] is not None
+    assert snapshot["components"]["rules"]["detail"] == {"n": 1}
+    assert snapshot["components"]["providers"] == {
+        "ok": False,
+        "required": False,
+        "ms": snapshot["components"]["providers"]["ms"],
+        "attempts": 1,
+        "error": "RuntimeError: sdk missing",
+    }
+
+
+def test_required_step_retries_until_it_passes():
+    calls = []
+
+    def flaky_db():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionError("db not up")
+
+    warm = WarmUp([WarmupStep("db_pool", flaky_db)], retry_s=0.01)
+    assert warm.run() is True
+    assert warm.snapshot()["components"]["db_pool"]["attempts"] == 3
+
+
+def test_stop_leaves_worker_unready():
+    warm = WarmUp([WarmupStep("db_pool", lambda: 1 / 0)], retry_s=0.01)
+    thread = warm.start_in_background()
+    warm.stop()
+    assert not thread.is_alive()
+    assert warm.snapshot()["status"] == "failed" and not warm.ready
+
+
+def test_scoring_step_runs_without_external_services():
+    scoring = next(step for step in DEFAULT_STEPS if step.name == "scoring")
+    detail = scoring.run()
+    assert set(detail) == {"band", "category"}
+
+
+def test_ready_callbacks_wait_for_warmup():
+    started = []
+    warm = WarmUp([WarmupStep("schema", lambda: None)])
+    warm.when_ready(lambda: started.append("jobs"))
+    assert started == []
+    warm.run()
+    assert started == ["jobs"]
+    warm.when_ready(lambda: started.append("late"))
+    assert started == ["jobs", "late"]
+
+
+def test_failed_warmup_never_fires_ready_callbacks():
+    started = []
+    warm = WarmUp([WarmupStep("schema", lambda: 1 / 0)], retry_s=0.01)
+    warm.when_ready(lambda: started.append("jobs"))
+    thread = warm.start_in_background()
+    warm.stop()
+    assert not thread.is_alive() and started == []
+
+
+def test_schema_is_created_before_the_database_is_used():
+    names = [step.name for step in DEFAULT_STEPS]
+    schema = DEFAULT_STEPS[names.index("schema")]
+    assert schema.required
+    assert names.index("schema") < names.index("db_pool") < names.index("tenant_lookup")
+
+
+def test_db_pool_step_also_fills_the_async_pool_on_the_app_loop(sqlite_sessions, monkeypatch):
+    import asyncio
+    import threading
+
+    import db.session
+    import warmup as warmup_module
+
+    opened = []
+
+    async def fake_warm_async_pool(count):
+        opened.append((count, asyncio.get_running_loop()))
+        return count
+
+    monkeypatch.setattr(db.session, "engine", sqlite_sessions.kw["bind"])
+    monkeypatch.setattr(db.session, "ASYNC_DB_ENABLED", True)
+    monkeypatch.setattr(db.session, "warm_async_pool", fake_warm_async_pool)
+    monkeypatch.setenv("AGENTICLABS_WARMUP_DB_CONNECTIONS", "3")
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(warmup_module.warmup, "loop", loop)
+    try:
+        db_pool = next(step for step in DEFAULT_STEPS if step.name == "db_pool")
+        assert db_pool.run() == {"connections": 3, "async_connections": 3}
+        assert opened == [(3, loop)]
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
@@ -0,0 +1,58 @@
+"""
+In-process tracing for router stages.
+
+Configure with:
+- AGENTICLABS_TRACE_EXPORTER: none | stdout | file | otlp
+- AGENTICLABS_TRACE_FILE: path for the file exporter
+- AGENTICLABS_OTLP_ENDPOINT: collector base URL for the otlp exporter
+- AGENTICLABS_TRACE_SAMPLE_RATE: head sampling ratio in [0, 1]
+- AGENTICLABS_SERVER_TIMING: 0 to drop the Server-Timing response header
+"""
+
+from .asgi import ServerTimingMiddleware, TracingMiddleware
+from .exporters import (
+    FileSpanExporter,
+    NoopSpanExporter,
+    OTLPHttpSpanExporter,
+    SpanExporter,
+    StdoutSpanExporter,
+    exporter_from_env,
+)
+from .tracer import (
+    Span,
+    Tracer,
+    current_span,
+    current_trace_id,
+    inject_trace_headers,
+    parse_traceparent,
+    span,
+    tracer,
+)
+from .profiler import Profile, ProfilerBusy, SamplingProfiler
+from .timing import StageTimer, current_timer, stage, use_timer
+
+__all__ = [
+    "ServerTimingMiddleware",
+    "TracingMiddleware",
+    "SpanExporter",
+    "NoopSpanExporter",
+    "StdoutSpanExporter",
+    "FileSpanExporter",
+    "OTLPHttpSpanExporter",
+    "exporter_from_env",
+    "Span",
+    "Tracer",
+    "current_span",
+    "current_trace_id",
+    "inject_trace_headers",
+    "parse_traceparent",
+    "span",
+    "tracer",
+    "Profile",
+    "ProfilerBusy",
+    "SamplingProfiler",
+    "StageTimer",
+    "current_timer",
+    "stage",
+    "use_timer",
+]
@@ -0,0 +1,95 @@
+"""
+Pure ASGI middleware that opens the root span for every HTTP request, and
+one that reports stage timings in a `Server-Timing` header.
+
+Running as plain ASGI (instead of BaseHTTPMiddleware) keeps the endpoint in
+the same task, so the root span's ContextVar is visible to dependencies and
+to the threadpool that executes sync endpoints.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from .timing import StageTimer, use_timer
+from .tracer import TRACEPARENT_HEADER, tracer
+
+Scope = Dict[str, Any]
+Message = Dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+
+class TracingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope.get("type") != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = None
+        for key, value in scope.get("headers") or []:
+            if key.decode("latin-1").lower() == TRACEPARENT_HEADER:
+                incoming = value.decode("latin-1")
+                break
+
+        method = scope.get("method", "GET")
+        path = scope.get("path", "")
+        with tracer.start_span(
+            f"{method} {path}",
+            {"http.method": method, "http.target": path},
+            traceparent=incoming,
+        ) as root:
+
+            async def send_wrapper(message: Message) -> None:
+                if message.get("type") == "http.response.start":
+                    status_code = int(message.get("status", 0))
+                    root.set_attribute("http.status_code", status_code)
+                    if status_code >= 500:
+                        root.status = "error"
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+
+class ServerTimingMiddleware:
+    """
+    Give each HTTP request a StageTimer and add its stages, plus `total`
+    (time until the response starts), as a `Server-Timing` header.
+    Disable with AGENTICLABS_SERVER_TIMING=0. Set
+    AGENTICLABS_TIMING_ALLOW_ORIGIN to let browser pages on other origins
+    read the header.
+    """
+
+    def __init__(self, app: ASGIApp, *, enabled: bool | None = None) -> None:
+        self.app = app
+        if enabled is None:
+            enabled = os.getenv("AGENTICLABS_SERVER_TIMING", "1").lower() not in {"0", "false", "no"}
+        self.enabled = enabled
+        self.allow_origin = os.getenv("AGENTICLABS_TIMING_ALLOW_ORIGIN")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope.get("type") != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        t0 = time.perf_counter()
+        timer = StageTimer()
+
+        async def send_wrapper(message: Message) -> None:
+            if message.get("type") == "http.response.start":
+                total_ms = (time.perf_counter() - t0) * 1000.0
+                headers = list(message.get("headers") or [])
+                headers.append((b"server-timing", timer.server_timing(total_ms).encode("latin-1")))
+                if self.allow_origin:
+                    headers.append((b"timing-allow-origin", self.allow_origin.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        with use_timer(timer):
+            await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,160 @@
+"""
+Span exporters for the in-process tracer.
+
+Exporters receive finished spans in batches from a background thread, so a
+slow sink never adds latency to the request path.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Protocol, Sequence
+
+import requests
+
+
+class SpanExporter(Protocol):
+    def export(self, spans: Sequence[Dict[str, Any]]) -> None:
+        ...
+
+    def shutdown(self) -> None:
+        ...
+
+
+class NoopSpanExporter:
+    def export(self, spans: Sequence[Dict[str, Any]]) -> None:
+        return None
+
+    def shutdown(self) -> None:
+        return None
+
+
+class StdoutSpanExporter:
+    """Write one JSON document per span to stdout."""
+
+    def export(self, spans: Sequence[Dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(span, default=str) + "\n" for span in spans)
+        sys.stdout.write(lines)
+        sys.stdout.flush()
+
+    def shutdown(self) -> None:
+        return None
+
+
+class FileSpanExporter:
+    """Append spans as JSON lines to a local file."""
+
+    def __init__(self, path: str | Path) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[Dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(span, default=str) + "\n" for span in spans)
+        with self._lock, self._path.open("a", encoding="utf-8") as fh:
+            fh.write(lines)
+
+    def shutdown(self) -> None:
+        return None
+
+
+class OTLPHttpSpanExporter:
+    """
+    Minimal OTLP/HTTP JSON exporter.
+
+    Targets any collector that accepts `POST /v1/traces` with the OTLP JSON
+    encoding (otel-collector, Jaeger, Tempo, or a local stand-in).
+    """
+
+    def __init__(self, endpoint: str, service_name: str = "agenticlabs-api", timeout: float = 2.0) -> None:
+        self._endpoint = endpoint.rstrip("/")
+        if not self._endpoint.endswith("/v1/traces"):
+            self._endpoint += "/v1/traces"
+        self._service_name = service_name
+        self._timeout = timeout
+        self._session = requests.Session()
+
+    @staticmethod
+    def _attr_value(value: Any) -> Dict[str, Any]:
+        if isinstance(value, bool):
+            return {"boolValue": value}
+        if isinstance(value, int):
+            return {"intValue": str(value)}
+        if isinstance(value, float):
+            return {"doubleValue": value}
+        return {"stringValue": str(value)}
+
+    def _to_otlp(self, span: Dict[str, Any]) -> Dict[str, Any]:
+        otlp: Dict[str, Any] = {
+            "traceId": span["trace_id"],
+            "spanId": span["span_id"],
+            "name": span["name"],
+            "kind": 1,
+            "startTimeUnixNano": str(span["start_time_ns"]),
+            "endTimeUnixNano": str(span["end_time_ns"]),
+            "attributes": [
+                {"key": key, "value": self._attr_value(value)}
+                for key, value in (span.get("attributes") or {}).items()
+            ],
+            "status": {"code": 2 if span.get("status") == "error" else 1},
+        }
+        if span.get("parent_span_id"):
+            otlp["parentSpanId"] = span["parent_span_id"]
+        return otlp
+
+    def export(self, spans: Sequence[Dict[str, Any]]) -> None:
+        body = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {"key": "service.name", "value": {"stringValue": self._service_name}}
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "agenticlabs.tracing"},
+                            "spans": [self._to_otlp(span) for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        try:
+            self._session.post(self._endpoint, json=body, timeout=self._timeout)
+        except requests.RequestException:
+            # Tracing must never take the router down with it.
+            pass
+
+    def shutdown(self) -> None:
+        self._session.close()
+
+
+def exporter_from_env() -> SpanExporter:
+    """
+    Build the exporter selected by AGENTICLABS_TRACE_EXPORTER
+    (none | stdout | file | otlp).
+    """
+    kind = os.getenv("AGENTICLABS_TRACE_EXPORTER", "none").strip().lower()
+    if kind == "stdout":
+        return StdoutSpanExporter()
+    if kind == "file":
+        return FileSpanExporter(os.getenv("AGENTICLABS_TRACE_FILE", "traces.jsonl"))
+    if kind == "otlp":
+        endpoint = os.getenv("AGENTICLABS_OTLP_ENDPOINT", "http://localhost:4318")
+        return OTLPHttpSpanExporter(endpoint)
+    return NoopSpanExporter()
+
+
+__all__: List[str] = [
+    "SpanExporter",
+    "NoopSpanExporter",
+    "StdoutSpanExporter",
+    "FileSpanExporter",
+    "OTLPHttpSpanExporter",
+    "exporter_from_env",
+]
@@ -0,0 +1,204 @@
+"""
+On-demand wall-clock sampling profiler for a live worker.
+
+While a profile runs, a background thread reads every thread's Python stack
+via `sys._current_frames()` at a fixed interval and counts identical stacks.
+Nothing is installed when no profile is running: there is no sampler thread
+and no trace/profile hook, only a flag check where stages tag their thread.
+
+Samples can carry the run id and pipeline stage active on the sampled
+thread. StageTimer (tracing.timing) pushes those tags only while a profile
+is running.
+
+Output is the "collapsed" format (`frame;frame;frame count`, root first),
+which flamegraph.pl, speedscope and inferno read directly, or a JSON
+summary of the hottest functions.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# Leaf frames in these files are threads parked on a lock, queue or selector.
+_IDLE_FILES = ("threading.py", "selectors.py", "queue.py")
+
+_active = 0
+_active_lock = threading.Lock()
+_thread_tags: Dict[int, Tuple[Optional[str], Optional[str]]] = {}
+
+
+def push_tag(run_id: Optional[str], stage: Optional[str]) -> Optional[Tuple[int, Any]]:
+    """Tag the calling thread while a profile runs. Returns a token for `pop_tag`, or None when idle."""
+    if not _active:
+        return None
+    ident = threading.get_ident()
+    previous = _thread_tags.get(ident)
+    if run_id is None and previous is not None:
+        run_id = previous[0]
+    _thread_tags[ident] = (run_id, stage)
+    return ident, previous
+
+
+def pop_tag(token: Optional[Tuple[int, Any]]) -> None:
+    if token is None:
+        return
+    ident, previous = token
+    if previous is None or not _active:
+        _thread_tags.pop(ident, None)
+    else:
+        _thread_tags[ident] = previous
+
+
+class ProfilerBusy(RuntimeError):
+    """Raised when a profile is already running in this process."""
+
+
+@dataclass
+class Profile:
+    duration_s: float
+    interval_s: float
+    samples: int
+    stacks: Counter = field(default_factory=Counter)
+    sampler_cpu_s: float = 0.0
+
+    def collapsed(self) -> str:
+        lines = [f"{';'.join(stack)} {count}" for stack, count in self.stacks.most_common()]
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def summary(self, top: int = 25) -> Dict[str, Any]:
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = [frame for frame in stack if not frame.startswith(("thread:", "run:", "stage:"))]
+            if not frames:
+                continue
+            self_counts[frames[-1]] += count
+            for frame in set(frames):
+                total_counts[frame] += count
+        thread_samples = sum(self.stacks.values())
+
+        def rows(counter: Counter) -> List[Dict[str, Any]]:
+            return [
+                {"frame": frame, "samples": n, "pct": round(100.0 * n / thread_samples, 2)}
+                for frame, n in counter.most_common(top)
+            ]
+
+        return {
+            "duration_s": round(self.duration_s, 3),
+            "interval_ms": round(self.interval_s * 1000.0, 3),
+            "samples": self.samples,
+            "thread_samples": thread_samples,
+            "sampler_cpu_s": round(self.sampler_cpu_s, 4),
+            "top_self": rows(self_counts),
+            "top_total": rows(total_counts),
+        }
+
+
+class SamplingProfiler:
+    def __init__(
+        self,
+        *,
+        interval_s: float = 0.005,
+        include_idle: bool = False,
+        tags: str = "stage",
+        max_depth: int = 128,
+    ) -> None:
+        self.interval_s = max(0.001, interval_s)
+        self.include_idle = include_idle
+        # "none", "stage", or "run" (stage plus run id; one stack per run).
+        self.tags = tags
+        self.max_depth = max_depth
+        self._labels: Dict[Any, str] = {}
+
+    def _label(self, code: Any) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            parts = code.co_filename.replace("\\", "/").split("/")
+            short = "/".join(parts[-2:]) if len(parts) > 1 else parts[0]
+            label = self._labels[code] = f"{code.co_name} ({short}:{code.co_firstlineno})"
+        return label
+
+    def _stack(self, frame: Any) -> Optional[List[str]]:
+        if not self.include_idle and os.path.basename(frame.f_code.co_filename) in _IDLE_FILES:
+            return None
+        stack: List[str] = []
+        while frame is not None and len(stack) < self.max_depth:
+            stack.append(self._label(frame.f_code))
+            frame = frame.f_back
+        stack.reverse()
+        return stack
+
+    def run(self, duration_s: float, stop: threading.Event | None = None) -> Profile:
+        """Sample all threads for `duration_s` and return the aggregated stacks."""
+        global _active
+        with _active_lock:
+            if _active:
+                raise ProfilerBusy("a profile is already running in this worker")
+            _thread_tags.clear()
+            _active = 1
+
+        stacks: Counter = Counter()
+        samples = 0
+        me = threading.get_ident()
+        names: Dict[int, str] = {}
+        cpu0 = time.thread_time()
+        t0 = time.perf_counter()
+        deadline = t0 + duration_s
+        try:
+            next_at = t0
+            while True:
+                now = time.perf_counter()
+                if now >= deadline or (stop is not None and stop.is_set()):
+                    break
+                frames = sys._current_frames()
+                if any(ident not in names for ident in frames):
+                    names = {t.ident: t.name for t in threading.enumerate() if t.ident is not None}
+                    names.update({ident: str(ident) for ident in frames if ident not in names})
+                for ident, frame in frames.items():
+                    if ident == me:
+                        continue
+                    stack = self._stack(frame)
+                    if stack is None:
+                        continue
+                    prefix = [f"thread:{names[ident]}"]
+                    if self.tags != "none":
+                        run_id, stage = _thread_tags.get(ident, (None, None))
+                        if run_id and self.tags == "run":
+                            prefix.append(f"run:{run_id}")
+                        if stage:
+                            prefix.append(f"stage:{stage}")
+                    stacks[tuple(prefix + stack)] += 1
+                del frames
+                samples += 1
+                next_at += self.interval_s
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    # Fell behind (a GIL-heavy worker); skip missed ticks.
+                    next_at = time.perf_counter()
+        finally:
+            with _active_lock:
+                _active = 0
+                _thread_tags.clear()
+
+        return Profile(
+            duration_s=time.perf_counter() - t0,
+            interval_s=self.interval_s,
+            samples=samples,
+            stacks=stacks,
+            sampler_cpu_s=time.thread_time() - cpu0,
+        )
+
+
+def profiling_active() -> bool:
+    return bool(_active)
+
+
+__all__ = ["Profile", "ProfilerBusy", "SamplingProfiler", "pop_tag", "profiling_active", "push_tag"]
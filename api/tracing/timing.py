@@ -0,0 +1,101 @@
+"""
+Per-request stage timings for the `Server-Timing` response header and the
+`router_runs.stage_timings` column.
+
+A `StageTimer` adds up wall time per named stage. The request's timer lives
+in a ContextVar set by `ServerTimingMiddleware`; `stage(name)` records into
+whichever timer is current and is a no-op outside a request. Each run also
+carries its own timer (see run_pipeline), so batch items and background
+jobs get per-run breakdowns.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import ContextManager, Dict, Iterator, Optional
+
+from .profiler import pop_tag, push_tag
+
+
+class StageTimer:
+    """
+    Milliseconds per stage, in the order stages first ran. `run_id` tags
+    profiler samples taken inside this timer's stages.
+    """
+
+    def __init__(self, run_id: str | None = None) -> None:
+        self.run_id = run_id
+        self._ms: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, ms: float) -> None:
+        with self._lock:
+            self._ms[name] = self._ms.get(name, 0.0) + max(0.0, ms)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        tag = push_tag(self.run_id, name)
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - t0) * 1000.0)
+            pop_tag(tag)
+
+    def merge(self, other: "StageTimer") -> None:
+        for name, ms in other.as_dict(ndigits=None).items():
+            self.add(name, ms)
+
+    def get(self, name: str) -> float:
+        with self._lock:
+            return self._ms.get(name, 0.0)
+
+    def as_dict(self, ndigits: int | None = 2) -> Dict[str, float]:
+        with self._lock:
+            if ndigits is None:
+                return dict(self._ms)
+            return {name: round(ms, ndigits) for name, ms in self._ms.items()}
+
+    def server_timing(self, total_ms: float | None = None) -> str:
+        """Format as a `Server-Timing` header value, optionally with a `total` entry."""
+        entries = [f"{_token(name)};dur={ms:.1f}" for name, ms in self.as_dict(ndigits=None).items()]
+        if total_ms is not None:
+            entries.append(f"total;dur={total_ms:.1f}")
+        return ", ".join(entries)
+
+
+def _token(name: str) -> str:
+    # Server-Timing metric names are HTTP tokens.
+    return re.sub(r"[^A-Za-z0-9!#$%&'*+.^_`|~-]", "_", name)
+
+
+_current_timer: ContextVar[Optional[StageTimer]] = ContextVar("agenticlabs_stage_timer", default=None)
+
+
+def current_timer() -> Optional[StageTimer]:
+    return _current_timer.get()
+
+
+@contextmanager
+def use_timer(timer: StageTimer) -> Iterator[StageTimer]:
+    """Make `timer` the target of `stage()` inside the block."""
+    token = _current_timer.set(timer)
+    tag = push_tag(timer.run_id, None) if timer.run_id else None
+    try:
+        yield timer
+    finally:
+        pop_tag(tag)
+        _current_timer.reset(token)
+
+
+def stage(name: str) -> ContextManager[None]:
+    """Time the block into the current timer, if there is one."""
+    timer = _current_timer.get()
+    return timer.stage(name) if timer is not None else nullcontext()
+
+
+__all__ = ["StageTimer", "current_timer", "stage", "use_timer"]
@@ -0,0 +1,255 @@
+"""
+Lightweight in-process tracer.
+
+Spans follow the W3C trace-context model (128-bit trace id, 64-bit span id,
+sampled flag) so IDs line up with whatever collector sits behind the exporter.
+The active span lives in a ContextVar, which FastAPI copies into the worker
+thread that runs sync endpoints and dependencies.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import random
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .exporters import SpanExporter, exporter_from_env
+
+TRACEPARENT_HEADER = "traceparent"
+_EXPORT_BATCH_SIZE = 256
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str]
+    sampled: bool
+    start_time_ns: int = field(default_factory=time.time_ns)
+    end_time_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, values: Dict[str, Any]) -> None:
+        self.attributes.update(values)
+
+    def record_error(self, exc: BaseException) -> None:
+        self.status = "error"
+        self.attributes["error.type"] = type(exc).__name__
+        self.attributes["error.message"] = str(exc)[:500]
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_time_ns or time.time_ns()
+        return (end - self.start_time_ns) / 1_000_000.0
+
+    @property
+    def traceparent(self) -> str:
+        flags = "01" if self.sampled else "00"
+        return f"00-{self.trace_id}-{self.span_id}-{flags}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "start_time_ns": self.start_time_ns,
+            "end_time_ns": self.end_time_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "status": self.status,
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("agenticlabs_current_span", default=None)
+
+
+def parse_traceparent(header: str | None) -> Optional[Tuple[str, str, bool]]:
+    """
+    Parse a W3C `traceparent` header into (trace_id, parent_span_id, sampled).
+    Returns None for malformed or all-zero IDs.
+    """
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) < 4:
+        return None
+    _version, trace_id, span_id, flags = parts[:4]
+    if len(trace_id) != 32 or len(span_id) != 16 or len(flags) != 2:
+        return None
+    try:
+        int(trace_id, 16)
+        int(span_id, 16)
+        sampled = bool(int(flags, 16) & 0x01)
+    except ValueError:
+        return None
+    if trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return trace_id.lower(), span_id.lower(), sampled
+
+
+def _sample_rate_from_env() -> float:
+    try:
+        rate = float(os.getenv("AGENTICLABS_TRACE_SAMPLE_RATE", "1.0"))
+    except ValueError:
+        rate = 1.0
+    return max(0.0, min(rate, 1.0))
+
+
+class Tracer:
+    """Creates spans and hands sampled, finished spans to a background exporter."""
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        *,
+        sample_rate: float = 1.0,
+        max_queue_size: int = 4096,
+    ) -> None:
+        self._exporter = exporter
+        self.sample_rate = max(0.0, min(sample_rate, 1.0))
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue_size)
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self.dropped_spans = 0
+
+    @classmethod
+    def from_env(cls) -> "Tracer":
+        return cls(exporter_from_env(), sample_rate=_sample_rate_from_env())
+
+    def set_exporter(self, exporter: SpanExporter) -> None:
+        self._exporter = exporter
+
+    def _should_sample(self) -> bool:
+        if self.sample_rate >= 1.0:
+            return True
+        if self.sample_rate <= 0.0:
+            return False
+        return random.random() < self.sample_rate
+
+    def _new_span(
+        self,
+        name: str,
+        attributes: Dict[str, Any],
+        traceparent: str | None,
+    ) -> Span:
+        parent = _current_span.get()
+        if parent is not None:
+            return Span(
+                name=name,
+                trace_id=parent.trace_id,
+                span_id=secrets.token_hex(8),
+                parent_span_id=parent.span_id,
+                sampled=parent.sampled,
+                attributes=dict(attributes),
+            )
+        remote = parse_traceparent(traceparent)
+        if remote is not None:
+            trace_id, parent_span_id, sampled = remote
+        else:
+            trace_id, parent_span_id, sampled = secrets.token_hex(16), None, self._should_sample()
+        return Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=secrets.token_hex(8),
+            parent_span_id=parent_span_id,
+            sampled=sampled,
+            attributes=dict(attributes),
+        )
+
+    @contextmanager
+    def start_span(
+        self,
+        name: str,
+        attributes: Dict[str, Any] | None = None,
+        *,
+        traceparent: str | None = None,
+    ) -> Iterator[Span]:
+        """
+        Open a child of the current span (or a new root, optionally continuing
+        a remote `traceparent`) for the duration of the `with` block.
+        """
+        span = self._new_span(name, attributes or {}, traceparent)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.record_error(exc)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_time_ns = time.time_ns()
+            if span.sampled:
+                self._enqueue(span)
+
+    def _enqueue(self, span: Span) -> None:
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(span.to_dict())
+        except queue.Full:
+            self.dropped_spans += 1
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run_exporter, name="agenticlabs-span-exporter", daemon=True
+                )
+                self._worker.start()
+
+    def _run_exporter(self) -> None:
+        while True:
+            first = self._queue.get()
+            batch: List[Dict[str, Any]] = [first]
+            while len(batch) < _EXPORT_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._exporter.export(batch)
+            except Exception:  # pragma: no cover - exporters must not kill the worker
+                pass
+
+
+tracer = Tracer.from_env()
+
+
+def span(name: str, **attributes: Any):
+    """Shorthand for `tracer.start_span(name, attributes)`."""
+    return tracer.start_span(name, attributes)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def current_trace_id() -> Optional[str]:
+    active = _current_span.get()
+    return active.trace_id if active else None
+
+
+def inject_trace_headers(headers: Dict[str, str] | None = None) -> Dict[str, str]:
+    """
+    Add a `traceparent` header for the active span so downstream provider
+    calls join the same trace. Returns the (possibly new) header dict.
+    """
+    headers = headers if headers is not None else {}
+    active = _current_span.get()
+    if active is not None:
+        headers[TRACEPARENT_HEADER] = active.traceparent
+    return headers
@@ -0,0 +1,322 @@
+"""
+Startup warm-up and readiness.
+
+A fresh worker pays for lazy work on its first requests: the schema must
+exist (local runs create it, see `create_schema`), routing rules and
+the pricing profile are read from disk, `re` compiles the scoring and
+governance patterns, SQLAlchemy compiles the tenant lookup, the DB pools
+open their connections and provider adapters import their SDKs. The app
+lifespan runs `WarmUp` once before the worker reports ready on `/ready`;
+`/health` stays a liveness check.
+
+Steps marked required gate readiness and are retried every `retry_s` until
+they pass (a database that comes up after the worker, for instance).
+Optional steps are reported but never hold readiness back. Work that needs
+a ready worker (the job queue consumers) registers with `when_ready`.
+
+    AGENTICLABS_WARMUP=background|blocking|off   (default background)
+    AGENTICLABS_WARMUP_PROVIDERS=openai,anthropic (default: providers named
+                                                   by the routing rules)
+    AGENTICLABS_WARMUP_DB_CONNECTIONS=5           (default: the pool size)
+    AGENTICLABS_WARMUP_RETRY_S=5
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from logger import log_event
+
+# Touches every scoring, category and governance pattern at least once.
+WARMUP_PROMPT = (
+    "Review this Python function and explain the bug: def total(xs): return sum(x for x in xs) / len(xs)\n"
+    '```json\n{"account": "1234-5678-9012-3456", "email": "ops@example.com"}\n```\n'
+    "Summarize the GDPR exposure and any fraud risk in three bullet points."
+)
+
+
+@dataclass(frozen=True)
+class WarmupStep:
+    name: str
+    run: Callable[[], Any]
+    required: bool = True
+
+
+@dataclass
+class StepResult:
+    name: str
+    required: bool
+    ok: bool = False
+    ms: float = 0.0
+    attempts: int = 0
+    detail: Any = None
+    error: Optional[str] = None
+
+
+def create_schema() -> Dict[str, Any]:
+    """
+    Create missing tables. Convenience for local runs: deployments apply
+    `alembic upgrade head` and set AGENTICLABS_CREATE_SCHEMA=0 so workers
+    start without DDL.
+    """
+    if os.getenv("AGENTICLABS_CREATE_SCHEMA", "1").lower() in {"0", "false", "no"}:
+        return {"skipped": True}
+    import models.tenant  # noqa: F401  registers the tenant tables on Base
+    from db.models import Base
+    from db.session import engine
+
+    Base.metadata.create_all(bind=engine)
+    return {"tables": len(Base.metadata.tables)}
+
+
+def _warm_routing_rules() -> Dict[str, Any]:
+    from router.routing_rules import load_routing_rules
+
+    rules = load_routing_rules()
+    return {"task_types": len(rules)}
+
+
+def _warm_pricing() -> Dict[str, Any]:
+    from config.model_registry import MODEL_REGISTRY
+    from costs import load_pricing_profile
+
+    profile = load_pricing_profile()
+    return {"providers": len(profile.get("providers", {})), "models": len(MODEL_REGISTRY)}
+
+
+def _warm_scoring() -> Dict[str, Any]:
+    from config.model_registry import MODEL_REGISTRY
+    from cost.calculator import calculate_cost
+    from governance.alri import compute_alri_v2
+    from router.complexity import choose_band, score_complexity
+    from routing.categories import classify_query
+    from routing.scoring import choose_enhanced_model
+
+    score = score_complexity(WARMUP_PROMPT)
+    band = choose_band(score, WARMUP_PROMPT)
+    category, _ = classify_query(WARMUP_PROMPT)
+    choose_enhanced_model(category=category, allowed_model_keys=list(MODEL_REGISTRY), resolved_band=band)
+    calculate_cost(
+        model_key="openai:gpt-4o-mini",
+        provider="openai",
+        model="gpt-4o-mini",
+        input_tokens=100,
+        output_tokens=100,
+    )
+    compute_alri_v2(
+        band=band,
+        provider="openai",
+        model="gpt-4o-mini",
+        prompt_tokens=100,
+        completion_tokens=100,
+        cost_usd=0.0,
+        baseline_cost_usd=0.0,
+        prompt_text=WARMUP_PROMPT,
+    )
+    return {"band": band, "category": category.value}
+
+
+def _warm_db_pool() -> Dict[str, Any]:
+    from sqlalchemy import text
+
+    from db.session import ASYNC_DB_ENABLED, engine
+
+    pool_size = getattr(engine.pool, "size", lambda: 1)()
+    count = max(1, int(os.getenv("AGENTICLABS_WARMUP_DB_CONNECTIONS", str(pool_size))))
+    connections = []
+    try:
+        for _ in range(count):
+            conn = engine.connect()
+            connections.append(conn)
+            conn.execute(text("SELECT 1"))
+    finally:
+        for conn in connections:
+            conn.close()
+    detail: Dict[str, Any] = {"connections": len(connections)}
+    if ASYNC_DB_ENABLED:
+        detail["async_connections"] = _warm_async_pool(count)
+    return detail
+
+
+def _warm_async_pool(count: int) -> int:
+    from db.session import warm_async_pool
+
+    # asyncpg connections belong to the loop that opened them, so they are
+    # opened on the app's loop rather than this thread's.
+    loop = warmup.loop
+    if loop is None or loop.is_closed():
+        return 0
+    return asyncio.run_coroutine_threadsafe(warm_async_pool(count), loop).result(timeout=60.0)
+
+
+def _warm_tenant_lookup() -> Dict[str, Any]:
+    # No tenant cache to fill; compiling both lookup statements into
+    # SQLAlchemy's statement cache is what the first request would pay for.
+    from db.session import SessionLocal
+    from deps import DEFAULT_TENANT_ID, _load_tenant
+
+    db = SessionLocal()
+    try:
+        tenant = _load_tenant(db, DEFAULT_TENANT_ID or "00000000-0000-0000-0000-000000000000")
+    finally:
+        db.close()
+    return {"default_tenant_found": tenant is not None}
+
+
+def warmup_providers() -> List[str]:
+    configured = os.getenv("AGENTICLABS_WARMUP_PROVIDERS")
+    if configured is not None:
+        return [name.strip().lower() for name in configured.split(",") if name.strip()]
+    from router.routing_rules import load_routing_rules
+
+    names = [cfg["provider"] for bands in load_routing_rules().values() for cfg in bands.values()]
+    return list(dict.fromkeys(names))
+
+
+def _warm_providers() -> Dict[str, Any]:
+    from providers import PROVIDERS
+
+    failed = {name: error for name, error in PROVIDERS.load(warmup_providers()).items() if error}
+    if failed:
+        raise RuntimeError("; ".join(f"{name}: {error}" for name, error in failed.items()))
+    return {"loaded": sorted(PROVIDERS.loaded())}
+
+
+DEFAULT_STEPS: List[WarmupStep] = [
+    WarmupStep("routing_rules", _warm_routing_rules),
+    WarmupStep("pricing", _warm_pricing),
+    WarmupStep("scoring", _warm_scoring),
+    # Ahead of everything that queries the database.
+    WarmupStep("schema", create_schema),
+    WarmupStep("db_pool", _warm_db_pool),
+    WarmupStep("tenant_lookup", _warm_tenant_lookup),
+    WarmupStep("providers", _warm_providers, required=False),
+]
+
+
+class WarmUp:
+    """Runs warm-up steps once and tracks whether this worker is ready."""
+
+    def __init__(self, steps: List[WarmupStep] | None = None, *, retry_s: float = 5.0) -> None:
+        self.steps = list(DEFAULT_STEPS if steps is None else steps)
+        self.retry_s = max(0.1, retry_s)
+        self.state = "pending"
+        self._results: Dict[str, StepResult] = {s.name: StepResult(s.name, s.required) for s in self.steps}
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._on_ready: List[Callable[[], Any]] = []
+        # The app's event loop, for steps that warm loop-bound resources.
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def from_env(cls) -> "WarmUp":
+        return cls(retry_s=float(os.getenv("AGENTICLABS_WARMUP_RETRY_S", "5")))
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def _run_step(self, step: WarmupStep) -> bool:
+        result = self._results[step.name]
+        t0 = time.perf_counter()
+        try:
+            detail = step.run()
+            ok, error = True, None
+        except Exception as exc:
+            detail, ok, error = None, False, f"{type(exc).__name__}: {exc}"[:300]
+        with self._lock:
+            result.attempts += 1
+            result.ms += (time.perf_counter() - t0) * 1000.0
+            result.ok, result.detail, result.error = ok, detail, error
+        if not ok:
+            log_event("warmup_step_failed", {"step": step.name, "required": step.required, "error": error})
+        return ok
+
+    def run(self) -> bool:
+        """Run every step, then retry failed required steps until they pass or `stop()` is called."""
+        with self._lock:
+            self.state = "running"
+            self._started = time.perf_counter()
+        pending = [step for step in self.steps if not self._run_step(step) and step.required]
+        while pending and not self._stop.wait(self.retry_s):
+            pending = [step for step in pending if not self._run_step(step)]
+        with self._lock:
+            self._finished = time.perf_counter()
+            self.state = "failed" if pending else "ready"
+        log_event("warmup_finished", self.snapshot())
+        if not pending:
+            self._fire_ready()
+        return not pending
+
+    def mark_ready(self) -> None:
+        """Skip warm-up (AGENTICLABS_WARMUP=off)."""
+        with self._lock:
+            self.state = "ready"
+        self._fire_ready()
+
+    def when_ready(self, callback: Callable[[], Any]) -> None:
+        """Call `callback` once this worker is ready: now if it already is, else when warm-up passes."""
+        with self._lock:
+            if self.state != "ready":
+                self._on_ready.append(callback)
+                return
+        callback()
+
+    def _fire_ready(self) -> None:
+        with self._lock:
+            callbacks, self._on_ready = self._on_ready, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as exc:
+                log_event("warmup_ready_callback_failed", {
+                    "callback": getattr(callback, "__qualname__", repr(callback)),
+                    "error": str(exc)[:300],
+                })
+
+    def start_in_background(self) -> threading.Thread:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name="agenticlabs-warmup", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            end = self._finished if self._finished is not None else time.perf_counter()
+            elapsed = None if self._started is None else round((end - self._started) * 1000.0, 1)
+            return {
+                "status": self.state,
+                "ready": self.state == "ready",
+                "elapsed_ms": elapsed,
+                "components": {
+                    name: {
+                        "ok": result.ok,
+                        "required": result.required,
+                        "ms": round(result.ms, 1),
+                        "attempts": result.attempts,
+                        **({"detail": result.detail} if result.detail is not None else {}),
+                        **({"error": result.error} if result.error else {}),
+                    }
+                    for name, result in self._results.items()
+                },
+            }
+
+
+warmup = WarmUp.from_env()
+
+
+__all__ = ["DEFAULT_STEPS", "WARMUP_PROMPT", "WarmUp", "WarmupStep", "create_schema", "warmup", "warmup_providers"]
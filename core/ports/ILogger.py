@@ -1,5 +1,12 @@
 
-from typing import Protocol
+from typing import Any, Dict, Protocol
 
-class ILogger(Protocol): pass
 
+class ILogger(Protocol):
+    """Structured event sink. `log` must not block the request path."""
+
+    def log(self, event_type: str, payload: Dict[str, Any]) -> None: ...
+
+    def flush(self) -> None: ...
+
+    def close(self) -> None: ...